@@ -0,0 +1,68 @@
+"""Compares decoding integer arrays into lists with the bulk array decoders,
+and a window's slots into a dict per slot with arrays.Slots.
+
+Run with: python -m benchmarks.bench_arrays
+"""
+import struct
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from minecraft.networking import types
+from .bench_codec import best
+
+
+def old_int_array(buf, offset):
+    length, offset = types.VarInt.read_from(buf, offset)
+    return list(struct.unpack_from('>%di' % length, buf, offset))
+
+
+def old_slots(buf, offset):
+    count, offset = types.Short.read_from(buf, offset)
+    items = []
+    for i in range(count):
+        item, offset = types.Slot.read_from(buf, offset)
+        items.append(item)
+    return items
+
+
+def window(count):
+    # Like a player's inventory: every third slot is empty
+    items = [{"id": -1} if i % 3 == 0 else
+             {"id": i, "count": i % 64, "damage": 0, "nbt": None}
+             for i in range(count)]
+    data = bytearray()
+    types.SlotArray.write_to(items, data)
+    return memoryview(bytes(data))
+
+
+def main(number=2000):
+    print("%-24s %12s %12s %7s" % ("decode", "old", "new", "x"))
+
+    for length in (256, 4096):
+        data = bytearray()
+        types.IntArray.write_to(list(range(length)), data)
+        data = memoryview(bytes(data))
+        old = best(lambda: old_int_array(data, 0), number)
+        new = best(lambda: types.IntArray.read_from(data, 0), number)
+        print("%-24s %10.2fus %10.2fus %6.1fx" % (
+            "int array [%d]" % length, old * 1e6, new * 1e6, old / new))
+        if numpy is not None:
+            types.IntArray.use_numpy = True
+            new = best(lambda: types.IntArray.read_from(data, 0), number)
+            types.IntArray.use_numpy = False
+            print("%-24s %10.2fus %10.2fus %6.1fx" % (
+                "  numpy", old * 1e6, new * 1e6, old / new))
+
+    for count in (45, 300):
+        data = window(count)
+        old = best(lambda: old_slots(data, 0), number)
+        new = best(lambda: types.SlotArray.read_from(data, 0), number)
+        print("%-24s %10.2fus %10.2fus %6.1fx" % (
+            "slots [%d]" % count, old * 1e6, new * 1e6, old / new))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Compares the generic, definition driven packet codec with the compiled
+per-packet codec.
+
+Run with: python -m benchmarks.bench_codec
+"""
+import timeit
+
+from minecraft.networking import packets, types
+from minecraft.networking.codec import parse_definition
+
+SAMPLE_VALUES = {
+    types.Boolean: True,
+    types.UnsignedByte: 200,
+    types.Byte: -5,
+    types.Short: -300,
+    types.UnsignedShort: 25565,
+    types.Integer: 123456,
+    types.VarInt: 1,
+    types.Long: 2 ** 40,
+    types.UnsignedLong: 2 ** 50,
+    types.Float: 1.5,
+    types.Double: 1024.25,
+    types.ShortPrefixedByteArray: b"\x00" * 16,
+    types.VarIntPrefixedByteArray: b"\x00" * 16,
+    types.String: u"benchmark",
+    types.Chat: {"text": "benchmark"},
+}
+
+
+def sample_packet(packet_class):
+    packet = packet_class()
+    for var_name, data_type, condition in parse_definition(
+            packet_class.definition):
+        if data_type not in SAMPLE_VALUES:
+            return None
+        setattr(packet, var_name, SAMPLE_VALUES[data_type])
+    return packet
+
+
+def best(function, number):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(number=20000):
+    packet_classes = set()
+    for name, value in vars(packets).items():
+        if name.startswith("STATE_"):
+            packet_classes.update(value.values())
+
+    print("%-32s %12s %12s %7s %12s %12s %7s" % (
+        "packet", "decode old", "decode new", "x", "encode old",
+        "encode new", "x"))
+    for packet_class in sorted(packet_classes, key=lambda c: c.__name__):
+        if "read_from" not in vars(packet_class):
+            continue
+        packet = sample_packet(packet_class)
+        if packet is None or not packet_class.definition:
+            continue
+
+        data = bytearray()
+        packet.write_fields(data)
+        view = memoryview(bytes(data))
+        target = packet_class()
+
+        decode_old = best(
+            lambda: packets.Packet.read_from(target, view, 0), number)
+        decode_new = best(lambda: target.read_from(view, 0), number)
+        encode_old = best(lambda: packets.Packet.write_fields(
+            packet, bytearray()), number)
+        encode_new = best(lambda: packet.write_fields(bytearray()), number)
+
+        print("%-32s %10.2fus %10.2fus %6.1fx %10.2fus %10.2fus %6.1fx" % (
+            packet_class.__name__,
+            decode_old * 1e6, decode_new * 1e6, decode_old / decode_new,
+            encode_old * 1e6, encode_new * 1e6, encode_old / encode_new))
+
+
+if __name__ == "__main__":
+    main()
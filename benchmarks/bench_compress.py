@@ -0,0 +1,72 @@
+"""Measures the CPU time and bandwidth of compressing outgoing packets with
+different compression policies, for payloads that compress well and for
+ones that don't.
+
+Run with: python -m benchmarks.bench_compress
+"""
+import os
+import zlib
+
+from minecraft.networking import packets
+from minecraft.networking.compression import CompressionPolicy
+
+from .bench_codec import best
+
+THRESHOLD = 256
+
+
+def payloads():
+    blocks = bytearray(b"\x10\x00" * 4096 + bytes(bytearray(8192)))
+    for i in range(0, len(blocks), 61):
+        blocks[i] = i % 251
+    return [
+        ("chat", packets.ChatPacket().set_values(
+            message=u"the quick brown fox jumps over the lazy dog " * 6)),
+        ("blocks", packets.PluginMessage().set_values(
+            channel="MC|Blocks", data=bytes(blocks))),
+        ("random", packets.PluginMessage().set_values(
+            channel="MC|Random", data=os.urandom(4096))),
+    ]
+
+
+def main(number=2000):
+    policies = [
+        ("zlib.compress", None),
+        ("level 1", lambda: CompressionPolicy(level=1)),
+        ("level 6", lambda: CompressionPolicy(level=6)),
+        ("level 9", lambda: CompressionPolicy(level=9)),
+        ("level 6, Z_RLE", lambda: CompressionPolicy(
+            level=6, strategy=zlib.Z_RLE)),
+        ("level 6, no skip", lambda: CompressionPolicy(
+            level=6, min_saving=-1)),
+    ]
+    print("%-8s %-18s %10s %8s %14s" % (
+        "payload", "policy", "time", "ratio", "saved/CPU ms"))
+    for name, packet in payloads():
+        for policy_name, make_policy in policies:
+            policy = make_policy() if make_policy else None
+            buf = bytearray()
+
+            def write():
+                del buf[:]
+                packet.write_frame(buf, THRESHOLD, policy)
+            seconds = best(write, number)
+            if policy is None:
+                ratio, saved = "", ""
+            else:
+                stats = policy.stats
+                ratio = "%.2f" % stats.ratio
+                saved = "%.0f" % (stats.bytes_saved_per_second / 1000)
+            print("%-8s %-18s %8.1fus %8s %14s" % (
+                name, policy_name, seconds * 1e6, ratio, saved))
+
+    # Why a compressor isn't kept: every packet has to be a zlib stream of
+    # its own, and copying a prepared compressor costs more than a new one
+    template = zlib.compressobj(6)
+    print("new compressobj:  %.2fus, copy of one: %.2fus" % (
+        best(lambda: zlib.compressobj(6), number) * 1e6,
+        best(template.copy, number) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Measures decompressing chunk sized packets: the old one-shot
+zlib.decompress copied into a BytesIO against the bounded decompression of
+PacketReactor, for a wanted and for an unwanted packet.
+
+Run with: python -m benchmarks.bench_decompress
+"""
+from io import BytesIO
+import random
+import zlib
+
+import minecraft.networking.connection as conn
+from minecraft.networking import packets
+from minecraft.networking.types import VarInt
+
+from .bench_codec import best
+
+
+def chunk_payload(size):
+    # A chunk data packet of about size bytes, mostly stone and air with a
+    # few random blocks, which compresses like real chunks
+    blocks = bytearray(size)
+    blocks[:size // 2] = b"\x10\x00" * (size // 4)
+    for i in range(0, size, 61):
+        blocks[i] = random.randrange(256)
+    packet = packets.ChunkData().set_values(
+        chunk_x=0, chunk_z=0, ground_up_continuous=True,
+        primary_bit_mask=0xFF, data=bytes(blocks))
+    payload = bytearray()
+    VarInt.write_to(packet.id, payload)
+    packet.write_fields(payload)
+    return bytes(payload)
+
+
+def old_decompress(data):
+    return BytesIO(zlib.decompress(data))
+
+
+def main(number=200):
+    connection = conn.Connection("localhost", 25565, None)
+    wanted = conn.PlayingReactor(connection)
+    unwanted = conn.PlayingReactor(conn.Connection("localhost", 25565, None))
+    connection.register_packet_listener(lambda packet: None,
+                                        packets.ChunkData)
+
+    print("%-10s %10s %12s %12s %12s %10s" % (
+        "payload", "ratio", "one-shot", "bounded", "skipped", "MB/s"))
+    for size in (16 * 1024, 100 * 1024, 1024 * 1024):
+        payload = chunk_payload(size)
+        data = memoryview(zlib.compress(payload))
+        old = best(lambda: old_decompress(data), number)
+        new = best(lambda: wanted._decompress(data, len(payload)), number)
+        skipped = best(lambda: unwanted._decompress(data, len(payload)),
+                       number)
+        print("%-10s %9.1fx %10.1fus %10.1fus %10.1fus %10.0f" % (
+            "%dKiB" % (len(payload) // 1024), len(payload) / float(len(data)),
+            old * 1e6, new * 1e6, skipped * 1e6,
+            len(payload) / new / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measures how long the networking thread takes to get through a burst of
+chat messages and a keep alive when a listener takes a millisecond per
+packet, with the listener called inline and on a ListenerExecutor.
+
+Run with: python -m benchmarks.bench_dispatch
+"""
+import time
+
+import minecraft.networking.connection as conn
+from minecraft.networking.dispatch import ListenerExecutor
+from minecraft.networking.packets import (
+    ChatMessagePacket, STATE_PLAYING_CLIENTBOUND
+)
+from minecraft.networking.types import VarInt
+
+BURST = 200
+
+
+class FrameList(object):
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read_frame(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+def frame(packet):
+    buf = bytearray()
+    packet.write_frame(buf)
+    length, offset = VarInt.read_from(buf, 0)
+    return memoryview(buf)[offset:]
+
+
+def slow_listener(packet):
+    # Like writing each message to a database
+    time.sleep(0.001)
+
+
+def run(executor):
+    connection = conn.Connection("localhost", 25565, None,
+                                 listener_executor=executor)
+    connection.reactor = conn.PlayingReactor(connection)
+    connection.register_packet_listener(slow_listener, ChatMessagePacket)
+    chat = frame(ChatMessagePacket().set_values(json_data='"hi"',
+                                                position=0))
+    keep_alive = frame(STATE_PLAYING_CLIENTBOUND[0]().set_values(
+        keep_alive_id=1))
+    connection.frame_reader = FrameList([chat] * BURST + [keep_alive])
+
+    start = time.time()
+    connection._read_packets()
+    answered = time.time() - start
+    assert connection._outgoing_packet_queue
+    if executor is not None:
+        executor.shutdown()
+    return answered, time.time() - start
+
+
+def main():
+    print("%d chat messages, then a keep alive" % BURST)
+    print("%-24s %16s %16s" % ("listeners", "keep alive after",
+                               "all handled after"))
+    for name, executor in [("inline", None),
+                           ("executor, 4 workers", ListenerExecutor(4))]:
+        answered, handled = run(executor)
+        print("%-24s %14.1fms %14.1fms" % (name, answered * 1e3,
+                                           handled * 1e3))
+        if executor is not None:
+            stats = executor.stats
+            print("  max queue depth %d, mean latency %.1fms, mean "
+                  "callback %.2fms" % (stats.max_queue_depth,
+                                      stats.mean_latency * 1e3,
+                                      stats.mean_callback_time * 1e3))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Measures the throughput of AES/CFB8 through the encryption wrappers
+for typical mixes of packet sizes, running the cipher once per packet
+against once per batch of packets, and with update against update_into.
+
+Run with: python -m benchmarks.bench_encryption
+"""
+import os
+import random
+import warnings
+
+from minecraft.networking.encryption import (
+    create_AES_cipher, generate_shared_secret, BulkCipher)
+
+from .bench_codec import best
+
+# (name, the sizes of the packets in a batch)
+MIXES = [
+    # Movement and keep alives, mostly under 64 bytes
+    ("small packets", [random.randint(8, 64) for i in range(400)]),
+    # Entity updates with the odd chunk in between
+    ("mixed", [random.choice((12, 30, 60, 200, 1500, 9000))
+               for i in range(200)]),
+    # Chunks while flying over fresh terrain
+    ("chunks", [random.randint(4000, 40000) for i in range(40)]),
+]
+
+
+def main(number=20):
+    with warnings.catch_warnings():
+        # CFB8 has been deprecated by cryptography
+        warnings.simplefilter("ignore")
+        cipher = create_AES_cipher(generate_shared_secret())
+    print("%-14s %14s %14s %14s" % (
+        "mix", "per packet", "per batch", "update_into"))
+    for name, sizes in MIXES:
+        chunks = [os.urandom(size) for size in sizes]
+        batch = b"".join(chunks)
+        encryptor = cipher.encryptor()
+        bulk = BulkCipher(cipher.encryptor())
+
+        def per_packet():
+            for data in chunks:
+                encryptor.update(data)
+
+        results = [best(per_packet, number),
+                   best(lambda: encryptor.update(batch), number),
+                   best(lambda: bulk.update(batch), number)]
+        print("%-14s %s" % (name, " ".join(
+            "%10.1fMB/s" % (len(batch) / seconds / 1e6)
+            for seconds in results)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measures how long the entity tracker takes to apply relative moves, both
+on their own and read from frames through a connection's reactor with
+pooled packets, the memory the moves leave behind, and radius queries
+against a linear scan.
+
+Run with: python -m benchmarks.bench_entities
+"""
+import random
+import tracemalloc
+
+import minecraft.networking.connection as conn
+from minecraft.networking import packets
+from minecraft.networking.types import VarInt
+from minecraft.entities import EntityTracker, MOB
+
+from .bench_codec import best
+
+MOBS = 500
+
+
+def populated():
+    tracker = EntityTracker()
+    for entity_id in range(MOBS):
+        tracker.spawn(entity_id, MOB, 54, random.uniform(-100, 100), 64,
+                      random.uniform(-100, 100))
+    return tracker
+
+
+def moves(count=1000):
+    return [packets.EntityRelativeMove().set_values(
+        entity_id=random.randrange(MOBS), delta_x=random.randint(-8, 8),
+        delta_y=0, delta_z=random.randint(-8, 8), on_ground=True)
+        for i in range(count)]
+
+
+def frames(move_packets):
+    out = []
+    for packet in move_packets:
+        data = bytearray()
+        VarInt.write_to(packet.id, data)
+        packet.write_fields(data)
+        out.append(memoryview(bytes(data)))
+    return out
+
+
+def main(number=200):
+    tracker = populated()
+    move_packets = moves()
+    react = tracker.react
+
+    def apply_moves():
+        for packet in move_packets:
+            react(packet)
+    seconds = best(apply_moves, number) / len(move_packets)
+    print("react to a relative move:          %6.2fus" % (seconds * 1e6))
+
+    connection = conn.Connection(
+        "localhost", 25565, None, entities=tracker,
+        pooled_packets=EntityTracker.movement_packets)
+    reactor = conn.PlayingReactor(connection)
+    move_frames = frames(move_packets)
+
+    def read_and_apply():
+        for frame in move_frames:
+            packet = reactor.read_packet(frame)
+            reactor.react(packet)
+            connection._packet_pools[type(packet)].release(packet)
+    seconds = best(read_and_apply, number) / len(move_frames)
+    print("read and react, pooled packets:    %6.2fus" % (seconds * 1e6))
+
+    read_and_apply()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    read_and_apply()
+    stats = tracemalloc.take_snapshot().compare_to(before, "filename")
+    tracemalloc.stop()
+    print("memory kept after %d moves:      %6d bytes" % (
+        len(move_frames), sum(stat.size_diff for stat in stats)))
+
+    points = [(random.uniform(-100, 100), 64, random.uniform(-100, 100))
+              for i in range(100)]
+
+    def grid():
+        for x, y, z in points:
+            tracker.within(x, y, z, 8)
+
+    def linear():
+        for x, y, z in points:
+            [tracker.entity_ids[slot] for slot in range(tracker.capacity)
+             if tracker.entity_ids[slot] != -1 and
+             (tracker.x[slot] - x) ** 2 + (tracker.y[slot] - y) ** 2 +
+             (tracker.z[slot] - z) ** 2 <= 64]
+    grid_seconds = best(grid, number // 10) / len(points)
+    linear_seconds = best(linear, number // 10) / len(points)
+    print("entities within 8 blocks, %d mobs: %6.2fus grid, %.2fus scan" % (
+        MOBS, grid_seconds * 1e6, linear_seconds * 1e6))
+
+
+if __name__ == "__main__":
+    main()
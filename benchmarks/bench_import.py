@@ -0,0 +1,57 @@
+"""Measures how long a fresh process takes to import the packets module,
+with the generated module and with the classes built from packets.json at
+runtime.
+
+Run with: python -m benchmarks.bench_import
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+IMPORT = "import minecraft.networking.packets"
+# Makes importing the generated module fail, so packets.json is used
+RUNTIME = ("import sys; "
+           "sys.modules['minecraft.networking._packets_generated'] = None; "
+           + IMPORT)
+
+
+def run(code, env):
+    start = time.time()
+    subprocess.check_call([sys.executable, "-c", code], env=env)
+    return time.time() - start
+
+
+def import_time(code, env):
+    # The module's own import time as reported by -X importtime, in seconds
+    output = subprocess.check_output(
+        [sys.executable, "-X", "importtime", "-c", code], env=env,
+        stderr=subprocess.STDOUT, universal_newlines=True)
+    for line in output.splitlines():
+        if line.rstrip().endswith("| minecraft.networking.packets"):
+            return int(line.split("|")[1]) / 1e6
+    raise RuntimeError("No import time reported:\n" + output)
+
+
+def main(repeat=20):
+    env = dict(os.environ)
+    # Bytecode is cached like in a normal install
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPYCACHEPREFIX"] = tempfile.mkdtemp()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = root + os.pathsep + env.get("PYTHONPATH", "")
+
+    print("%-10s %16s %16s" % ("mode", "import packets", "whole process"))
+    for mode, code in [("generated", IMPORT), ("runtime", RUNTIME)]:
+        run(code, env)  # Writes the bytecode
+        imports = min(import_time(code, env) for i in range(repeat))
+        process = min(run(code, env) for i in range(repeat))
+        print("%-10s %14.2fms %14.2fms" % (mode, imports * 1e3,
+                                           process * 1e3))
+    print("%-10s %14s %14.2fms" % ("python", "-", min(
+        run("pass", env) for i in range(repeat)) * 1e3))
+
+
+if __name__ == "__main__":
+    main()
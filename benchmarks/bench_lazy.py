@@ -0,0 +1,62 @@
+"""Compares eager decoding with lazy decoding for consumers which only read
+one field of a packet.
+
+Run with: python -m benchmarks.bench_lazy
+"""
+from minecraft.networking import packets, types
+from minecraft.networking.codec import parse_definition
+
+from . import bench_codec
+from .bench_codec import best, sample_packet
+
+# Payloads closer to what busy servers send than the codec benchmark's
+LARGE_VALUES = {
+    types.ShortPrefixedByteArray: b"\x00" * 4096,
+    types.VarIntPrefixedByteArray: b"\x00" * 4096,
+    types.String: u"benchmark " * 25,
+    types.Chat: {"text": "benchmark", "extra": [
+        {"text": "part %d" % i, "color": "gold"} for i in range(40)]},
+}
+
+
+def main(number=20000):
+    bench_codec.SAMPLE_VALUES.update(LARGE_VALUES)
+    packet_classes = set()
+    for name, value in vars(packets).items():
+        if name.startswith("STATE_") and name.endswith("CLIENTBOUND"):
+            packet_classes.update(value.values())
+
+    print("%-32s %-20s %12s %12s %7s" % (
+        "packet", "field read", "eager", "lazy", "x"))
+    for packet_class in sorted(packet_classes, key=lambda c: c.__name__):
+        if packet_class._lazy_plan is None:
+            continue
+        packet = sample_packet(packet_class)
+        if packet is None or len(packet_class.definition) < 2:
+            continue
+
+        data = bytearray()
+        packet.write_fields(data)
+        view = memoryview(bytes(data))
+        fields = parse_definition(packet_class.definition)
+        # The first field is what partial consumers usually want, such as
+        # an entity id or an action
+        field = fields[0][0]
+
+        def eager():
+            decoded = packet_class()
+            decoded.read_from(view, 0)
+            return getattr(decoded, field)
+
+        def lazy():
+            return getattr(packet_class.read_lazy(view, 0), field)
+
+        eager_time = best(eager, number)
+        lazy_time = best(lazy, number)
+        print("%-32s %-20s %10.2fus %10.2fus %6.1fx" % (
+            packet_class.__name__, field, eager_time * 1e6,
+            lazy_time * 1e6, eager_time / lazy_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Measures many connections answering their encryption requests at once
+from a single networking thread, with the session server join taking
+50ms: done on the networking thread, against handed to the login
+executor. Also compares parsing the server's public key every time with
+the cached key.
+
+Run with: python -m benchmarks.bench_login
+"""
+from concurrent.futures import ThreadPoolExecutor
+import os
+import time
+from unittest import mock
+
+from minecraft.networking import connection as conn, encryption, packets
+from minecraft.networking.framing import FrameReader
+
+from .bench_codec import best
+
+CONNECTIONS = 100
+JOIN_SECONDS = 0.05
+KEY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))), "tests", "encryption", "pub_key.bin")
+
+
+class AuthToken(object):
+    # Stands in for an authenticated token talking to the session server
+    def join(self, server_id):
+        time.sleep(JOIN_SECONDS)
+
+
+def logging_in(executor):
+    connections = []
+    for i in range(CONNECTIONS):
+        connection = conn.Connection("localhost", 25565, AuthToken(),
+                                     login_executor=executor)
+        connection.socket = mock.Mock()
+        connection.frame_reader = FrameReader(None)
+        connection.reactor = conn.LoginReactor(connection)
+        connections.append(connection)
+    return connections
+
+
+def run(request, executor):
+    connections = logging_in(executor)
+    started = time.time()
+    for connection in connections:
+        connection.reactor.react(request)
+    busy = time.time() - started
+    # The networking thread running what the workers hand back
+    while not all(isinstance(connection.socket,
+                             encryption.EncryptedSocketWrapper)
+                  for connection in connections):
+        for connection in connections:
+            connection._run_pending()
+        time.sleep(0.001)
+    return busy, time.time() - started
+
+
+def main():
+    with open(KEY, "rb") as f:
+        public_key = f.read()
+    request_class = [
+        packet_class for packet_class
+        in packets.STATE_LOGIN_CLIENTBOUND.values()
+        if packet_class.packet_name == "encryption request"][0]
+    request = request_class().set_values(
+        server_id=u"server", public_key=public_key, verify_token=b"abcd")
+
+    print("%d logins, joins taking %dms" % (CONNECTIONS, JOIN_SECONDS * 1e3))
+    print("%-22s %12s %12s" % ("run on", "busy", "all done"))
+    for name, executor in [("networking thread", None),
+                           ("16 threads", ThreadPoolExecutor(16)),
+                           ("64 threads", ThreadPoolExecutor(64))]:
+        if executor is None:
+            # What a login does without concurrent.futures
+            with mock.patch.object(conn, "_shared_login_executor",
+                                   lambda: None):
+                busy, total = run(request, None)
+        else:
+            busy, total = run(request, executor)
+            executor.shutdown()
+        print("%-22s %10.1fms %10.1fms" % (name, busy * 1e3, total * 1e3))
+
+    def parse():
+        encryption.load_der_public_key(public_key,
+                                       encryption.default_backend())
+    print("parse public key: %.1fus, cached: %.2fus" % (
+        best(parse, 1000) * 1e6,
+        best(lambda: encryption.load_public_key(public_key), 1000) * 1e6))
+
+
+if __name__ == "__main__":
+    main()
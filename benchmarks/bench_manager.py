@@ -0,0 +1,80 @@
+"""Measures keep-alive round trips for many connections run by a single
+ConnectionManager thread.
+
+A fake server in a separate process sends a keep alive to every client and
+waits for all the answers, the connections are put straight in the playing
+state so no login is needed.
+
+Run with: python -m benchmarks.bench_manager [connections] [rounds]
+"""
+import multiprocessing
+import selectors
+import socket
+import sys
+import time
+
+from minecraft.networking import connection as conn
+from minecraft.networking.framing import FrameReader
+from minecraft.networking.packets import KeepAlivePacket
+
+
+def serve(listener, num_connections, rounds, results):
+    clients = [listener.accept()[0] for _ in range(num_connections)]
+    selector = selectors.DefaultSelector()
+    readers = {}
+    for client in clients:
+        readers[client] = FrameReader(client)
+        selector.register(client, selectors.EVENT_READ)
+
+    round_times = []
+    for i in range(rounds):
+        frame = bytearray()
+        KeepAlivePacket().set_values(keep_alive_id=i).write_frame(frame)
+        start = time.time()
+        for client in clients:
+            client.sendall(frame)
+
+        answered = 0
+        while answered < num_connections:
+            for key, _ in selector.select():
+                reader = readers[key.fileobj]
+                reader.fill()
+                while reader.read_frame() is not None:
+                    answered += 1
+        round_times.append(time.time() - start)
+    results.put(round_times)
+
+
+def main(num_connections=1000, rounds=20):
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("localhost", 0))
+    listener.listen(num_connections)
+    results = multiprocessing.Queue()
+    server = multiprocessing.Process(
+        target=serve, args=(listener, num_connections, rounds, results))
+    server.start()
+
+    manager = conn.ConnectionManager()
+    for _ in range(num_connections):
+        connection = conn.Connection("localhost", listener.getsockname()[1],
+                                     None, manager=manager)
+        connection._connect()
+        connection.reactor = conn.PlayingReactor(connection)
+        connection._start_network_thread()
+    manager.start()
+
+    round_times = results.get()
+    server.join()
+    manager.stop()
+
+    total = sum(round_times)
+    print("%d connections, %d rounds on one manager thread" % (
+        num_connections, rounds))
+    print("round trips per second: %.0f" % (
+        num_connections * rounds / total))
+    print("mean time for every client to answer: %.2fms" % (
+        total / rounds * 1e3))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
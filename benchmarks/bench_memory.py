@@ -0,0 +1,83 @@
+"""Measures the memory and allocations taken by decoded packets: with a
+__dict__ per packet as before, with __slots__, and with pooled instances.
+
+Run with: python -m benchmarks.bench_memory
+"""
+import timeit
+import tracemalloc
+
+from minecraft.networking import packets
+from minecraft.networking.codec import compiler
+
+from .bench_codec import sample_packet
+
+PACKET_CLASSES = [packets.KeepAlivePacket,
+                  packets.PlayerPositionAndLookPacket,
+                  packets.JoinGamePacket]
+
+
+def dict_class(packet_class):
+    # The packet class as it was built before it had __slots__
+    attributes = {"packet_name": packet_class.packet_name,
+                  "id": packet_class.id,
+                  "definition": packet_class.definition}
+    attributes.update(compiler.compile(packet_class.definition))
+    base = type("DictPacket", (object,), {})
+    # Packet has empty __slots__, deriving from a plain class as well gives
+    # the instances a __dict__
+    return type(packet_class.__name__, (packets.Packet, base), attributes)
+
+
+def retained(factory, view, count=10000):
+    # Returns the bytes and memory blocks taken per decoded packet, counting
+    # its field values
+    kept = [None] * count
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for i in range(count):
+        packet = factory()
+        packet.read_from(view, 0)
+        kept[i] = packet
+    stats = tracemalloc.take_snapshot().compare_to(before, "filename")
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in stats)
+    blocks = sum(stat.count_diff for stat in stats)
+    return size / float(count), blocks / float(count)
+
+
+def best(function, number=20000):
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main():
+    print("%-30s %-7s %12s %14s %10s" % (
+        "packet", "mode", "bytes/packet", "blocks/packet", "decode"))
+    for packet_class in PACKET_CLASSES:
+        data = bytearray()
+        sample_packet(packet_class).write_fields(data)
+        view = memoryview(bytes(data))
+
+        for mode, factory in [("dict", dict_class(packet_class)),
+                              ("slots", packet_class)]:
+            def decode():
+                packet = factory()
+                packet.read_from(view, 0)
+            size, blocks = retained(factory, view)
+            print("%-30s %-7s %12.1f %14.2f %8.2fus" % (
+                packet_class.__name__, mode, size, blocks,
+                best(decode) * 1e6))
+
+        # A pooled packet only allocates its field values
+        pool = packets.PacketPool(packet_class)
+
+        def pooled():
+            packet = pool.acquire()
+            packet.read_from(view, 0)
+            pool.release(packet)
+        print("%-30s %-7s %12s %14s %8.2fus  (%d created, %d reused)" % (
+            packet_class.__name__, "pooled", "-", "-", best(pooled) * 1e6,
+            pool.created, pool.reused))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measures reading a burst of compressed chunk packets on the networking
+thread alone against handing them to a decode pipeline: the time the
+networking thread is kept busy, during which nothing else is read or
+answered, and the time until every chunk has been delivered.
+
+Run with: python -m benchmarks.bench_pipeline
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import random
+import time
+
+import minecraft.networking.connection as conn
+from minecraft.networking import packets
+from minecraft.networking.pipeline import DecodePipeline
+from minecraft.networking.types import VarInt
+
+THRESHOLD = 256
+CHUNKS = 200
+PALETTE = bytearray(range(0, 256, 16)) + bytearray(16)
+
+
+class FrameList(object):
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read_frame(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+def chunk_frames():
+    frames = []
+    for i in range(CHUNKS):
+        # Blocks drawn from a small palette, which compress about as well
+        # as generated terrain
+        blocks = bytearray(random.choice(PALETTE) for j in range(65536))
+        packet = packets.ChunkData().set_values(
+            chunk_x=i, chunk_z=0, ground_up_continuous=True,
+            primary_bit_mask=0xF, data=bytes(blocks))
+        buf = bytearray()
+        packet.write_frame(buf, THRESHOLD)
+        length, offset = VarInt.read_from(buf, 0)
+        frames.append(memoryview(buf)[offset:])
+    return frames
+
+
+def run(frames, pipeline=None):
+    connection = conn.Connection(
+        "localhost", 25565, None, compression_enabled=True,
+        compression_threshold=THRESHOLD, decode_pipeline=pipeline)
+    connection.reactor = conn.PlayingReactor(connection)
+    delivered = []
+    connection.register_packet_listener(delivered.append, packets.ChunkData)
+    connection.frame_reader = FrameList(frames)
+
+    started = time.time()
+    connection._read_packets()
+    busy = time.time() - started
+    if pipeline is not None:
+        pipeline.drain(connection)
+    total = time.time() - started
+    assert [packet.chunk_x for packet in delivered] == list(range(CHUNKS))
+    return busy, total
+
+
+def main(repeat=5):
+    frames = chunk_frames()
+    setups = [
+        ("networking thread", lambda: None),
+        ("2 threads", lambda: DecodePipeline(ThreadPoolExecutor(2))),
+        ("4 threads", lambda: DecodePipeline(ThreadPoolExecutor(4))),
+        ("4 processes", lambda: DecodePipeline(ProcessPoolExecutor(4))),
+    ]
+    print("%d chunks of %dKiB, %d CPUs" % (
+        CHUNKS, len(frames[0]) // 1024, os.cpu_count()))
+    print("%-18s %12s %12s" % ("decoded on", "busy", "delivered"))
+    for name, make_pipeline in setups:
+        pipeline = make_pipeline()
+        # The first run starts the workers
+        results = [run(frames, pipeline) for i in range(repeat + 1)][1:]
+        if pipeline is not None:
+            pipeline.shutdown()
+        busy, total = min(results, key=lambda result: result[1])
+        print("%-18s %10.1fms %10.1fms" % (name, busy * 1e3, total * 1e3))
+
+
+if __name__ == "__main__":
+    main()
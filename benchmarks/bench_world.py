@@ -0,0 +1,127 @@
+"""Measures how long map chunk bulk packets take to load into a World, the
+memory each loaded chunk takes with and without light, and how long a block
+lookup takes. Then streams chunks through worlds with a memory budget and
+with idle chunks compressed.
+
+Run with: python -m benchmarks.bench_world
+"""
+import random
+import struct
+import timeit
+import tracemalloc
+
+from minecraft.networking import packets
+from minecraft.world import World, SECTION_BLOCKS
+
+from .bench_codec import best
+
+# Sections sent per chunk, like a typical overworld chunk
+BIT_MASK = 0b11111111
+COLUMNS = 10
+
+
+def bulk_packet():
+    sections = bin(BIT_MASK).count("1")
+    column = bytearray()
+    for i in range(sections):
+        column += struct.pack("<%dH" % SECTION_BLOCKS, *[
+            random.randrange(256) << 4 for j in range(SECTION_BLOCKS)])
+    column += b"\xff" * (SECTION_BLOCKS * sections)  # Block and sky light
+    column += b"\x01" * 256
+    packet = packets.MapChunkBulk().set_values(
+        sky_light_sent=True,
+        columns=[(x, 0, BIT_MASK) for x in range(COLUMNS)],
+        data=bytes(column) * COLUMNS)
+    data = bytearray()
+    packet.write_fields(data)
+    return memoryview(bytes(data))
+
+
+def load(view, world):
+    packet = packets.MapChunkBulk()
+    packet.read_from(view, 0)
+    world.react(packet)
+    return world
+
+
+def retained(view, keep_light):
+    # Returns the bytes allocated per chunk
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    world = load(view, World(keep_light))
+    stats = tracemalloc.take_snapshot().compare_to(before, "filename")
+    tracemalloc.stop()
+    assert len(world.chunks) == COLUMNS
+    return sum(stat.size_diff for stat in stats) / float(COLUMNS), \
+        world.nbytes / float(COLUMNS)
+
+
+def main(number=200):
+    view = bulk_packet()
+    print("%d chunks of %d sections, %.1f KiB packet" % (
+        COLUMNS, bin(BIT_MASK).count("1"), len(view) / 1024.0))
+    print("%-12s %12s %14s %14s" % ("light", "load", "memory/chunk",
+                                    "arrays/chunk"))
+    for keep_light in (True, False):
+        seconds = best(lambda: load(view, World(keep_light)), number)
+        memory, arrays = retained(view, keep_light)
+        print("%-12s %10.2fms %12.1fKiB %12.1fKiB" % (
+            "kept" if keep_light else "dropped", seconds * 1e3,
+            memory / 1024.0, arrays / 1024.0))
+
+    world = load(view, World())
+    coordinates = [(random.randrange(16 * COLUMNS), random.randrange(128),
+                    random.randrange(16)) for i in range(1000)]
+
+    def lookups():
+        for x, y, z in coordinates:
+            world.get_block(x, y, z)
+    seconds = min(timeit.repeat(lookups, number=number, repeat=5))
+    print("get_block: %.2fus" % (seconds / number / len(coordinates) * 1e6))
+
+    print("")
+    stream()
+
+
+def layered_packet(chunk_x):
+    # Stone below, air above and a few random ores, which compresses like
+    # real terrain rather than like noise
+    column = bytearray()
+    for i in range(4):
+        blocks = [1 << 4] * SECTION_BLOCKS
+        for j in range(0, SECTION_BLOCKS, 97):
+            blocks[j] = random.randrange(256) << 4
+        column += struct.pack("<%dH" % SECTION_BLOCKS, *blocks)
+    column += b"\x00" * (SECTION_BLOCKS // 2 * 4) + b"\xff" * (
+        SECTION_BLOCKS // 2 * 4) + b"\x01" * 256
+    return packets.ChunkData().set_values(
+        chunk_x=chunk_x, chunk_z=0, ground_up_continuous=True,
+        primary_bit_mask=0b1111, data=bytes(column))
+
+
+def stream(count=2000, max_bytes=8 * 1024 * 1024):
+    # Like a bot walking in a straight line for a long time
+    chunks = [layered_packet(x) for x in range(50)]
+    print("%d chunks streamed through a world" % count)
+    print("%-28s %14s %14s %10s" % ("world", "world size", "traced",
+                                    "chunks"))
+    for name, world in [
+            ("no budget", World()),
+            ("8 MiB budget", World(max_bytes=max_bytes)),
+            ("8 MiB budget, no light", World(False, max_bytes)),
+            ("compressed after 0s", World(compress_after=0))]:
+        tracemalloc.start()
+        for x in range(count):
+            packet = chunks[x % len(chunks)]
+            packet.chunk_x = x
+            world.react(packet)
+            world.maintain()
+        traced = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print("%-28s %12.1fMiB %12.1fMiB %10d" % (
+            name, world.nbytes / 1048576.0, traced / 1048576.0,
+            len(world.chunks)))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@
 This module stores code used for making pyCraft compatible with
 both Python2 and Python3 while using the same codebase.
 """
+import time
 
 # Raw input -> input shenangians
 # example
@@ -17,3 +18,7 @@ try:
 except NameError:
     input = input
 # pylint: enable=undefined-variable,redefined-builtin,invalid-name
+
+# A monotonic high resolution clock for timing short intervals, Python 2
+# only has time.time
+perf_counter = getattr(time, "perf_counter", time.time)
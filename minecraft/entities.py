@@ -0,0 +1,264 @@
+"""Keeps track of the entities around the player.
+
+Entities are stored as a structure of arrays: each entity gets a slot, and
+its position, velocity, rotation and type are kept at that slot in one
+array.array per field. Movement packets update the arrays in place, so
+the hundreds of relative moves a second sent for the mobs around a farm
+don't create any objects beyond the packets themselves. Passing
+:attr:`EntityTracker.movement_packets` as the connection's
+``pooled_packets`` option recycles those too.
+
+Entities are also filed into a uniform grid of columns ``cell_size``
+blocks wide, so that finding the entities within a radius of a point only
+looks at the entities in the cells the radius touches.
+"""
+from array import array
+from math import floor
+
+from .networking import packets
+
+PLAYER = 0
+MOB = 1
+OBJECT = 2
+
+
+class EntityTracker(object):
+    """The entities the server has spawned, by entity id
+
+    Every array is indexed by slot, :meth:`slot` gives an entity's.
+
+    :ivar x, y, z: The position of each entity, in blocks
+    :ivar velocity_x, velocity_y, velocity_z: The velocity of each entity,
+                                              in blocks per tick
+    :ivar yaw, pitch: The rotation of each entity, in steps of 1/256 of a
+                      full turn
+    :ivar kind: PLAYER, MOB or OBJECT
+    :ivar entity_type: The mob or object type, 0 for players
+    :ivar entity_ids: The entity id of each slot, -1 for free slots
+    """
+
+    # Names of the packets react() applies
+    handled_packets = ("spawn player", "spawn object", "spawn mob",
+                       "entity velocity", "destroy entities",
+                       "entity relative move", "entity look",
+                       "entity look and relative move", "entity teleport")
+    # The classes of the packets sent most often, see the module's docstring
+    movement_packets = (packets.EntityRelativeMove, packets.EntityLook,
+                        packets.EntityLookAndRelativeMove,
+                        packets.EntityTeleport, packets.EntityVelocity)
+
+    _FIELDS = (("x", "d"), ("y", "d"), ("z", "d"), ("velocity_x", "d"),
+               ("velocity_y", "d"), ("velocity_z", "d"), ("yaw", "B"),
+               ("pitch", "B"), ("kind", "b"), ("entity_type", "h"),
+               ("entity_ids", "q"), ("cell_x", "i"), ("cell_z", "i"))
+
+    def __init__(self, capacity=256, cell_size=16):
+        """
+        :param capacity(int): The number of slots to start with, more are
+                              added as needed
+        :param cell_size(float): The width of the grid's cells in blocks
+        """
+        self.cell_size = float(cell_size)
+        self.capacity = 0
+        for name, typecode in self._FIELDS:
+            setattr(self, name, array(typecode))
+        self._grow(capacity)
+        self._slots = {}
+        self._cells = {}
+        self._handlers = {
+            "spawn player": self._spawn_player,
+            "spawn object": self._spawn_object,
+            "spawn mob": self._spawn_mob,
+            "entity velocity": self._velocity,
+            "destroy entities": self._destroy,
+            "entity relative move": self._relative_move,
+            "entity look": self._look,
+            "entity look and relative move": self._look_and_relative_move,
+            "entity teleport": self._teleport,
+        }
+
+    def _grow(self, capacity):
+        added = capacity - self.capacity
+        for name, typecode in self._FIELDS:
+            getattr(self, name).extend(array(typecode, [0]) * added)
+        self.entity_ids[self.capacity:] = array("q", [-1]) * added
+        # Only called once every slot is taken, free slots are taken from
+        # the end
+        self._free = list(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, entity_id):
+        return entity_id in self._slots
+
+    def slot(self, entity_id):
+        """:return: The slot of an entity in the arrays, or None"""
+        return self._slots.get(entity_id)
+
+    def position(self, entity_id):
+        """:return: The (x, y, z) of an entity, or None"""
+        slot = self._slots.get(entity_id)
+        if slot is None:
+            return None
+        return self.x[slot], self.y[slot], self.z[slot]
+
+    def spawn(self, entity_id, kind, entity_type, x, y, z, yaw=0, pitch=0):
+        """Adds an entity, replacing any with the same id"""
+        self.remove(entity_id)
+        if not self._free:
+            self._grow(self.capacity * 2 or 16)
+        slot = self._free.pop()
+        self._slots[entity_id] = slot
+        self.entity_ids[slot] = entity_id
+        self.kind[slot] = kind
+        self.entity_type[slot] = entity_type
+        self.x[slot], self.y[slot], self.z[slot] = x, y, z
+        self.velocity_x[slot] = self.velocity_y[slot] = \
+            self.velocity_z[slot] = 0
+        self.yaw[slot], self.pitch[slot] = yaw, pitch
+
+        cell_x = self.cell_x[slot] = int(floor(x / self.cell_size))
+        cell_z = self.cell_z[slot] = int(floor(z / self.cell_size))
+        cell = self._cells.get((cell_x, cell_z))
+        if cell is None:
+            cell = self._cells[cell_x, cell_z] = set()
+        cell.add(slot)
+        return slot
+
+    def remove(self, entity_id):
+        slot = self._slots.pop(entity_id, None)
+        if slot is None:
+            return
+        key = (self.cell_x[slot], self.cell_z[slot])
+        cell = self._cells[key]
+        cell.discard(slot)
+        if not cell:
+            del self._cells[key]
+        self.entity_ids[slot] = -1
+        self._free.append(slot)
+
+    def clear(self):
+        for entity_id in list(self._slots):
+            self.remove(entity_id)
+
+    def move_to(self, entity_id, x, y, z):
+        """Moves an entity to a position, in blocks"""
+        slot = self._slots.get(entity_id)
+        if slot is not None:
+            self._place(slot, x, y, z)
+
+    def _place(self, slot, x, y, z):
+        self.x[slot] = x
+        self.y[slot] = y
+        self.z[slot] = z
+        cell_size = self.cell_size
+        cell_x = int(floor(x / cell_size))
+        cell_z = int(floor(z / cell_size))
+        old_x = self.cell_x[slot]
+        old_z = self.cell_z[slot]
+        # Entities mostly stay within their cell
+        if cell_x == old_x and cell_z == old_z:
+            return
+        cells = self._cells
+        cell = cells[old_x, old_z]
+        cell.discard(slot)
+        if not cell:
+            del cells[old_x, old_z]
+        cell = cells.get((cell_x, cell_z))
+        if cell is None:
+            cell = cells[cell_x, cell_z] = set()
+        cell.add(slot)
+        self.cell_x[slot] = cell_x
+        self.cell_z[slot] = cell_z
+
+    def within(self, x, y, z, radius):
+        """
+        :return: The ids of the entities within radius blocks of a point
+        """
+        cell_size = self.cell_size
+        radius_squared = radius * radius
+        xs, ys, zs, ids = self.x, self.y, self.z, self.entity_ids
+        found = []
+        for cell_x in range(int(floor((x - radius) / cell_size)),
+                            int(floor((x + radius) / cell_size)) + 1):
+            for cell_z in range(int(floor((z - radius) / cell_size)),
+                                int(floor((z + radius) / cell_size)) + 1):
+                for slot in self._cells.get((cell_x, cell_z), ()):
+                    dx = xs[slot] - x
+                    dy = ys[slot] - y
+                    dz = zs[slot] - z
+                    if dx * dx + dy * dy + dz * dz <= radius_squared:
+                        found.append(ids[slot])
+        return found
+
+    def react(self, packet):
+        """Applies a spawn, destroy or movement packet"""
+        self._handlers[packet.packet_name](packet)
+
+    def _spawn_player(self, packet):
+        self.spawn(packet.entity_id, PLAYER, 0, packet.x / 32.0,
+                   packet.y / 32.0, packet.z / 32.0, packet.yaw,
+                   packet.pitch)
+
+    def _spawn_object(self, packet):
+        slot = self.spawn(packet.entity_id, OBJECT, packet.type,
+                          packet.x / 32.0, packet.y / 32.0, packet.z / 32.0,
+                          packet.yaw, packet.pitch)
+        velocity = packet.data[1]
+        if velocity is not None:
+            self._set_velocity(slot, *velocity)
+
+    def _spawn_mob(self, packet):
+        slot = self.spawn(packet.entity_id, MOB, packet.type,
+                          packet.x / 32.0, packet.y / 32.0, packet.z / 32.0,
+                          packet.yaw, packet.pitch)
+        self._set_velocity(slot, packet.x_vel, packet.y_vel, packet.z_vel)
+
+    def _set_velocity(self, slot, x, y, z):
+        # Sent in 1/8000 of a block per tick
+        self.velocity_x[slot] = x / 8000.0
+        self.velocity_y[slot] = y / 8000.0
+        self.velocity_z[slot] = z / 8000.0
+
+    def _velocity(self, packet):
+        slot = self._slots.get(packet.entity_id)
+        if slot is not None:
+            self._set_velocity(slot, packet.velocity_x, packet.velocity_y,
+                               packet.velocity_z)
+
+    def _destroy(self, packet):
+        for entity_id in packet.entity_ids:
+            self.remove(entity_id)
+
+    def _relative_move(self, packet):
+        slot = self._slots.get(packet.entity_id)
+        if slot is not None:
+            # Sent in 1/32 of a block
+            self._place(slot, self.x[slot] + packet.delta_x / 32.0,
+                        self.y[slot] + packet.delta_y / 32.0,
+                        self.z[slot] + packet.delta_z / 32.0)
+
+    def _look(self, packet):
+        slot = self._slots.get(packet.entity_id)
+        if slot is not None:
+            self.yaw[slot] = packet.yaw
+            self.pitch[slot] = packet.pitch
+
+    def _look_and_relative_move(self, packet):
+        slot = self._slots.get(packet.entity_id)
+        if slot is not None:
+            self._place(slot, self.x[slot] + packet.delta_x / 32.0,
+                        self.y[slot] + packet.delta_y / 32.0,
+                        self.z[slot] + packet.delta_z / 32.0)
+            self.yaw[slot] = packet.yaw
+            self.pitch[slot] = packet.pitch
+
+    def _teleport(self, packet):
+        slot = self._slots.get(packet.entity_id)
+        if slot is not None:
+            self._place(slot, packet.x / 32.0, packet.y / 32.0,
+                        packet.z / 32.0)
+            self.yaw[slot] = packet.yaw
+            self.pitch[slot] = packet.pitch
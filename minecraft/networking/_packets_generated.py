@@ -0,0 +1,1487 @@
+# Generated by minecraft/networking/create_packets_module.py from
+# packets.json, do not edit. Regenerate it after changing packets.json with:
+#     python -m minecraft.networking.create_packets_module
+import struct
+
+from minecraft.networking import types
+from minecraft.networking.codec import lazy_plan
+
+SOURCE_DIGEST = '198e95a9-19222'
+
+_struct_0 = struct.Struct('>q')
+_String_read_from = types.String.read_from
+_String_write_to = types.String.write_to
+_VarInt_read_from = types.VarInt.read_from
+_VarInt_write_to = types.VarInt.write_to
+_struct_1 = struct.Struct('>H')
+_VarIntPrefixedByteArray_read_from = types.VarIntPrefixedByteArray.read_from
+_VarIntPrefixedByteArray_write_to = types.VarIntPrefixedByteArray.write_to
+_Chat_read_from = types.Chat.read_from
+_Chat_write_to = types.Chat.write_to
+_struct_2 = struct.Struct('>dddff?')
+_struct_3 = struct.Struct('>iBbBB')
+_struct_4 = struct.Struct('>?')
+_struct_5 = struct.Struct('>b')
+_struct_6 = struct.Struct('>qq')
+_struct_7 = struct.Struct('>h')
+_Slot_read_from = types.Slot.read_from
+_Slot_write_to = types.Slot.write_to
+_Position_read_from = types.Position.read_from
+_Position_write_to = types.Position.write_to
+_struct_8 = struct.Struct('>f')
+_struct_9 = struct.Struct('>iBB')
+_struct_10 = struct.Struct('>dddffb')
+_struct_11 = struct.Struct('>B')
+_UUID_read_from = types.UUID.read_from
+_UUID_write_to = types.UUID.write_to
+_struct_12 = struct.Struct('>iiiBBh')
+_EntityMetadata_read_from = types.EntityMetadata.read_from
+_EntityMetadata_write_to = types.EntityMetadata.write_to
+_struct_13 = struct.Struct('>biiiBB')
+_ObjectData_read_from = types.ObjectData.read_from
+_ObjectData_write_to = types.ObjectData.write_to
+_struct_14 = struct.Struct('>BiiiBBBhhh')
+_struct_15 = struct.Struct('>hhh')
+_VarIntArray_read_from = types.VarIntArray.read_from
+_VarIntArray_write_to = types.VarIntArray.write_to
+_struct_16 = struct.Struct('>bbb?')
+_struct_17 = struct.Struct('>BB?')
+_struct_18 = struct.Struct('>bbbBB?')
+_struct_19 = struct.Struct('>iiiBB?')
+_struct_20 = struct.Struct('>ib')
+_struct_21 = struct.Struct('>bh')
+_SlotArray_read_from = types.SlotArray.read_from
+_SlotArray_write_to = types.SlotArray.write_to
+_struct_22 = struct.Struct('>ii?H')
+_struct_23 = struct.Struct('>ii')
+_BlockChangeRecords_read_from = types.BlockChangeRecords.read_from
+_BlockChangeRecords_write_to = types.BlockChangeRecords.write_to
+_ChunkBulkMeta_read_from = types.ChunkBulkMeta.read_from
+_ChunkBulkMeta_write_to = types.ChunkBulkMeta.write_to
+_TrailingByteArray_read_from = types.TrailingByteArray.read_from
+_TrailingByteArray_write_to = types.TrailingByteArray.write_to
+_struct_24 = struct.Struct('>i')
+_Nbt_read_from = types.Nbt.read_from
+_Nbt_write_to = types.Nbt.write_to
+
+
+def create_packets(Packet):
+    """Creates the packet classes, see packets.build_packets"""
+    tables = {}
+    classes = {}
+
+    table = tables['STATE_STATUS_SERVERBOUND'] = {}
+
+    class RequestPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'RequestPacket'
+        __slots__ = ('_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'request'
+        definition = []
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            return offset
+
+        def write_fields(self, buf):
+            pass
+
+    classes['RequestPacket'] = table[RequestPacket.id] = RequestPacket
+
+    class PingPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'PingPacket'
+        __slots__ = ('time', '_lazy_data', '_lazy_starts')
+        id = 1
+        packet_name = 'ping'
+        definition = [
+            {'time': 'Long'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.time, = _struct_0.unpack_from(buf, offset)
+            offset += 8
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_0.pack(self.time)
+
+    classes['PingPacket'] = table[PingPacket.id] = PingPacket
+
+    table = tables['STATE_STATUS_CLIENTBOUND'] = {}
+
+    class ResponsePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'ResponsePacket'
+        __slots__ = ('json_response', '_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'response'
+        definition = [
+            {'json_response': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.json_response, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _String_write_to(self.json_response, buf)
+
+    classes['ResponsePacket'] = table[ResponsePacket.id] = ResponsePacket
+
+    class PingPacketResponse(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'PingPacketResponse'
+        __slots__ = ('time', '_lazy_data', '_lazy_starts')
+        id = 1
+        packet_name = 'ping'
+        definition = [
+            {'time': 'Long'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.time, = _struct_0.unpack_from(buf, offset)
+            offset += 8
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_0.pack(self.time)
+
+    classes['PingPacketResponse'] = table[PingPacketResponse.id] = PingPacketResponse
+
+    table = tables['STATE_HANDSHAKE_SERVERBOUND'] = {}
+
+    class HandShakePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'HandShakePacket'
+        __slots__ = ('protocol_version', 'server_address', 'server_port', 'next_state', '_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'handshake'
+        definition = [
+            {'protocol_version': 'VarInt'},
+            {'server_address': 'String'},
+            {'server_port': 'UnsignedShort'},
+            {'next_state': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.protocol_version, offset = _VarInt_read_from(buf, offset)
+            self.server_address, offset = _String_read_from(buf, offset)
+            self.server_port, = _struct_1.unpack_from(buf, offset)
+            offset += 2
+            self.next_state, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.protocol_version, buf)
+            _String_write_to(self.server_address, buf)
+            buf += _struct_1.pack(self.server_port)
+            _VarInt_write_to(self.next_state, buf)
+
+    classes['HandShakePacket'] = table[HandShakePacket.id] = HandShakePacket
+
+    table = tables['STATE_HANDSHAKE_CLIENTBOUND'] = {}
+
+    table = tables['STATE_LOGIN_SERVERBOUND'] = {}
+
+    class LoginStartPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'LoginStartPacket'
+        __slots__ = ('name', '_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'login start'
+        definition = [
+            {'name': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.name, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _String_write_to(self.name, buf)
+
+    classes['LoginStartPacket'] = table[LoginStartPacket.id] = LoginStartPacket
+
+    class EncryptionResponsePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EncryptionResponsePacket'
+        __slots__ = ('shared_secret', 'verify_token', '_lazy_data', '_lazy_starts')
+        id = 1
+        packet_name = 'encryption response'
+        definition = [
+            {'shared_secret': 'VarIntPrefixedByteArray'},
+            {'verify_token': 'VarIntPrefixedByteArray'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.shared_secret, offset = _VarIntPrefixedByteArray_read_from(buf, offset)
+            self.verify_token, offset = _VarIntPrefixedByteArray_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarIntPrefixedByteArray_write_to(self.shared_secret, buf)
+            _VarIntPrefixedByteArray_write_to(self.verify_token, buf)
+
+    classes['EncryptionResponsePacket'] = table[EncryptionResponsePacket.id] = EncryptionResponsePacket
+
+    table = tables['STATE_LOGIN_CLIENTBOUND'] = {}
+
+    class DisconnectPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'DisconnectPacket'
+        __slots__ = ('json_data', '_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'disconnect'
+        definition = [
+            {'json_data': 'Chat'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.json_data, offset = _Chat_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _Chat_write_to(self.json_data, buf)
+
+    classes['DisconnectPacket'] = table[DisconnectPacket.id] = DisconnectPacket
+
+    class EncryptionRequestPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EncryptionRequestPacket'
+        __slots__ = ('server_id', 'public_key', 'verify_token', '_lazy_data', '_lazy_starts')
+        id = 1
+        packet_name = 'encryption request'
+        definition = [
+            {'server_id': 'String'},
+            {'public_key': 'VarIntPrefixedByteArray'},
+            {'verify_token': 'VarIntPrefixedByteArray'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.server_id, offset = _String_read_from(buf, offset)
+            self.public_key, offset = _VarIntPrefixedByteArray_read_from(buf, offset)
+            self.verify_token, offset = _VarIntPrefixedByteArray_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _String_write_to(self.server_id, buf)
+            _VarIntPrefixedByteArray_write_to(self.public_key, buf)
+            _VarIntPrefixedByteArray_write_to(self.verify_token, buf)
+
+    classes['EncryptionRequestPacket'] = table[EncryptionRequestPacket.id] = EncryptionRequestPacket
+
+    class LoginSuccessPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'LoginSuccessPacket'
+        __slots__ = ('UUID', 'Username', '_lazy_data', '_lazy_starts')
+        id = 2
+        packet_name = 'login success'
+        definition = [
+            {'UUID': 'String'},
+            {'Username': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.UUID, offset = _String_read_from(buf, offset)
+            self.Username, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _String_write_to(self.UUID, buf)
+            _String_write_to(self.Username, buf)
+
+    classes['LoginSuccessPacket'] = table[LoginSuccessPacket.id] = LoginSuccessPacket
+
+    class SetCompressionPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SetCompressionPacket'
+        __slots__ = ('threshold', '_lazy_data', '_lazy_starts')
+        id = 3
+        packet_name = 'set compression'
+        definition = [
+            {'threshold': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.threshold, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.threshold, buf)
+
+    classes['SetCompressionPacket'] = table[SetCompressionPacket.id] = SetCompressionPacket
+
+    table = tables['STATE_PLAYING_SERVERBOUND'] = {}
+
+    class KeepAlivePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'KeepAlivePacket'
+        __slots__ = ('keep_alive_id', '_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'keep alive'
+        definition = [
+            {'keep_alive_id': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.keep_alive_id, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.keep_alive_id, buf)
+
+    classes['KeepAlivePacket'] = table[KeepAlivePacket.id] = KeepAlivePacket
+
+    class ChatPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'ChatPacket'
+        __slots__ = ('message', '_lazy_data', '_lazy_starts')
+        id = 1
+        packet_name = 'chat'
+        definition = [
+            {'message': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.message, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _String_write_to(self.message, buf)
+
+    classes['ChatPacket'] = table[ChatPacket.id] = ChatPacket
+
+    class PositionAndLookPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'PositionAndLookPacket'
+        __slots__ = ('x', 'feet_y', 'z', 'yaw', 'pitch', 'on_ground', '_lazy_data', '_lazy_starts')
+        id = 6
+        packet_name = 'position and look'
+        definition = [
+            {'x': 'Double'},
+            {'feet_y': 'Double'},
+            {'z': 'Double'},
+            {'yaw': 'Float'},
+            {'pitch': 'Float'},
+            {'on_ground': 'Boolean'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.x, self.feet_y, self.z, self.yaw, self.pitch, self.on_ground = _struct_2.unpack_from(buf, offset)
+            offset += 33
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_2.pack(self.x, self.feet_y, self.z, self.yaw, self.pitch, self.on_ground)
+
+    classes['PositionAndLookPacket'] = table[PositionAndLookPacket.id] = PositionAndLookPacket
+
+    class ClientStatus(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'ClientStatus'
+        __slots__ = ('action_id', '_lazy_data', '_lazy_starts')
+        id = 22
+        packet_name = 'client status'
+        definition = [
+            {'action_id': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.action_id, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.action_id, buf)
+
+    classes['ClientStatus'] = table[ClientStatus.id] = ClientStatus
+
+    table = tables['STATE_PLAYING_CLIENTBOUND'] = {}
+
+    class KeepAlivePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'KeepAlivePacket'
+        __slots__ = ('keep_alive_id', '_lazy_data', '_lazy_starts')
+        id = 0
+        packet_name = 'keep alive'
+        definition = [
+            {'keep_alive_id': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.keep_alive_id, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.keep_alive_id, buf)
+
+    classes['KeepAlivePacket'] = table[KeepAlivePacket.id] = KeepAlivePacket
+
+    class JoinGamePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'JoinGamePacket'
+        __slots__ = ('entity_id', 'game_mode', 'dimension', 'difficulty', 'max_players', 'level_type', 'reduced_debug_info', '_lazy_data', '_lazy_starts')
+        id = 1
+        packet_name = 'join game'
+        definition = [
+            {'entity_id': 'Integer'},
+            {'game_mode': 'UnsignedByte'},
+            {'dimension': 'Byte'},
+            {'difficulty': 'UnsignedByte'},
+            {'max_players': 'UnsignedByte'},
+            {'level_type': 'String'},
+            {'reduced_debug_info': 'Boolean'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, self.game_mode, self.dimension, self.difficulty, self.max_players = _struct_3.unpack_from(buf, offset)
+            offset += 8
+            self.level_type, offset = _String_read_from(buf, offset)
+            self.reduced_debug_info, = _struct_4.unpack_from(buf, offset)
+            offset += 1
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_3.pack(self.entity_id, self.game_mode, self.dimension, self.difficulty, self.max_players)
+            _String_write_to(self.level_type, buf)
+            buf += _struct_4.pack(self.reduced_debug_info)
+
+    classes['JoinGamePacket'] = table[JoinGamePacket.id] = JoinGamePacket
+
+    class ChatMessagePacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'ChatMessagePacket'
+        __slots__ = ('json_data', 'position', '_lazy_data', '_lazy_starts')
+        id = 2
+        packet_name = 'chat message'
+        definition = [
+            {'json_data': 'Chat'},
+            {'position': 'Byte'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.json_data, offset = _Chat_read_from(buf, offset)
+            self.position, = _struct_5.unpack_from(buf, offset)
+            offset += 1
+            return offset
+
+        def write_fields(self, buf):
+            _Chat_write_to(self.json_data, buf)
+            buf += _struct_5.pack(self.position)
+
+    classes['ChatMessagePacket'] = table[ChatMessagePacket.id] = ChatMessagePacket
+
+    class TimeUpdate(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'TimeUpdate'
+        __slots__ = ('world_age', 'day_time', '_lazy_data', '_lazy_starts')
+        id = 3
+        packet_name = 'tick'
+        definition = [
+            {'world_age': 'Long'},
+            {'day_time': 'Long'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.world_age, self.day_time = _struct_6.unpack_from(buf, offset)
+            offset += 16
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_6.pack(self.world_age, self.day_time)
+
+    classes['TimeUpdate'] = table[TimeUpdate.id] = TimeUpdate
+
+    class EntityEquipment(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EntityEquipment'
+        __slots__ = ('entity_id', 'slot', 'item', '_lazy_data', '_lazy_starts')
+        id = 4
+        packet_name = 'set entity equipment'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'slot': 'Short'},
+            {'item': 'Slot'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.slot, = _struct_7.unpack_from(buf, offset)
+            offset += 2
+            self.item, offset = _Slot_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_7.pack(self.slot)
+            _Slot_write_to(self.item, buf)
+
+    classes['EntityEquipment'] = table[EntityEquipment.id] = EntityEquipment
+
+    class SetSpawn(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SetSpawn'
+        __slots__ = ('pos', '_lazy_data', '_lazy_starts')
+        id = 5
+        packet_name = 'set spawn'
+        definition = [
+            {'pos': 'Position'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.pos, offset = _Position_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _Position_write_to(self.pos, buf)
+
+    classes['SetSpawn'] = table[SetSpawn.id] = SetSpawn
+
+    class UpdateHealth(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'UpdateHealth'
+        __slots__ = ('health', 'food', 'saturation', '_lazy_data', '_lazy_starts')
+        id = 6
+        packet_name = 'update health'
+        definition = [
+            {'health': 'Float'},
+            {'food': 'VarInt'},
+            {'saturation': 'Float'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.health, = _struct_8.unpack_from(buf, offset)
+            offset += 4
+            self.food, offset = _VarInt_read_from(buf, offset)
+            self.saturation, = _struct_8.unpack_from(buf, offset)
+            offset += 4
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_8.pack(self.health)
+            _VarInt_write_to(self.food, buf)
+            buf += _struct_8.pack(self.saturation)
+
+    classes['UpdateHealth'] = table[UpdateHealth.id] = UpdateHealth
+
+    class Respawn(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'Respawn'
+        __slots__ = ('dimension', 'difficulty', 'gamemode', 'level_type', '_lazy_data', '_lazy_starts')
+        id = 7
+        packet_name = 'respawn'
+        definition = [
+            {'dimension': 'Integer'},
+            {'difficulty': 'UnsignedByte'},
+            {'gamemode': 'UnsignedByte'},
+            {'level_type': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.dimension, self.difficulty, self.gamemode = _struct_9.unpack_from(buf, offset)
+            offset += 6
+            self.level_type, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_9.pack(self.dimension, self.difficulty, self.gamemode)
+            _String_write_to(self.level_type, buf)
+
+    classes['Respawn'] = table[Respawn.id] = Respawn
+
+    class PlayerPositionAndLookPacket(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'PlayerPositionAndLookPacket'
+        __slots__ = ('x', 'y', 'z', 'yaw', 'pitch', 'flags', '_lazy_data', '_lazy_starts')
+        id = 8
+        packet_name = 'player position and look'
+        definition = [
+            {'x': 'Double'},
+            {'y': 'Double'},
+            {'z': 'Double'},
+            {'yaw': 'Float'},
+            {'pitch': 'Float'},
+            {'flags': 'Byte'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.x, self.y, self.z, self.yaw, self.pitch, self.flags = _struct_10.unpack_from(buf, offset)
+            offset += 33
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_10.pack(self.x, self.y, self.z, self.yaw, self.pitch, self.flags)
+
+    classes['PlayerPositionAndLookPacket'] = table[PlayerPositionAndLookPacket.id] = PlayerPositionAndLookPacket
+
+    class UpdateHeldItem(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'UpdateHeldItem'
+        __slots__ = ('slot', '_lazy_data', '_lazy_starts')
+        id = 9
+        packet_name = 'held item change'
+        definition = [
+            {'slot': 'Byte'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.slot, = _struct_5.unpack_from(buf, offset)
+            offset += 1
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_5.pack(self.slot)
+
+    classes['UpdateHeldItem'] = table[UpdateHeldItem.id] = UpdateHeldItem
+
+    class UseBed(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'UseBed'
+        __slots__ = ('entity_id', 'location', '_lazy_data', '_lazy_starts')
+        id = 10
+        packet_name = 'use bed'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'location': 'Position'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.location, offset = _Position_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            _Position_write_to(self.location, buf)
+
+    classes['UseBed'] = table[UseBed.id] = UseBed
+
+    class Animation(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'Animation'
+        __slots__ = ('entity_id', 'animation_id', '_lazy_data', '_lazy_starts')
+        id = 11
+        packet_name = 'animation'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'animation_id': 'UnsignedByte'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.animation_id, = _struct_11.unpack_from(buf, offset)
+            offset += 1
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_11.pack(self.animation_id)
+
+    classes['Animation'] = table[Animation.id] = Animation
+
+    class SpawnPlayer(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SpawnPlayer'
+        __slots__ = ('entity_id', 'uuid', 'x', 'y', 'z', 'yaw', 'pitch', 'item', 'metadata', '_lazy_data', '_lazy_starts')
+        id = 12
+        packet_name = 'spawn player'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'uuid': 'UUID'},
+            {'x': 'Integer'},
+            {'y': 'Integer'},
+            {'z': 'Integer'},
+            {'yaw': 'Angle'},
+            {'pitch': 'Angle'},
+            {'item': 'Short'},
+            {'metadata': 'EntityMetadata'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.uuid, offset = _UUID_read_from(buf, offset)
+            self.x, self.y, self.z, self.yaw, self.pitch, self.item = _struct_12.unpack_from(buf, offset)
+            offset += 16
+            self.metadata, offset = _EntityMetadata_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            _UUID_write_to(self.uuid, buf)
+            buf += _struct_12.pack(self.x, self.y, self.z, self.yaw, self.pitch, self.item)
+            _EntityMetadata_write_to(self.metadata, buf)
+
+    classes['SpawnPlayer'] = table[SpawnPlayer.id] = SpawnPlayer
+
+    class CollectObject(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'CollectObject'
+        __slots__ = ('collected_id', 'collectior_id', '_lazy_data', '_lazy_starts')
+        id = 13
+        packet_name = 'collect item'
+        definition = [
+            {'collected_id': 'VarInt'},
+            {'collectior_id': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.collected_id, offset = _VarInt_read_from(buf, offset)
+            self.collectior_id, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.collected_id, buf)
+            _VarInt_write_to(self.collectior_id, buf)
+
+    classes['CollectObject'] = table[CollectObject.id] = CollectObject
+
+    class SpawnObject(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SpawnObject'
+        __slots__ = ('entity_id', 'type', 'x', 'y', 'z', 'pitch', 'yaw', 'data', '_lazy_data', '_lazy_starts')
+        id = 14
+        packet_name = 'spawn object'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'type': 'Byte'},
+            {'x': 'Integer'},
+            {'y': 'Integer'},
+            {'z': 'Integer'},
+            {'pitch': 'Angle'},
+            {'yaw': 'Angle'},
+            {'data': 'ObjectData'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.type, self.x, self.y, self.z, self.pitch, self.yaw = _struct_13.unpack_from(buf, offset)
+            offset += 15
+            self.data, offset = _ObjectData_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_13.pack(self.type, self.x, self.y, self.z, self.pitch, self.yaw)
+            _ObjectData_write_to(self.data, buf)
+
+    classes['SpawnObject'] = table[SpawnObject.id] = SpawnObject
+
+    class SpawnMob(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SpawnMob'
+        __slots__ = ('entity_id', 'type', 'x', 'y', 'z', 'yaw', 'pitch', 'head_pitch', 'x_vel', 'y_vel', 'z_vel', 'metadata', '_lazy_data', '_lazy_starts')
+        id = 15
+        packet_name = 'spawn mob'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'type': 'UnsignedByte'},
+            {'x': 'Integer'},
+            {'y': 'Integer'},
+            {'z': 'Integer'},
+            {'yaw': 'Angle'},
+            {'pitch': 'Angle'},
+            {'head_pitch': 'Angle'},
+            {'x_vel': 'Short'},
+            {'y_vel': 'Short'},
+            {'z_vel': 'Short'},
+            {'metadata': 'EntityMetadata'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.type, self.x, self.y, self.z, self.yaw, self.pitch, self.head_pitch, self.x_vel, self.y_vel, self.z_vel = _struct_14.unpack_from(buf, offset)
+            offset += 22
+            self.metadata, offset = _EntityMetadata_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_14.pack(self.type, self.x, self.y, self.z, self.yaw, self.pitch, self.head_pitch, self.x_vel, self.y_vel, self.z_vel)
+            _EntityMetadata_write_to(self.metadata, buf)
+
+    classes['SpawnMob'] = table[SpawnMob.id] = SpawnMob
+
+    class EntityVelocity(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EntityVelocity'
+        __slots__ = ('entity_id', 'velocity_x', 'velocity_y', 'velocity_z', '_lazy_data', '_lazy_starts')
+        id = 18
+        packet_name = 'entity velocity'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'velocity_x': 'Short'},
+            {'velocity_y': 'Short'},
+            {'velocity_z': 'Short'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.velocity_x, self.velocity_y, self.velocity_z = _struct_15.unpack_from(buf, offset)
+            offset += 6
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_15.pack(self.velocity_x, self.velocity_y, self.velocity_z)
+
+    classes['EntityVelocity'] = table[EntityVelocity.id] = EntityVelocity
+
+    class DestroyEntities(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'DestroyEntities'
+        __slots__ = ('entity_ids', '_lazy_data', '_lazy_starts')
+        id = 19
+        packet_name = 'destroy entities'
+        definition = [
+            {'entity_ids': 'VarIntArray'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_ids, offset = _VarIntArray_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarIntArray_write_to(self.entity_ids, buf)
+
+    classes['DestroyEntities'] = table[DestroyEntities.id] = DestroyEntities
+
+    class Entity(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'Entity'
+        __slots__ = ('entity_id', '_lazy_data', '_lazy_starts')
+        id = 20
+        packet_name = 'entity'
+        definition = [
+            {'entity_id': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+
+    classes['Entity'] = table[Entity.id] = Entity
+
+    class EntityRelativeMove(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EntityRelativeMove'
+        __slots__ = ('entity_id', 'delta_x', 'delta_y', 'delta_z', 'on_ground', '_lazy_data', '_lazy_starts')
+        id = 21
+        packet_name = 'entity relative move'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'delta_x': 'Byte'},
+            {'delta_y': 'Byte'},
+            {'delta_z': 'Byte'},
+            {'on_ground': 'Boolean'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.delta_x, self.delta_y, self.delta_z, self.on_ground = _struct_16.unpack_from(buf, offset)
+            offset += 4
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_16.pack(self.delta_x, self.delta_y, self.delta_z, self.on_ground)
+
+    classes['EntityRelativeMove'] = table[EntityRelativeMove.id] = EntityRelativeMove
+
+    class EntityLook(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EntityLook'
+        __slots__ = ('entity_id', 'yaw', 'pitch', 'on_ground', '_lazy_data', '_lazy_starts')
+        id = 22
+        packet_name = 'entity look'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'yaw': 'Angle'},
+            {'pitch': 'Angle'},
+            {'on_ground': 'Boolean'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.yaw, self.pitch, self.on_ground = _struct_17.unpack_from(buf, offset)
+            offset += 3
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_17.pack(self.yaw, self.pitch, self.on_ground)
+
+    classes['EntityLook'] = table[EntityLook.id] = EntityLook
+
+    class EntityLookAndRelativeMove(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EntityLookAndRelativeMove'
+        __slots__ = ('entity_id', 'delta_x', 'delta_y', 'delta_z', 'yaw', 'pitch', 'on_ground', '_lazy_data', '_lazy_starts')
+        id = 23
+        packet_name = 'entity look and relative move'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'delta_x': 'Byte'},
+            {'delta_y': 'Byte'},
+            {'delta_z': 'Byte'},
+            {'yaw': 'Angle'},
+            {'pitch': 'Angle'},
+            {'on_ground': 'Boolean'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.delta_x, self.delta_y, self.delta_z, self.yaw, self.pitch, self.on_ground = _struct_18.unpack_from(buf, offset)
+            offset += 6
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_18.pack(self.delta_x, self.delta_y, self.delta_z, self.yaw, self.pitch, self.on_ground)
+
+    classes['EntityLookAndRelativeMove'] = table[EntityLookAndRelativeMove.id] = EntityLookAndRelativeMove
+
+    class EntityTeleport(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'EntityTeleport'
+        __slots__ = ('entity_id', 'x', 'y', 'z', 'yaw', 'pitch', 'on_ground', '_lazy_data', '_lazy_starts')
+        id = 24
+        packet_name = 'entity teleport'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'x': 'Integer'},
+            {'y': 'Integer'},
+            {'z': 'Integer'},
+            {'yaw': 'Angle'},
+            {'pitch': 'Angle'},
+            {'on_ground': 'Boolean'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.x, self.y, self.z, self.yaw, self.pitch, self.on_ground = _struct_19.unpack_from(buf, offset)
+            offset += 15
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            buf += _struct_19.pack(self.x, self.y, self.z, self.yaw, self.pitch, self.on_ground)
+
+    classes['EntityTeleport'] = table[EntityTeleport.id] = EntityTeleport
+
+    class UpdateEntity(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'UpdateEntity'
+        __slots__ = ('entity_id', 'entity_status', '_lazy_data', '_lazy_starts')
+        id = 26
+        packet_name = 'update entity'
+        definition = [
+            {'entity_id': 'Integer'},
+            {'entity_status': 'Byte'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, self.entity_status = _struct_20.unpack_from(buf, offset)
+            offset += 5
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_20.pack(self.entity_id, self.entity_status)
+
+    classes['UpdateEntity'] = table[UpdateEntity.id] = UpdateEntity
+
+    class SetSlot(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SetSlot'
+        __slots__ = ('window_id', 'slot', 'slot_data', '_lazy_data', '_lazy_starts')
+        id = 47
+        packet_name = 'set slot'
+        definition = [
+            {'window_id': 'Byte'},
+            {'slot': 'Short'},
+            {'slot_data': 'Slot'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.window_id, self.slot = _struct_21.unpack_from(buf, offset)
+            offset += 3
+            self.slot_data, offset = _Slot_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_21.pack(self.window_id, self.slot)
+            _Slot_write_to(self.slot_data, buf)
+
+    classes['SetSlot'] = table[SetSlot.id] = SetSlot
+
+    class WindowItems(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'WindowItems'
+        __slots__ = ('window_id', 'slot_data', '_lazy_data', '_lazy_starts')
+        id = 48
+        packet_name = 'window items'
+        definition = [
+            {'window_id': 'UnsignedByte'},
+            {'slot_data': 'SlotArray'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.window_id, = _struct_11.unpack_from(buf, offset)
+            offset += 1
+            self.slot_data, offset = _SlotArray_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_11.pack(self.window_id)
+            _SlotArray_write_to(self.slot_data, buf)
+
+    classes['WindowItems'] = table[WindowItems.id] = WindowItems
+
+    class ChunkData(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'ChunkData'
+        __slots__ = ('chunk_x', 'chunk_z', 'ground_up_continuous', 'primary_bit_mask', 'data', '_lazy_data', '_lazy_starts')
+        id = 33
+        packet_name = 'chunk data'
+        definition = [
+            {'chunk_x': 'Integer'},
+            {'chunk_z': 'Integer'},
+            {'ground_up_continuous': 'Boolean'},
+            {'primary_bit_mask': 'UnsignedShort'},
+            {'data': 'VarIntPrefixedByteArray'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.chunk_x, self.chunk_z, self.ground_up_continuous, self.primary_bit_mask = _struct_22.unpack_from(buf, offset)
+            offset += 11
+            self.data, offset = _VarIntPrefixedByteArray_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_22.pack(self.chunk_x, self.chunk_z, self.ground_up_continuous, self.primary_bit_mask)
+            _VarIntPrefixedByteArray_write_to(self.data, buf)
+
+    classes['ChunkData'] = table[ChunkData.id] = ChunkData
+
+    class MultiBlockChange(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'MultiBlockChange'
+        __slots__ = ('chunk_x', 'chunk_z', 'records', '_lazy_data', '_lazy_starts')
+        id = 34
+        packet_name = 'multi block change'
+        definition = [
+            {'chunk_x': 'Integer'},
+            {'chunk_z': 'Integer'},
+            {'records': 'BlockChangeRecords'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.chunk_x, self.chunk_z = _struct_23.unpack_from(buf, offset)
+            offset += 8
+            self.records, offset = _BlockChangeRecords_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_23.pack(self.chunk_x, self.chunk_z)
+            _BlockChangeRecords_write_to(self.records, buf)
+
+    classes['MultiBlockChange'] = table[MultiBlockChange.id] = MultiBlockChange
+
+    class BlockChange(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'BlockChange'
+        __slots__ = ('location', 'block_state', '_lazy_data', '_lazy_starts')
+        id = 35
+        packet_name = 'block change'
+        definition = [
+            {'location': 'Position'},
+            {'block_state': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.location, offset = _Position_read_from(buf, offset)
+            self.block_state, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _Position_write_to(self.location, buf)
+            _VarInt_write_to(self.block_state, buf)
+
+    classes['BlockChange'] = table[BlockChange.id] = BlockChange
+
+    class MapChunkBulk(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'MapChunkBulk'
+        __slots__ = ('sky_light_sent', 'columns', 'data', '_lazy_data', '_lazy_starts')
+        id = 38
+        packet_name = 'map chunk bulk'
+        definition = [
+            {'sky_light_sent': 'Boolean'},
+            {'columns': 'ChunkBulkMeta'},
+            {'data': 'TrailingByteArray'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.sky_light_sent, = _struct_4.unpack_from(buf, offset)
+            offset += 1
+            self.columns, offset = _ChunkBulkMeta_read_from(buf, offset)
+            self.data, offset = _TrailingByteArray_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_4.pack(self.sky_light_sent)
+            _ChunkBulkMeta_write_to(self.columns, buf)
+            _TrailingByteArray_write_to(self.data, buf)
+
+    classes['MapChunkBulk'] = table[MapChunkBulk.id] = MapChunkBulk
+
+    class PluginMessage(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'PluginMessage'
+        __slots__ = ('data', 'channel', '_lazy_data', '_lazy_starts')
+        id = 63
+        packet_name = 'plugin message'
+        definition = [
+            {'data': 'VarIntPrefixedByteArray', 'channel': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.data, offset = _VarIntPrefixedByteArray_read_from(buf, offset)
+            self.channel, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarIntPrefixedByteArray_write_to(self.data, buf)
+            _String_write_to(self.channel, buf)
+
+    classes['PluginMessage'] = table[PluginMessage.id] = PluginMessage
+
+    class DisconnectPacketPlayState(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'DisconnectPacketPlayState'
+        __slots__ = ('json_data', '_lazy_data', '_lazy_starts')
+        id = 64
+        packet_name = 'disconnect'
+        definition = [
+            {'json_data': 'Chat'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.json_data, offset = _Chat_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _Chat_write_to(self.json_data, buf)
+
+    classes['DisconnectPacketPlayState'] = table[DisconnectPacketPlayState.id] = DisconnectPacketPlayState
+
+    class ServerDifficulty(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'ServerDifficulty'
+        __slots__ = ('difficulty', '_lazy_data', '_lazy_starts')
+        id = 65
+        packet_name = 'server difficulty'
+        definition = [
+            {'difficulty': 'UnsignedByte'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.difficulty, = _struct_11.unpack_from(buf, offset)
+            offset += 1
+            return offset
+
+        def write_fields(self, buf):
+            buf += _struct_11.pack(self.difficulty)
+
+    classes['ServerDifficulty'] = table[ServerDifficulty.id] = ServerDifficulty
+
+    class CombatEvent(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'CombatEvent'
+        __slots__ = ('event', 'duration', 'player_id', 'entity_id', 'message', '_lazy_data', '_lazy_starts')
+        id = 66
+        packet_name = 'combat event'
+        definition = [
+            {'event': 'VarInt'},
+            {'duration': ['VarInt', 'event', 1]},
+            {'player_id': ['VarInt', 'event', 2]},
+            {'entity_id': ['VarInt', 'event', 1, 2]},
+            {'message': ['VarInt', 'event', 2]},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.event, offset = _VarInt_read_from(buf, offset)
+            if self.event in (1,):
+                self.duration, offset = _VarInt_read_from(buf, offset)
+            else:
+                self.duration = None
+            if self.event in (2,):
+                self.player_id, offset = _VarInt_read_from(buf, offset)
+            else:
+                self.player_id = None
+            if self.event in (1, 2):
+                self.entity_id, offset = _VarInt_read_from(buf, offset)
+            else:
+                self.entity_id = None
+            if self.event in (2,):
+                self.message, offset = _VarInt_read_from(buf, offset)
+            else:
+                self.message = None
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.event, buf)
+            if self.event in (1,):
+                _VarInt_write_to(self.duration, buf)
+            if self.event in (2,):
+                _VarInt_write_to(self.player_id, buf)
+            if self.event in (1, 2):
+                _VarInt_write_to(self.entity_id, buf)
+            if self.event in (2,):
+                _VarInt_write_to(self.message, buf)
+
+    classes['CombatEvent'] = table[CombatEvent.id] = CombatEvent
+
+    class Camera(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'Camera'
+        __slots__ = ('camera_id', '_lazy_data', '_lazy_starts')
+        id = 67
+        packet_name = 'camera'
+        definition = [
+            {'camera_id': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.camera_id, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.camera_id, buf)
+
+    classes['Camera'] = table[Camera.id] = Camera
+
+    class WorldBorder(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'WorldBorder'
+        __slots__ = ('action', 'radius', 'old_radius', 'new_radius', 'speed', 'x', 'z', 'teleport_bounds', 'warning_time', 'warning_blocks', '_lazy_data', '_lazy_starts')
+        id = 68
+        packet_name = 'world border'
+        definition = [
+            {'action': 'VarInt'},
+            {'radius': ['Double', 'action', 0]},
+            {'old_radius': ['Double', 'action', 1]},
+            {'new_radius': ['Double', 'action', 1]},
+            {'speed': ['VarLong', 'action', 1]},
+            {'x': ['Double', 'action', 2, 3]},
+            {'z': ['Double', 'action', 2, 3]},
+            {'old_radius': ['Double', 'action', 3]},
+            {'new_radius': ['Double', 'action', 3]},
+            {'speed': ['VarLong', 'action', 3]},
+            {'teleport_bounds': ['VarInt', 'action', 3]},
+            {'warning_time': ['VarInt', 'action', 3, 4]},
+            {'warning_blocks': ['VarInt', 'action', 3, 5]},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+    classes['WorldBorder'] = table[WorldBorder.id] = WorldBorder
+
+    class Title(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'Title'
+        __slots__ = ('action', 'set_title', 'set_subtitle', 'fade_in', 'stay', 'fade_out', '_lazy_data', '_lazy_starts')
+        id = 69
+        packet_name = 'title'
+        definition = [
+            {'action': 'VarInt'},
+            {'set_title': ['Chat', 'action', 0]},
+            {'set_subtitle': ['Chat', 'action', 1]},
+            {'fade_in': ['Integer', 'action', 2]},
+            {'stay': ['Integer', 'action', 2]},
+            {'fade_out': ['Integer', 'action', 2]},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.action, offset = _VarInt_read_from(buf, offset)
+            if self.action in (0,):
+                self.set_title, offset = _Chat_read_from(buf, offset)
+            else:
+                self.set_title = None
+            if self.action in (1,):
+                self.set_subtitle, offset = _Chat_read_from(buf, offset)
+            else:
+                self.set_subtitle = None
+            if self.action in (2,):
+                self.fade_in, = _struct_24.unpack_from(buf, offset)
+                offset += 4
+            else:
+                self.fade_in = None
+            if self.action in (2,):
+                self.stay, = _struct_24.unpack_from(buf, offset)
+                offset += 4
+            else:
+                self.stay = None
+            if self.action in (2,):
+                self.fade_out, = _struct_24.unpack_from(buf, offset)
+                offset += 4
+            else:
+                self.fade_out = None
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.action, buf)
+            if self.action in (0,):
+                _Chat_write_to(self.set_title, buf)
+            if self.action in (1,):
+                _Chat_write_to(self.set_subtitle, buf)
+            if self.action in (2,):
+                buf += _struct_24.pack(self.fade_in)
+            if self.action in (2,):
+                buf += _struct_24.pack(self.stay)
+            if self.action in (2,):
+                buf += _struct_24.pack(self.fade_out)
+
+    classes['Title'] = table[Title.id] = Title
+
+    class SetCompressionPacketPlayState(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SetCompressionPacketPlayState'
+        __slots__ = ('threshold', '_lazy_data', '_lazy_starts')
+        id = 70
+        packet_name = 'set compression'
+        definition = [
+            {'threshold': 'VarInt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.threshold, offset = _VarInt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.threshold, buf)
+
+    classes['SetCompressionPacketPlayState'] = table[SetCompressionPacketPlayState.id] = SetCompressionPacketPlayState
+
+    class PlayerList(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'PlayerList'
+        __slots__ = ('header', 'footer', '_lazy_data', '_lazy_starts')
+        id = 71
+        packet_name = 'update player list'
+        definition = [
+            {'header': 'Chat'},
+            {'footer': 'Chat'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.header, offset = _Chat_read_from(buf, offset)
+            self.footer, offset = _Chat_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _Chat_write_to(self.header, buf)
+            _Chat_write_to(self.footer, buf)
+
+    classes['PlayerList'] = table[PlayerList.id] = PlayerList
+
+    class SendResourcePack(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'SendResourcePack'
+        __slots__ = ('url', 'hash', '_lazy_data', '_lazy_starts')
+        id = 72
+        packet_name = 'send resource pack'
+        definition = [
+            {'url': 'String'},
+            {'hash': 'String'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.url, offset = _String_read_from(buf, offset)
+            self.hash, offset = _String_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _String_write_to(self.url, buf)
+            _String_write_to(self.hash, buf)
+
+    classes['SendResourcePack'] = table[SendResourcePack.id] = SendResourcePack
+
+    class UpdateNBT(Packet):
+        __module__ = 'minecraft.networking.packets'
+        __qualname__ = 'UpdateNBT'
+        __slots__ = ('entity_id', 'tag', '_lazy_data', '_lazy_starts')
+        id = 73
+        packet_name = 'update entity nbt'
+        definition = [
+            {'entity_id': 'VarInt'},
+            {'tag': 'Nbt'},
+        ]
+        _lazy_plan = lazy_plan(definition)
+
+        def read_from(self, buf, offset):
+            self.entity_id, offset = _VarInt_read_from(buf, offset)
+            self.tag, offset = _Nbt_read_from(buf, offset)
+            return offset
+
+        def write_fields(self, buf):
+            _VarInt_write_to(self.entity_id, buf)
+            _Nbt_write_to(self.tag, buf)
+
+    classes['UpdateNBT'] = table[UpdateNBT.id] = UpdateNBT
+    return tables, classes
@@ -0,0 +1,257 @@
+"""Runs connections on an asyncio event loop instead of networking threads.
+
+:class:`AsyncConnection` reuses the reactors and packet classes of
+:mod:`connection`, so logging in and answering keep alives behaves exactly
+like a threaded :class:`connection.Connection`. Any number of connections
+can share one event loop.
+
+This module requires Python 3.7+.
+"""
+import asyncio
+import socket
+
+from . import framing
+from . import packets
+from ..compat import perf_counter
+from .connection import Connection, LoginReactor, StatusReactor
+
+
+class _TransportSocket(object):
+    # Lets code which writes to a socket, such as the encryption wrapper,
+    # write to an asyncio transport instead
+    def __init__(self, transport):
+        self.transport = transport
+        self.actual_socket = transport.get_extra_info("socket")
+
+    def sendall(self, data):
+        self.transport.write(data)
+
+    def send(self, data):
+        self.transport.write(data)
+        return len(data)
+
+    def fileno(self):
+        return self.actual_socket.fileno()
+
+
+class _LoopWaker(object):
+    # Schedules a flush of the outgoing queue, and the connection's other
+    # pending work such as delivering the packets decoded by a decode
+    # pipeline, on the connection's loop. write_packet may be called from
+    # any thread.
+    def __init__(self, connection):
+        self.connection = connection
+        self._pending = False
+
+    def wake(self):
+        if self._pending:
+            return
+        self._pending = True
+        self.connection.loop.call_soon_threadsafe(self._flush)
+
+    def _flush(self):
+        self._pending = False
+        if self.connection.transport is not None:
+            self.connection._run_pending()
+            self.connection._flush_outgoing()
+
+
+class _Protocol(asyncio.BufferedProtocol):
+    def __init__(self, connection):
+        self.connection = connection
+        self._paused = False
+        self._drain_waiters = []
+
+    def connection_made(self, transport):
+        self.connection.transport = transport
+
+    def get_buffer(self, sizehint):
+        return self.connection.frame_reader.get_buffer()
+
+    def buffer_updated(self, nbytes):
+        self.connection.frame_reader.buffer_updated(nbytes)
+        self.connection._read_packets()
+
+    def eof_received(self):
+        return False
+
+    def connection_lost(self, exc):
+        self.connection._connection_lost(exc)
+        self._wake_drain_waiters(exc)
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        self._wake_drain_waiters(None)
+
+    def _wake_drain_waiters(self, exc):
+        for waiter in self._drain_waiters:
+            if not waiter.done():
+                if exc is None:
+                    waiter.set_result(None)
+                else:
+                    waiter.set_exception(exc)
+        self._drain_waiters = []
+
+    async def drain(self):
+        if self.connection.transport.is_closing():
+            raise ConnectionError("Connection closed")
+        if not self._paused:
+            return
+        waiter = self.connection.loop.create_future()
+        self._drain_waiters.append(waiter)
+        await waiter
+
+
+_CLOSED = object()
+
+
+class AsyncConnection(Connection):
+    """A :class:`connection.Connection` driven by an asyncio event loop.
+
+    Packets can be consumed with ``async for packet in conn.packets(...)``
+    or ``await conn.wait_for(PacketClass)``, and sent with
+    ``await conn.send(packet)``.
+    """
+    transport = None
+
+    def __init__(self, address, port, auth_token, loop=None,
+                 write_buffer_high=64 * 1024, write_buffer_low=16 * 1024,
+                 **options):
+        """
+        :param loop: The event loop to run on, the running loop by default
+        :param write_buffer_high(int): :meth:`send` waits for the transport
+                                       to drain once this many bytes are
+                                       buffered
+        :param write_buffer_low(int): Buffered byte count at which waiting
+                                      senders are resumed
+        :param options: See :class:`connection.Connection`
+        """
+        super(AsyncConnection, self).__init__(address, port, auth_token,
+                                              **options)
+        self.loop = loop
+        self.write_buffer_high = write_buffer_high
+        self.write_buffer_low = write_buffer_low
+        self.closed = None
+        self._protocol = None
+
+    async def _open(self):
+        if self.loop is None:
+            self.loop = asyncio.get_running_loop()
+        self.frame_reader = framing.FrameReader(None)
+        self.closed = self.loop.create_future()
+        self._waker = _LoopWaker(self)
+
+        self._login_started = perf_counter()
+        self.login_timings = {}
+        transport, self._protocol = await self.loop.create_connection(
+            lambda: _Protocol(self), self.options.address, self.options.port)
+        self._record_login("connect")
+        transport.set_write_buffer_limits(self.write_buffer_high,
+                                          self.write_buffer_low)
+        self.socket = _TransportSocket(transport)
+        if self.options.tcp_nodelay:
+            self._set_tcp_option(socket.TCP_NODELAY, 1)
+
+    async def connect(self):
+        """Connects to the server and starts logging in"""
+        await self._open()
+        self._handshake()
+
+        self.reactor = LoginReactor(self)
+        login_start_packet = self.protocol.serverbound(
+            "login", "LoginStartPacket")()
+        login_start_packet.name = self.auth_token.profile.name
+        self.write_packet(login_start_packet)
+        self.connected = True
+
+    async def status(self):
+        """Connects to the server and requests its status"""
+        await self._open()
+        self._handshake(1)
+        self.reactor = StatusReactor(self)
+        self.write_packet(
+            self.protocol.serverbound("status", "RequestPacket")())
+
+    def _stop_network_thread(self):
+        # Queued packets are written by the transport before it closes
+        self._flush_outgoing()
+        self.transport.close()
+
+    def close(self):
+        """Closes the connection"""
+        if self.transport is not None:
+            self.transport.close()
+
+    def _connection_lost(self, exc):
+        self.connected = False
+        self.playing = False
+        self.transport = None
+        if not self.closed.done():
+            self.closed.set_result(exc)
+        for listener in list(self.packet_listeners):
+            if isinstance(listener, _QueueListener):
+                listener.queue.put_nowait(_CLOSED)
+            elif isinstance(listener, _FutureListener):
+                if not listener.future.done():
+                    listener.future.set_exception(
+                        ConnectionError("Connection closed"))
+
+    async def send(self, packet):
+        """Writes a packet and waits until the transport's buffer is below
+        its high water mark
+        """
+        self.write_packet(packet)
+        self._flush_outgoing()
+        await self._protocol.drain()
+
+    async def packets(self, *packet_types):
+        """Asynchronously iterates over received packets of the given types,
+        until the connection is closed.
+        """
+        listener = _QueueListener(asyncio.Queue(), *packet_types)
+        self._add_packet_listener(listener)
+        try:
+            while True:
+                packet = await listener.queue.get()
+                if packet is _CLOSED:
+                    return
+                yield packet
+        finally:
+            self.unregister_packet_listener(listener)
+
+    async def wait_for(self, packet_type, timeout=None):
+        """Waits for the next packet of the given type
+
+        :param timeout: Seconds to wait before raising asyncio.TimeoutError
+        """
+        listener = _FutureListener(self.loop.create_future(), packet_type)
+        self._add_packet_listener(listener)
+        try:
+            return await asyncio.wait_for(listener.future, timeout)
+        finally:
+            self.unregister_packet_listener(listener)
+
+
+class _QueueListener(packets.PacketListener):
+    keeps_packets = True
+
+    def __init__(self, queue, *args):
+        self.queue = queue
+        super(_QueueListener, self).__init__(queue.put_nowait, *args,
+                                             inline=True)
+
+
+class _FutureListener(packets.PacketListener):
+    keeps_packets = True
+
+    def __init__(self, future, *args):
+        self.future = future
+        super(_FutureListener, self).__init__(self._resolve, *args,
+                                              inline=True)
+
+    def _resolve(self, packet):
+        if not self.future.done():
+            self.future.set_result(packet)
@@ -0,0 +1,205 @@
+"""Bulk decoding of numeric arrays and item slots.
+
+Arrays of fixed-width numbers are copied out of a buffer in one go into an
+``array.array``, or a NumPy array when asked for and NumPy is installed,
+rather than being unpacked into a list one element at a time. The protocol
+is big-endian, so on little-endian machines the copy is byte-swapped in
+place afterwards.
+
+Lists of item slots are decoded into :class:`Slots`, which keeps one array
+per field instead of a dict per slot.
+"""
+from array import array
+import struct
+import sys
+
+from . import nbt
+
+_BIG_ENDIAN = sys.byteorder == "big"
+
+# The array typecode with the same width as each struct format character,
+# 'i' and 'l' vary between platforms
+_TYPECODES = {}
+for _code in "bBhHiIqQfd":
+    _size = struct.calcsize(_code)
+    for _typecode in (_code, _code.replace("i", "l").replace("I", "L")):
+        if array(_typecode).itemsize == _size:
+            _TYPECODES[_code] = _typecode
+            break
+
+
+def _numpy():
+    # NumPy takes longer to import than the whole protocol, so it is only
+    # imported once NumPy arrays are asked for
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("Decoding into NumPy arrays requires NumPy")
+    return numpy
+
+
+if hasattr(array, "frombytes"):
+    _frombytes, _tobytes = array.frombytes, array.tobytes
+else:
+    _frombytes = lambda values, data: values.fromstring(bytes(data))
+    _tobytes = array.tostring
+
+
+def read_array(buf, offset, count, code, use_numpy=False):
+    """Reads ``count`` big-endian numbers out of a buffer
+
+    :param buf: A buffer, such as a memoryview of a frame
+    :param offset(int): Where the first number starts
+    :param count(int): The number of numbers
+    :param code(str): The numbers' struct format character, such as 'i'
+    :param use_numpy(bool): Return a NumPy array rather than an array.array
+    :return: The numbers in native byte order and the offset past them. The
+             numbers are a copy, so the buffer may be reused afterwards.
+    """
+    end = offset + count * struct.calcsize(code)
+    if end > len(buf):
+        raise ValueError("%d values of type %r don't fit in the buffer"
+                         % (count, code))
+    if use_numpy:
+        values = _numpy().frombuffer(buf, ">" + code, count, offset)
+        return values.astype(values.dtype.newbyteorder("=")), end
+
+    values = array(_TYPECODES[code])
+    _frombytes(values, buf[offset:end])
+    if not _BIG_ENDIAN:
+        values.byteswap()
+    return values, end
+
+
+def write_array(values, code, buf):
+    """Appends numbers to a bytearray in big-endian order
+
+    :param values: An array.array, a NumPy array or any sequence of numbers
+    :param code(str): The numbers' struct format character, such as 'i'
+    """
+    # values can't be a NumPy array unless NumPy has been imported
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        buf += values.astype(">" + code).tobytes()
+    elif isinstance(values, array) and values.typecode == _TYPECODES[code]:
+        if not _BIG_ENDIAN:
+            values = array(values.typecode, values)
+            values.byteswap()
+        buf += _tobytes(values)
+    else:
+        buf += struct.pack(">%d%s" % (len(values), code), *values)
+
+
+def as_numpy(values):
+    """Turns an array.array into a NumPy array sharing its memory"""
+    return _numpy().frombuffer(values, values.typecode)
+
+
+_ITEM_ID = struct.Struct(">h")
+_ITEM = struct.Struct(">bhB")
+_ITEM_FIELDS = struct.Struct(">bh")
+
+
+class Slots(object):
+    """A list of item slots, stored as one array per field
+
+    Indexing or iterating gives the same dicts as reading each slot with
+    types.Slot would, but the arrays are meant to be used directly.
+
+    :ivar ids: The item id of each slot, -1 for empty slots
+    :ivar counts: The number of items in each slot, 0 for empty slots
+    :ivar damages: The damage of each slot's item, 0 for empty slots
+    :ivar nbt: Maps slot indices to the NBT of items which have any
+    """
+    __slots__ = ("ids", "counts", "damages", "nbt")
+
+    def __init__(self, ids, counts, damages, nbt=None):
+        self.ids = ids
+        self.counts = counts
+        self.damages = damages
+        self.nbt = {} if nbt is None else nbt
+
+    @classmethod
+    def from_items(cls, items):
+        """Builds Slots out of slot dicts as read by types.Slot"""
+        ids, counts, damages, tags = array("h"), array("b"), array("h"), {}
+        for index, item in enumerate(items):
+            ids.append(item["id"])
+            counts.append(item.get("count", 0))
+            damages.append(item.get("damage", 0))
+            if item.get("nbt") is not None:
+                tags[index] = item["nbt"]
+        return cls(ids, counts, damages, tags)
+
+    @classmethod
+    def read_from(cls, buf, offset, count, nbt_mode=nbt.EAGER,
+                  use_numpy=False):
+        """Reads ``count`` consecutive slots out of a buffer
+
+        :param nbt_mode: How the items' NBT is read, see types.Slot
+        :return: The Slots and the offset past them
+        """
+        ids, counts, damages, tags = [], [], [], {}
+        add_id, add_count, add_damage = ids.append, counts.append, \
+            damages.append
+        unpack_id, unpack_item = _ITEM_ID.unpack_from, _ITEM.unpack_from
+        read_nbt = nbt.read_from
+        for index in range(count):
+            item_id, = unpack_id(buf, offset)
+            add_id(item_id)
+            if item_id == -1:
+                add_count(0)
+                add_damage(0)
+                offset += 2
+                continue
+            # Also peeks at the first byte of the NBT, most items have none
+            # which is a single TAG_End
+            item_count, damage, tag_type = unpack_item(buf, offset + 2)
+            add_count(item_count)
+            add_damage(damage)
+            offset += 5
+            if tag_type == 0:
+                offset += 1
+            else:
+                tag, offset = read_nbt(buf, offset, nbt_mode)
+                if tag is not None:
+                    tags[index] = tag
+
+        ids, counts, damages = (array("h", ids), array("b", counts),
+                                array("h", damages))
+        if use_numpy:
+            ids, counts, damages = as_numpy(ids), as_numpy(counts), \
+                as_numpy(damages)
+        return cls(ids, counts, damages, tags), offset
+
+    def write_to(self, buf):
+        """Appends the slots, without their count, to a bytearray"""
+        pack_id, pack_item = _ITEM_ID.pack, _ITEM_FIELDS.pack
+        for index in range(len(self.ids)):
+            item_id = int(self.ids[index])
+            buf += pack_id(item_id)
+            if item_id == -1:
+                continue
+            buf += pack_item(int(self.counts[index]),
+                             int(self.damages[index]))
+            nbt.write_to(self.nbt.get(index), buf)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self.ids)
+        item = {"id": int(self.ids[index])}
+        if item["id"] != -1:
+            item["count"] = int(self.counts[index])
+            item["damage"] = int(self.damages[index])
+            item["nbt"] = self.nbt.get(index)
+        return item
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self[index]
+
+    def __repr__(self):
+        return "Slots(%r)" % list(self)
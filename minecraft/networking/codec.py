@@ -0,0 +1,230 @@
+"""Compiles packet definitions into specialised read and write functions.
+
+Going through a packet's definition for every packet means looking up the
+type of each field by name and making a separate call per field. Instead,
+the packet classes built from packets.json get their read_from and
+write_fields methods generated from their definition when the class is
+created. Runs of consecutive fixed-width fields are merged into a single
+struct.Struct and conditional fields become plain if statements.
+"""
+from collections import OrderedDict
+import keyword
+import re
+import struct
+
+from . import types
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def get_data_type(name):
+    """Looks up a type in :mod:`types` by name
+
+    :return: The type or None if there is no such type
+    """
+    data_type = types.__dict__.get(name)
+    if isinstance(data_type, type) and issubclass(data_type, types.Type):
+        return data_type
+    return None
+
+
+def parse_definition(definition):
+    """Flattens a packet definition into a list of
+    (name, type, condition) tuples.
+
+    The condition is None for fields which are always present, otherwise it
+    is a (field name, values) tuple: the field is only present when the
+    named field has one of the values.
+    """
+    fields = []
+    for field in definition:
+        for var_name, data_type in field.items():
+            condition = None
+            if isinstance(data_type, list):
+                condition = (data_type[1], tuple(data_type[2:]))
+                data_type = data_type[0]
+            fields.append((var_name, get_data_type(data_type), condition))
+    return fields
+
+
+def _group_fields(fields):
+    # Yields lists of fields which are read with a single call, runs of
+    # unconditional fixed-width fields end up in the same list
+    run = []
+    for field in fields:
+        var_name, data_type, condition = field
+        if condition is None and data_type.struct_format is not None:
+            run.append(field)
+            continue
+        if run:
+            yield run
+            run = []
+        yield [field]
+    if run:
+        yield run
+
+
+class CodecCompiler(object):
+    """Generates and compiles the codec functions of packet classes.
+
+    Struct objects and type methods used by the generated code are kept in
+    a namespace shared by every packet compiled by the same compiler. Each
+    entry of that namespace is also recorded as a Python expression in
+    :attr:`prelude`, so generated code can be written out as a module.
+    """
+    def __init__(self):
+        self.prelude = OrderedDict()
+        self.namespace = {"struct": struct, "types": types}
+        self._struct_names = {}
+
+    def _struct(self, fmt):
+        if fmt not in self._struct_names:
+            name = "_struct_%d" % len(self._struct_names)
+            self._struct_names[fmt] = name
+            self.prelude[name] = "struct.Struct(%r)" % fmt
+            self.namespace[name] = struct.Struct(fmt)
+        return self._struct_names[fmt]
+
+    def _method(self, data_type, method):
+        name = "_%s_%s" % (data_type.__name__, method)
+        if name not in self.prelude:
+            self.prelude[name] = "types.%s.%s" % (data_type.__name__, method)
+            self.namespace[name] = getattr(data_type, method)
+        return name
+
+    def _fixed_struct(self, fields):
+        fmt = ">" + "".join(data_type.struct_format.lstrip(">")
+                            for _, data_type, _ in fields)
+        return self._struct(fmt), struct.calcsize(fmt)
+
+    def generate(self, definition):
+        """Generates the source of the read_from and write_fields functions
+        for a definition.
+
+        :return: The source code or None if the definition can't be
+                 compiled, in which case the packet should keep using the
+                 generic methods of :class:`packets.Packet`
+        """
+        fields = parse_definition(definition)
+        for var_name, data_type, condition in fields:
+            if data_type is None:
+                return None
+            names = [var_name] if condition is None else [var_name,
+                                                          condition[0]]
+            for name in names:
+                if not _IDENTIFIER.match(name) or keyword.iskeyword(name):
+                    return None
+
+        read = ["def read_from(self, buf, offset):"]
+        write = ["def write_fields(self, buf):"]
+        assigned = set()
+        for group in _group_fields(fields):
+            var_name, data_type, condition = group[0]
+            indent = "    "
+            if condition is not None:
+                test = "    if self.%s in %r:" % condition
+                read.append(test)
+                write.append(test)
+                indent = "        "
+
+            if data_type.struct_format is not None:
+                struct_name, size = self._fixed_struct(group)
+                targets = ", ".join("self.%s" % name for name, _, _ in group)
+                unpacked = targets + ("," if len(group) == 1 else "")
+                read.append(indent + "%s = %s.unpack_from(buf, offset)"
+                            % (unpacked, struct_name))
+                read.append(indent + "offset += %d" % size)
+                write.append(indent + "buf += %s.pack(%s)"
+                             % (struct_name, targets))
+            else:
+                read.append(indent + "self.%s, offset = %s(buf, offset)"
+                            % (var_name, self._method(data_type, "read_from")))
+                write.append(indent + "%s(self.%s, buf)"
+                             % (self._method(data_type, "write_to"), var_name))
+
+            # A missing field reads as None, unless a field of the same name
+            # was already read earlier in the packet
+            if condition is not None and var_name not in assigned:
+                read.append("    else:")
+                read.append("        self.%s = None" % var_name)
+            assigned.update(name for name, _, _ in group)
+
+        read.append("    return offset")
+        if len(write) == 1:
+            write.append("    pass")
+        return "\n".join(read + [""] + write) + "\n"
+
+    def compile(self, definition):
+        """Compiles the codec functions for a definition.
+
+        :return: A dict holding the read_from and write_fields functions,
+                 empty if the definition can't be compiled
+        """
+        source = self.generate(definition)
+        if source is None:
+            return {}
+        functions = {}
+        code = compile(source, "<packet codec>", "exec")
+        exec(code, self.namespace, functions)
+        return functions
+
+
+class LazyPlan(object):
+    """Tells a lazily decoded packet where each of its fields starts.
+
+    Fields preceded only by unconditional fixed-width fields have an offset
+    known in advance, the others are found by skipping over the fields in
+    front of them the first time they are needed.
+    """
+    def __init__(self, fields):
+        """
+        :param fields: The fields as returned by :func:`parse_definition`,
+                       every type has to be known
+        """
+        self.fields = fields
+        # Width of each field, None for variable-length fields
+        self.sizes = []
+        # Offset of each field from the start of the packet's fields, None
+        # if it depends on the fields in front of it
+        self.static_offsets = []
+        # Maps field names to the indices of the fields with that name,
+        # a name may be used by several conditional fields
+        self.by_name = {}
+        # Maps the names of fields found at a static offset, which no other
+        # field shares, to their (read_from, offset)
+        self.static_readers = {}
+
+        offset = 0
+        for index, (var_name, data_type, condition) in enumerate(fields):
+            size = None
+            if data_type.struct_format is not None:
+                size = struct.calcsize(data_type.struct_format)
+            self.sizes.append(size)
+            self.static_offsets.append(offset)
+            if offset is not None:
+                if condition is not None or size is None:
+                    offset = None
+                else:
+                    offset += size
+            self.by_name[var_name] = self.by_name.get(var_name, ()) + (index,)
+
+        for var_name, indices in self.by_name.items():
+            index = indices[0]
+            if len(indices) == 1 and fields[index][2] is None and \
+                    self.static_offsets[index] is not None:
+                self.static_readers[var_name] = (
+                    fields[index][1].read_from, self.static_offsets[index])
+
+
+def lazy_plan(definition):
+    """
+    :return: The :class:`LazyPlan` of a definition, or None if it uses types
+             which don't exist
+    """
+    fields = parse_definition(definition)
+    if any(data_type is None for _, data_type, _ in fields):
+        return None
+    return LazyPlan(fields)
+
+
+compiler = CodecCompiler()
@@ -0,0 +1,124 @@
+"""Decides how the packets a connection sends are compressed.
+
+Once the server has set a compression threshold, every packet longer than
+it used to be compressed with zlib at its default level. A
+:class:`CompressionPolicy`, the connection's ``compression_policy``
+option, chooses the level and strategy instead, and sends payloads that
+don't compress well, such as encrypted or already compressed plugin
+messages, as they are with a data length of 0, which the protocol allows
+for packets of any size. Its :class:`CompressionStats` tell how many bytes
+compression saved for how much CPU time.
+"""
+import zlib
+
+# zlib runs on the sending thread, so the time it takes is CPU time
+from ..compat import perf_counter
+
+
+class CompressionStats(object):
+    """Counts the work done by a :class:`CompressionPolicy`
+
+    Only packets over the compression threshold are counted.
+    """
+    def __init__(self):
+        # Packets sent compressed
+        self.compressed = 0
+        # Packets sent uncompressed as they didn't compress well enough,
+        # including those which weren't even tried
+        self.skipped = 0
+        # The size of the payloads, and what was sent for them
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Seconds spent compressing, including payloads then sent
+        # uncompressed
+        self.seconds = 0.0
+
+    @property
+    def bytes_saved(self):
+        return self.bytes_in - self.bytes_out
+
+    @property
+    def ratio(self):
+        """The size sent as a fraction of the size of the payloads"""
+        if self.bytes_in == 0:
+            return 1.0
+        return float(self.bytes_out) / self.bytes_in
+
+    @property
+    def bytes_saved_per_second(self):
+        """The bytes saved per second of CPU time spent compressing"""
+        if self.seconds == 0:
+            return 0.0
+        return self.bytes_saved / self.seconds
+
+
+class CompressionPolicy(object):
+    """Compresses the payloads of outgoing packets
+
+    A policy keeps counts and per packet state, so each connection needs
+    one of its own.
+    """
+    def __init__(self, level=zlib.Z_DEFAULT_COMPRESSION,
+                 strategy=zlib.Z_DEFAULT_STRATEGY, min_saving=0.05,
+                 backoff=32):
+        """
+        :param level(int): The zlib level, from 1 (fastest) to 9 (smallest),
+                           0 sends every packet uncompressed
+        :param strategy(int): The zlib strategy, such as zlib.Z_FILTERED or
+                              zlib.Z_RLE
+        :param min_saving(float): The fraction of a payload compression has
+                                  to save for it to be sent compressed
+        :param backoff(int): The number of packets of the same id sent
+                             uncompressed without trying, after one didn't
+                             compress well enough
+        """
+        self.level = level
+        self.strategy = strategy
+        self.min_saving = min_saving
+        self.backoff = backoff
+        self.stats = CompressionStats()
+        # Packet ids whose payloads aren't worth compressing, with the
+        # number of packets left before trying again
+        self._skipping = {}
+
+    def compress(self, packet_id, payload):
+        """
+        :param packet_id(int): The id of the packet being sent
+        :param payload: The packet's id and fields, over the compression
+                        threshold
+        :return: The compressed payload, or None to send it uncompressed
+        """
+        stats = self.stats
+        size = len(payload)
+        stats.bytes_in += size
+        left = self._skipping.get(packet_id)
+        if left is not None or self.level == 0:
+            if left is not None:
+                if left > 1:
+                    self._skipping[packet_id] = left - 1
+                else:
+                    del self._skipping[packet_id]
+            stats.skipped += 1
+            stats.bytes_out += size
+            return None
+
+        started = perf_counter()
+        if self.strategy == zlib.Z_DEFAULT_STRATEGY:
+            compressed = zlib.compress(payload, self.level)
+        else:
+            # Each packet is a zlib stream of its own, so the compressor
+            # can't be kept from one packet to the next
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED,
+                                          zlib.MAX_WBITS, 8, self.strategy)
+            compressed = compressor.compress(payload) + compressor.flush()
+        stats.seconds += perf_counter() - started
+
+        if len(compressed) > size * (1 - self.min_saving):
+            if self.backoff > 0:
+                self._skipping[packet_id] = self.backoff
+            stats.skipped += 1
+            stats.bytes_out += size
+            return None
+        stats.compressed += 1
+        stats.bytes_out += len(compressed)
+        return compressed
@@ -1,23 +1,153 @@
 from collections import deque
 from threading import Lock
-from zlib import decompress
+import zlib
 import threading
 import socket
 import time
 import select
+import errno
+try:
+    import selectors
+except ImportError:  # pragma: no cover
+    # Python 2, only ConnectionManager needs it
+    selectors = None
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: no cover
+    # Python 2 without the futures backport, logins then run on the
+    # networking thread
+    ThreadPoolExecutor = None
 
 from .types import VarInt
 from . import packets
 from . import encryption
+from . import framing
+from .registry import registry
+from .compression import CompressionPolicy
 from .. import PROTOCOL_VERSION
+from ..compat import perf_counter
+
+
+# The most a compressed packet may decompress to
+MAX_DATA_LENGTH = 2 ** 21
+
+
+def peek_id(data, data_length):
+    """
+    :param data: A compressed packet
+    :param data_length(int): The size the packet decompresses to
+    :return: The packet's id, inflating no more than needed to read it
+    """
+    head = zlib.decompressobj().decompress(data, min(5, data_length))
+    return VarInt.read_from(head, 0)[0]
+
+
+def inflate(data, data_length, wanted=None):
+    """Decompresses a compressed packet
+
+    :param data: The compressed packet
+    :param data_length(int): The size the packet decompresses to
+    :param wanted: A function given the packet's id, which is peeked at
+                   first, the packet is only decompressed if it returns true
+    :return: The decompressed packet, or None if it isn't wanted
+    :raises ValueError: If the packet doesn't decompress to data_length
+                        bytes, or data_length is over the protocol's limit
+    """
+    if data_length > MAX_DATA_LENGTH:
+        raise ValueError("Packet claims to decompress to %d bytes, more "
+                         "than the protocol's limit" % data_length)
+    # Only the first few bytes are inflated to find out whether the packet
+    # is wanted at all. Inflating them again is cheaper than joining them
+    # to the rest of a large packet afterwards.
+    if wanted is not None and not wanted(peek_id(data, data_length)):
+        return None
+    # Nothing beyond the size the packet announced is ever inflated
+    decompressor = zlib.decompressobj()
+    packet = decompressor.decompress(data, data_length)
+    if len(packet) != data_length or decompressor.unconsumed_tail:
+        raise ValueError("Packet doesn't decompress to the %d bytes it "
+                         "announced" % data_length)
+    return packet
+
+
+_login_executor = None
+_login_executor_lock = Lock()
+
+
+def _shared_login_executor():
+    # Returns the thread pool logins run on by default, or None where
+    # there is no concurrent.futures
+    global _login_executor
+    if _login_executor is None and ThreadPoolExecutor is not None:
+        with _login_executor_lock:
+            if _login_executor is None:
+                _login_executor = ThreadPoolExecutor(16)
+    return _login_executor
 
 
 class _ConnectionOptions(object):
-    # TODO: allow these options to be overriden from a constructor below
     address = None
     port = None
     compression_threshold = -1
     compression_enabled = False
+    # Queued packets are already coalesced into one write per flush, so
+    # Nagle's algorithm only adds latency
+    tcp_nodelay = True
+    # Holds back partial TCP segments while a flush is being written out,
+    # only has an effect where TCP_CORK exists (Linux)
+    tcp_cork = False
+    # Received packets decode each field only once it is accessed, see
+    # packets.Packet.read_lazy
+    lazy_packets = False
+    # The protocol version to speak, it has to be known to
+    # registry.registry
+    protocol_version = PROTOCOL_VERSION
+    # Packet classes whose received instances are recycled once the reactor
+    # and every listener have seen them, listeners must then not keep
+    # those packets around unless they set keeps_packets. Lazily read
+    # packets are never recycled.
+    pooled_packets = ()
+    # A minecraft.world.World kept up to date with the chunks and blocks
+    # the server sends while playing
+    world = None
+    # A minecraft.entities.EntityTracker kept up to date with the entities
+    # the server spawns, moves and destroys
+    entities = None
+    # A dispatch.ListenerExecutor which calls the packet listeners, other
+    # than inline ones, instead of the networking thread. Pooled packets
+    # aren't recycled then, as listeners may still hold them.
+    listener_executor = None
+    # A pipeline.DecodePipeline which decodes chunks and other heavy
+    # packets on an executor, off the networking thread
+    decode_pipeline = None
+    # A concurrent.futures executor running the RSA encryption and the
+    # session server join of the login, by default a thread pool shared by
+    # every connection
+    login_executor = None
+    # The compression.CompressionPolicy compressing the packets sent once
+    # the server has enabled compression, a connection without one gets
+    # one with the default settings
+    compression_policy = None
+
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            if not hasattr(self, key):
+                raise TypeError("Unknown connection option '%s'" % key)
+            setattr(self, key, value)
+
+
+class WriteStats(object):
+    """Counts the writes made by a connection's networking thread"""
+    def __init__(self):
+        self.flushes = 0
+        self.packets = 0
+        self.bytes = 0
+
+    @property
+    def packets_per_flush(self):
+        if self.flushes == 0:
+            return 0.0
+        return float(self.packets) / self.flushes
 
 
 class Connection(object):
@@ -25,11 +155,11 @@ class Connection(object):
     server, it handles everything from connecting, sending packets to
     handling default network behaviour
     """
-    _outgoing_packet_queue = deque()
-    _write_lock = Lock()
     networking_thread = None
-    options = _ConnectionOptions()
-    packet_listeners = []
+    #: The :class:`ConnectionManager` running this connection, if any
+    manager = None
+    # Wakes the networking thread whenever something is queued for it
+    _waker = None
 
     # The reactor handles all the default responses to packets,
     # it should be changed per networking state
@@ -37,7 +167,7 @@ class Connection(object):
     #: Indicates if this connection is spawned in the Minecraft game world
     spawned = False
 
-    def __init__(self, address, port, auth_token):
+    def __init__(self, address, port, auth_token, manager=None, **options):
         """Sets up an instance of this object to be able to connect to a
         minecraft server.
 
@@ -47,18 +177,67 @@ class Connection(object):
         :param address: address of the server to connect to
         :param port(int): port of the server to connect to
         :param auth_token: :class:`authentication.AuthenticationToken` object.
+        :param manager: :class:`ConnectionManager` that should run this
+                        connection's networking, by default the connection
+                        gets a thread of its own
+        :param options: Overrides for the attributes of
+                        :class:`_ConnectionOptions`
         """
+        self._outgoing_packet_queue = deque()
+        self._write_lock = Lock()
+        # Data a ConnectionManager's non-blocking socket hasn't taken yet,
+        # already encrypted if the connection is
+        self._unsent = bytearray()
+        # Kept sorted by priority, highest first
+        self.packet_listeners = []
+        # Maps packet classes to the callbacks of the listeners interested
+        # in them, filled in as packets are received
+        self._listener_index = {}
+        # Maps packet classes to whether a listener keeps their packets
+        self._kept_index = {}
+        # packets.PacketPool of each class in options.pooled_packets
+        self._packet_pools = {}
+        self.options = _ConnectionOptions(address=address, port=port,
+                                          **options)
+        #: The :class:`registry.Protocol` with the packet tables used
+        self.protocol = registry.get(self.options.protocol_version)
+        self.manager = manager
+        #: The options' :class:`minecraft.world.World`, if any
+        self.world = self.options.world
+        #: The options' :class:`minecraft.entities.EntityTracker`, if any
+        self.entities = self.options.entities
+        if self.options.compression_policy is None:
+            self.options.compression_policy = CompressionPolicy()
+
         self.connected = False
         self.playing = False
-        self.options.address = address
-        self.options.port = port
         self.auth_token = auth_token
         self.reactor = PacketReactor(self)
+        self.write_stats = WriteStats()
+        #: The seconds from the start of connecting to each stage of the
+        #: login reached so far: "connect", "encryption request", "join",
+        #: "encryption response" and "login success"
+        self.login_timings = {}
+        self._login_started = None
+        # Functions to be run by the networking thread, see _call_soon
+        self._calls = deque()
 
     def _start_network_thread(self):
+        if self.manager is not None:
+            self.manager.add(self)
+            return
+        self._waker = _Waker()
         self.networking_thread = NetworkingThread(self)
         self.networking_thread.start()
 
+    def _stop_network_thread(self):
+        # Stops networking once the outgoing queue has been written out
+        if self.manager is not None:
+            self.manager.remove(self)
+        else:
+            self.networking_thread.interrupt = True
+            self._waker.wake()
+
     def write_packet(self, packet, force=False):
         """Writes a packet to the server.
 
@@ -73,27 +252,80 @@ class Connection(object):
         """
         if force:
             self._write_lock.acquire()
-            if self.options.compression_enabled:
-                packet.write(self.socket, self.options.compression_threshold)
-            else:
-                packet.write(self.socket)
-            self._write_lock.release()
+            try:
+                buf = bytearray()
+                self._write_frame(packet, buf)
+                self._send_frames(buf, 1)
+            finally:
+                self._write_lock.release()
         else:
             self._outgoing_packet_queue.append(packet)
+            if self._waker is not None:
+                self._waker.wake()
 
-    def register_packet_listener(self, method, *args):
+    def register_packet_listener(self, method, *args, **kwargs):
         """
         Registers a listener method which will be notified when a packet of
         a selected type is received
 
         :param method: The method which will be called back with the packet
         : args: The packets to listen for
+        :param priority(int): Listeners with a higher priority are notified
+                              first, the default priority is 0
+        :param inline(bool): Call the method on the networking thread even
+                             if the connection has a listener executor
+        :return: The :class:`packets.PacketListener` which was registered
+        """
+        return self._add_packet_listener(
+            packets.PacketListener(method, *args, **kwargs))
+
+    def unregister_packet_listener(self, listener):
         """
-        self.packet_listeners.append(packets.PacketListener(method, *args))
+        Stops notifying a listener of packets
 
-    def _pop_packet(self):
-        # Pops the topmost packet off the outgoing queue and writes it out
-        # through the socket
+        :param listener: The PacketListener returned by
+                         :meth:`register_packet_listener`, or the method it
+                         was registered with, in which case every listener
+                         registered with that method is removed
+        """
+        self.packet_listeners = [
+            registered for registered in self.packet_listeners
+            if registered is not listener and registered.callback != listener]
+        self._listener_index = {}
+        self._kept_index = {}
+
+    def _add_packet_listener(self, listener):
+        listeners = list(self.packet_listeners)
+        position = len(listeners)
+        while position > 0 and \
+                listeners[position - 1].priority < listener.priority:
+            position -= 1
+        listeners.insert(position, listener)
+        # Replaced rather than changed in place, so a packet being dispatched
+        # by the networking thread sees either the old or the new listeners
+        self.packet_listeners = listeners
+        self._listener_index = {}
+        self._kept_index = {}
+        return listener
+
+    def _get_callbacks(self, packet_class):
+        # Returns the callbacks interested in a packet class, looking through
+        # the listeners only the first time a class is seen
+        index = self._listener_index
+        callbacks = index.get(packet_class)
+        if callbacks is None:
+            executor = self.options.listener_executor
+            callbacks = tuple(
+                listener.callback if executor is None or listener.inline
+                else executor.bind(listener)
+                for listener in self.packet_listeners
+                if listener.listens_to(packet_class))
+            index[packet_class] = callbacks
+        return callbacks
+
+    def _pop_packet(self, buf):
+        # Pops the topmost packet off the outgoing queue and appends its
+        # frame to buf
         #
         # Mostly an internal convenience function, caller should make sure
         # they have the write lock acquired to avoid issues caused by
@@ -104,19 +336,151 @@ class Connection(object):
             return False
         else:
             packet = self._outgoing_packet_queue.popleft()
-            if self.options.compression_enabled:
-                packet.write(self.socket, self.options.compression_threshold)
-            else:
-                packet.write(self.socket)
+            self._write_frame(packet, buf)
             return True
 
+    def _write_frame(self, packet, buf):
+        if self.options.compression_enabled:
+            packet.write_frame(buf, self.options.compression_threshold,
+                               self.options.compression_policy)
+        else:
+            packet.write_frame(buf)
+
+    def _send_frames(self, buf, num_packets):
+        # Sends a buffer of frames with a single call, an encrypted socket
+        # encrypts the whole buffer at once
+        cork = self.options.tcp_cork and hasattr(socket, "TCP_CORK")
+        if cork:
+            self._set_tcp_option(socket.TCP_CORK, 1)
+        try:
+            if self.manager is not None:
+                self._send_nonblocking(buf)
+            else:
+                self.socket.sendall(buf)
+        finally:
+            if cork:
+                self._set_tcp_option(socket.TCP_CORK, 0)
+
+        self.write_stats.flushes += 1
+        self.write_stats.packets += num_packets
+        self.write_stats.bytes += len(buf)
+
+    def _send_nonblocking(self, buf):
+        # Writes what the managed, non-blocking socket takes right away and
+        # keeps the rest for the manager to write once the socket is
+        # writable again, so that one slow peer can't hold up the manager
+        encrypt = getattr(self.socket, "encrypt", None)
+        self._unsent += buf if encrypt is None else encrypt(buf)
+        if not self._write_unsent() and self._waker is not None:
+            # Has the manager wait for the socket to become writable
+            self._waker.wake()
+
+    def _write_unsent(self):
+        # Writes as much of the unsent data as the socket takes, caller
+        # must hold the write lock
+        #
+        # :return: Whether everything has been written
+        actual_socket = self._actual_socket()
+        view = memoryview(self._unsent)
+        sent = 0
+        try:
+            while sent < len(view):
+                sent += actual_socket.send(view[sent:])
+        except socket.error as e:
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+        finally:
+            view.release()
+            del self._unsent[:sent]
+        return not self._unsent
+
+    def _actual_socket(self):
+        # The encryption wrapper doesn't expose everything a socket does
+        return getattr(self.socket, "actual_socket", self.socket)
+
+    def _set_tcp_option(self, option, value):
+        self._actual_socket().setsockopt(socket.IPPROTO_TCP, option, value)
+
+    def _read_packets(self):
+        # Reacts to every complete packet the frame reader holds
+        pipeline = self.options.decode_pipeline
+        frame = self.frame_reader.read_frame()
+        while frame is not None:
+            if pipeline is not None:
+                pipeline.feed(self, frame)
+            else:
+                # The reactor may be swapped by the previous packet
+                packet = self.reactor.read_packet(frame)
+                if packet is not None:
+                    self._handle_packet(packet)
+            frame = self.frame_reader.read_frame()
+
+    def _handle_packet(self, packet):
+        # Passes a packet to the reactor and the listeners
+        self.reactor.react(packet)
+        for callback in self._get_callbacks(type(packet)):
+            callback(packet)
+        pool = self._packet_pools.get(type(packet))
+        if pool is not None and not self.options.lazy_packets and \
+                self.options.listener_executor is None and \
+                not self._packets_kept(type(packet)):
+            pool.release(packet)
+
+    def _packets_kept(self, packet_class):
+        # Whether a listener holds on to packets of a class after its
+        # callback has returned, they mustn't be recycled then
+        kept = self._kept_index.get(packet_class)
+        if kept is None:
+            kept = self._kept_index[packet_class] = any(
+                listener.keeps_packets and listener.listens_to(packet_class)
+                for listener in self.packet_listeners)
+        return kept
+
+    def _call_soon(self, function):
+        # Has the networking thread run a function, may be called from any
+        # thread
+        self._calls.append(function)
+        if self._waker is not None:
+            self._waker.wake()
+
+    def _run_pending(self):
+        # Runs the functions passed to _call_soon and handles the packets
+        # the decode pipeline has finished, called by the networking thread
+        # when it is woken up
+        while self._calls:
+            self._calls.popleft()()
+        pipeline = self.options.decode_pipeline
+        if pipeline is not None:
+            pipeline.deliver(self)
+
+    def _record_login(self, stage, at=None):
+        if self._login_started is not None:
+            if at is None:
+                at = perf_counter()
+            self.login_timings[stage] = at - self._login_started
+
+    def _flush_outgoing(self):
+        # Writes out every packet currently in the outgoing queue with a
+        # single sendall
+        self._write_lock.acquire()
+        try:
+            buf = bytearray()
+            num_packets = 0
+            while self._pop_packet(buf):
+                num_packets += 1
+            if num_packets:
+                self._send_frames(buf, num_packets)
+        finally:
+            self._write_lock.release()
+
     def status(self):
         self._connect()
         self._handshake(1)
         self._start_network_thread()
         self.reactor = StatusReactor(self)
 
-        request_packet = packets.RequestPacket()
+        request_packet = self.protocol.serverbound("status",
+                                                   "RequestPacket")()
         self.write_packet(request_packet)
 
     def connect(self):
@@ -127,25 +491,31 @@ class Connection(object):
 
         self.reactor = LoginReactor(self)
         self._start_network_thread()
-        login_start_packet = packets.LoginStartPacket()
+        login_start_packet = self.protocol.serverbound(
+            "login", "LoginStartPacket")()
         login_start_packet.name = self.auth_token.profile.name
         self.write_packet(login_start_packet)
         self.connected = True
 
     def _connect(self):
-        # Connect a socket to the server and create a file object from the
+        # Connect a socket to the server and create a frame reader for the
         # socket.
-        # The file object is used to read any and all data from the socket
-        # since it's "guaranteed" to read the number of bytes specified,
+        # The frame reader is used to read any and all data from the socket,
         # the socket itself will mostly be used to write data upstream to
         # the server.
+        self._login_started = perf_counter()
+        self.login_timings = {}
         self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.socket.connect((self.options.address, self.options.port))
-        self.file_object = self.socket.makefile("rb")
+        self._record_login("connect")
+        if self.options.tcp_nodelay:
+            self._set_tcp_option(socket.TCP_NODELAY, 1)
+        self.frame_reader = framing.FrameReader(self.socket)
 
     def _handshake(self, next_state=2):
-        handshake = packets.HandShakePacket()
-        handshake.protocol_version = PROTOCOL_VERSION
+        handshake = self.protocol.serverbound("handshake",
+                                              "HandShakePacket")()
+        handshake.protocol_version = self.protocol.version
         handshake.server_address = self.options.address
         handshake.server_port = self.options.port
         handshake.next_state = next_state
@@ -153,6 +523,55 @@ class Connection(object):
         self.write_packet(handshake)
 
 
+class _Waker(object):
+    """A socket pair used to interrupt a networking thread blocked in
+    select() as soon as there is something for it to do.
+    """
+    def __init__(self):
+        self._reader, self._writer = socket.socketpair()
+        self._reader.setblocking(False)
+        self._writer.setblocking(False)
+        self._pending = False
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def wake(self):
+        # Only one byte is ever needed to wake the select call, so avoid a
+        # syscall for every queued packet
+        if self._pending:
+            return
+        self._pending = True
+        try:
+            self._writer.send(b"\x00")
+        except socket.error as e:
+            # A full pipe means a wakeup is already on its way
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+
+    def clear(self):
+        # Must be called before the work the wakeup signalled is handled, so
+        # that a wake() racing with that work is never lost. The pipe is
+        # drained before _pending is reset: a wake() in between then skips
+        # sending, its work is handled right after anyway, whereas the other
+        # way round its byte would be drained and no wake() would ever send
+        # another.
+        try:
+            while self._reader.recv(4096):
+                pass
+        except socket.error as e:
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+        self._pending = False
+
+    def close(self):
+        # A wake() once closed is then a no-op, rather than a write to a
+        # closed socket
+        self._pending = True
+        self._reader.close()
+        self._writer.close()
+
+
 class NetworkingThread(threading.Thread):
     interrupt = False
 
@@ -163,134 +582,370 @@ class NetworkingThread(threading.Thread):
         self.daemon = True
 
     def run(self):
-        while True:
-            if self.interrupt:
-                break
-            # Attempt to write out as many as 300 packets as possible every
-            # 0.05 seconds (20 ticks per second)
-            num_packets = 0
-            self.connection._write_lock.acquire()
-            while self.connection._pop_packet():
-                num_packets += 1
-                if num_packets >= 300:
+        connection = self.connection
+        waker = connection._waker
+        # The socket and the waker are registered once rather than handed
+        # to select() on every wakeup, which is also limited to FD_SETSIZE
+        # descriptors. Python 2 still uses select().
+        selector = None
+        if selectors is not None:
+            selector = selectors.DefaultSelector()
+            selector.register(connection.socket, selectors.EVENT_READ)
+            selector.register(waker, selectors.EVENT_READ)
+        try:
+            while True:
+                # Write out everything queued since the last wakeup
+                connection._flush_outgoing()
+                if self.interrupt:
                     break
-            self.connection._write_lock.release()
 
-            # Read and react to as many as 100 packets
-            num_packets = 0
-            packet = self.connection.reactor.read_packet(
-                self.connection.file_object)
-            while packet:
-                num_packets += 1
+                # Sleep until the server sends something or a packet is
+                # queued
+                if selector is not None:
+                    ready_to_read = [key.fileobj
+                                     for key, events in selector.select()]
+                else:
+                    ready_to_read = select.select(
+                        [connection.socket, waker], [], [])[0]
+
+                if waker in ready_to_read:
+                    waker.clear()
+                    connection._run_pending()
+
+                # The socket may have been wrapped for encryption since it
+                # was registered
+                if any(ready is not waker for ready in ready_to_read):
+                    connection.frame_reader.fill()
+                    connection._read_packets()
+        finally:
+            if selector is not None:
+                selector.close()
+            waker.close()
+
+
+class _ManagedWaker(object):
+    # Marks a connection as having packets to write or deliver and wakes
+    # its manager
+    def __init__(self, manager, connection):
+        self.manager = manager
+        self.connection = connection
 
-                self.connection.reactor.react(packet)
-                for listener in self.connection.packet_listeners:
-                    listener.call_packet(packet)
+    def wake(self):
+        self.manager._queued.append(self.connection)
+        self.manager._waker.wake()
 
-                if num_packets >= 100:
-                    break
-                packet = self.connection.reactor.read_packet(
-                    self.connection.file_object)
 
-            time.sleep(0.05)
+class ConnectionManager(object):
+    """Runs the networking of many connections on a single thread.
+
+    Rather than every connection getting a :class:`NetworkingThread`, all
+    the sockets are multiplexed over one selector (epoll where available).
+    Connections are added by passing the manager to their constructor.
+    Their sockets are made non-blocking, whatever a socket doesn't take
+    right away is written once it becomes writable again.
+
+    Requires the selectors module (Python 3.4+).
+    """
+    interrupt = False
+
+    def __init__(self):
+        if selectors is None:
+            raise RuntimeError("ConnectionManager requires Python 3.4+")
+        self._selector = selectors.DefaultSelector()
+        self._waker = _Waker()
+        self._selector.register(self._waker, selectors.EVENT_READ)
+        # Connections with packets waiting to be written
+        self._queued = deque()
+        # Connections to add or remove, only the manager's own thread ever
+        # touches the selector
+        self._changes = deque()
+        self.connections = set()
+        # Connections being removed which still have data to write
+        self._removing = set()
+        self.thread = None
+
+    def add(self, connection):
+        """Starts running a connection's networking, its socket should
+        already be connected
+        """
+        connection.manager = self
+        connection._waker = _ManagedWaker(self, connection)
+        self._changes.append((True, connection))
+        # Anything queued before now, such as the handshake, gets written
+        connection._waker.wake()
+
+    def remove(self, connection):
+        """Stops running a connection's networking, packets it has already
+        queued are still written out
+        """
+        self._changes.append((False, connection))
+        self._waker.wake()
+
+    def start(self):
+        """Runs the manager in a daemon thread"""
+        self.thread = threading.Thread(target=self.run,
+                                       name="Connection Manager")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        self.interrupt = True
+        self._waker.wake()
+
+    def run(self):
+        try:
+            while not self.interrupt:
+                self._flush_queued()
+                self._apply_changes()
+
+                for key, events in self._selector.select():
+                    if key.fileobj is self._waker:
+                        self._waker.clear()
+                        continue
+                    connection = key.data
+                    try:
+                        if events & selectors.EVENT_WRITE:
+                            self._write(connection)
+                        if events & selectors.EVENT_READ and \
+                                connection in self.connections and \
+                                connection not in self._removing:
+                            self._read(connection)
+                    except Exception as e:
+                        self.handle_error(connection, e)
+        finally:
+            self._selector.close()
+            self._waker.close()
+
+    def handle_error(self, connection, exception):
+        """Called when reading from or writing to a connection fails. The
+        connection is dropped and its socket closed, override this to do
+        anything else.
+        """
+        self._unregister(connection)
+        connection.connected = False
+        connection._actual_socket().close()
+
+    def _read(self, connection):
+        try:
+            connection.frame_reader.fill()
+        except socket.error as e:
+            # The socket is non-blocking, and may turn out not to have
+            # anything to read after all
+            if e.errno not in (errno.EAGAIN, errno.EWOULDBLOCK):
+                raise
+            return
+        connection._read_packets()
+
+    def _write(self, connection):
+        # Writes out what a connection's socket didn't take earlier
+        with connection._write_lock:
+            done = connection._write_unsent()
+        if done and connection in self._removing:
+            self._unregister(connection)
+        else:
+            self._update_events(connection)
+
+    def _flush_queued(self):
+        flushed = set()
+        while self._queued:
+            connection = self._queued.popleft()
+            if connection in flushed:
+                continue
+            flushed.add(connection)
+            try:
+                connection._run_pending()
+                connection._flush_outgoing()
+                self._update_events(connection)
+            except Exception as e:
+                self.handle_error(connection, e)
+
+    def _update_events(self, connection):
+        # Waits for a connection's socket to become writable for as long as
+        # it has unsent data
+        if connection not in self.connections:
+            return
+        if connection in self._removing:
+            events = selectors.EVENT_WRITE
+        elif connection._unsent:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE
+        else:
+            events = selectors.EVENT_READ
+        actual_socket = connection._actual_socket()
+        if self._selector.get_key(actual_socket).events != events:
+            self._selector.modify(actual_socket, events, connection)
+
+    def _apply_changes(self):
+        while self._changes:
+            add, connection = self._changes.popleft()
+            if add:
+                actual_socket = connection._actual_socket()
+                # A peer that stops reading mustn't block the manager
+                actual_socket.setblocking(False)
+                self._selector.register(actual_socket, selectors.EVENT_READ,
+                                        connection)
+                self.connections.add(connection)
+                self._update_events(connection)
+            elif connection._unsent and connection in self.connections:
+                # Removed once what it has queued is written out
+                self._removing.add(connection)
+                self._update_events(connection)
+            else:
+                self._unregister(connection)
+
+    def _unregister(self, connection):
+        self._removing.discard(connection)
+        if connection in self.connections:
+            self._selector.unregister(connection._actual_socket())
+            self.connections.remove(connection)
 
 
 class PacketReactor(object):
     """
     Reads and reacts to packets
     """
+    # The networking state the reactor handles, such as "playing"
     state_name = None
+    # Maps ids to the classes of the packets the server sends in that
+    # state, taken from the connection's protocol
     clientbound_packets = None
-
-    TIME_OUT = 1
+    # Names of the packets react() looks at, or None if it looks at every
+    # packet. Packets which neither the reactor nor any listener is
+    # interested in are dropped right after their id is read.
+    handled_packets = None
 
     def __init__(self, connection):
         self.connection = connection
+        if self.state_name is None:
+            self.clientbound_packets = {}
+        else:
+            self.clientbound_packets = connection.protocol.clientbound(
+                self.state_name)
+        self._wanted_ids = None
+        self._wants_unknown = True
+        # The listener index _wanted_ids was worked out from, the
+        # connection replaces it whenever its listeners change
+        self._wanted_index = None
+
+    def _update_wanted(self):
+        self._wanted_index = self.connection._listener_index
+        get_callbacks = self.connection._get_callbacks
+        handled = self.handled_packets
+        self._wanted_ids = frozenset(
+            packet_id
+            for packet_id, packet_class in self.clientbound_packets.items()
+            if handled is None or packet_class.packet_name in handled or
+            get_callbacks(packet_class))
+        self._wants_unknown = handled is None or \
+            bool(get_callbacks(packets.Packet))
+
+    def wants_packet(self, packet_id):
+        """
+        :return: Whether the reactor or a listener has any use for packets
+                 with the given id
+        """
+        if self._wanted_index is not self.connection._listener_index:
+            self._update_wanted()
+        if packet_id in self.clientbound_packets:
+            return packet_id in self._wanted_ids
+        return self._wants_unknown
+
+    def _get_pool(self, packet_class):
+        pools = self.connection._packet_pools
+        pool = pools.get(packet_class)
+        if pool is None:
+            pool = pools[packet_class] = packets.PacketPool(packet_class)
+        return pool
+
+    def read_packet(self, frame):
+        """Parses a single frame taken from the frame reader
+
+        :param frame: The frame's data, without its length prefix
+        :return: The parsed packet or None if it couldn't be read or no one
+                 is interested in it
+        """
+        packet_data = packets.PacketView(frame)
+
+        if self.connection.options.compression_enabled:
+            # The size of the packet once decompressed, 0 if it was sent
+            # uncompressed
+            data_length = packet_data.read_value(VarInt)
+            if data_length > 0:
+                try:
+                    decompressed_packet = self._decompress(
+                        packet_data.view[packet_data.offset:], data_length)
+                except (zlib.error, ValueError) as e:
+                    print("An error was raised whilst decompressing a "
+                          "packet: %s" % e)
+                    return None
+                if decompressed_packet is None:
+                    return None
+                packet_data = packets.PacketView(decompressed_packet)
+
+        packet_id = packet_data.read_value(VarInt)
+        if not self.wants_packet(packet_id):
+            return None
 
-    def read_packet(self, stream):
-        ready_to_read = select.select([self.connection.socket], [], [],
-                                      self.TIME_OUT)[0]
-
-        if self.connection.socket in ready_to_read:
-            length = VarInt.read_socket(self.connection.socket)
-
-            packet_data = packets.PacketBuffer()
-            packet_data.send(stream.read(length))
-            # Ensure we read all the packet
-            while len(packet_data.get_writable()) < length:
-                packet_data.send(
-                    stream.read(length - len(packet_data.get_writable())))
-            packet_data.reset_cursor()
-
-            if self.connection.options.compression_enabled:
-                compressed_size = VarInt.read(packet_data)
-                if compressed_size > 0:
-                    try:
-                        decompressed_packet = decompress(
-                            packet_data.read(compressed_size))
-                    except Exception:
-                        print "An error was raised whilst decompressing a packet"
-                        return None
-                    packet_data.reset()
-                    packet_data.send(decompressed_packet)
-                    packet_data.reset_cursor()
-
-            packet_id = VarInt.read(packet_data)
-
-            # If we know the structure of the packet, attempt to parse it
-            # otherwise just skip it
-            if packet_id in self.clientbound_packets:
-                packet = self.clientbound_packets[packet_id]()
-                packet.read(packet_data)
-                return packet
+        # If we know the structure of the packet, attempt to parse it
+        # otherwise just skip it
+        if packet_id in self.clientbound_packets:
+            packet_class = self.clientbound_packets[packet_id]
+            options = self.connection.options
+            if options.lazy_packets:
+                return packet_class.read_lazy(packet_data.view,
+                                              packet_data.offset)
+            if packet_class in options.pooled_packets:
+                packet = self._get_pool(packet_class).acquire()
             else:
-                #print "RECIEVED UNKNOWN PACKET,", hex(packet_id)
-                return packets.Packet()
+                packet = packet_class()
+            packet.read_from(packet_data.view, packet_data.offset)
+            return packet
         else:
-            return None
+            #print "RECIEVED UNKNOWN PACKET,", hex(packet_id)
+            return packets.Packet()
+
+    def _decompress(self, data, data_length):
+        # Returns the decompressed packet, or None if it isn't wanted
+        return inflate(data, data_length, self.wants_packet)
+
+    def serverbound(self, class_name):
+        """Looks up the class of a packet to send in the reactor's state"""
+        return self.connection.protocol.serverbound(self.state_name,
+                                                    class_name)
 
     def react(self, packet):
         raise NotImplementedError("Call to base reactor")
 
 
 class LoginReactor(PacketReactor):
-    clientbound_packets = packets.STATE_LOGIN_CLIENTBOUND
+    state_name = "login"
 
     def react(self, packet):
         if packet.packet_name == "encryption request":
+            connection = self.connection
+            connection._record_login("encryption request")
+            # Read now, the packet may be recycled or refer to the receive
+            # buffer once react returns
+            args = (packet.server_id, packet.public_key, packet.verify_token)
+            executor = connection.options.login_executor
+            if executor is None:
+                executor = _shared_login_executor()
+            if executor is None:
+                self._encrypt(*self._authenticate(*args))
+            else:
+                # The RSA encryption and the session server join run off
+                # the networking thread, which carries on with other
+                # connections. The server waits for the response, so no
+                # encrypted data can arrive in the meantime.
+                future = executor.submit(self._authenticate, *args)
+                future.add_done_callback(
+                    lambda future: connection._call_soon(
+                        lambda: self._encrypt(*future.result())))
 
-            secret = encryption.generate_shared_secret()
-            token, encrypted_secret = encryption.encrypt_token_and_secret(
-                packet.public_key, packet.verify_token, secret)
-
-            # A server id of '-' means the server is in offline mode
-            if packet.server_id != '-':
-                server_id = encryption.generate_verification_hash(
-                    packet.server_id, secret, packet.public_key)
-
-                self.connection.auth_token.join(server_id)
-
-            encryption_response = packets.EncryptionResponsePacket()
-            encryption_response.shared_secret = encrypted_secret
-            encryption_response.verify_token = token
-
-            # Forced because we'll have encrypted the connection by the time
-            # it reaches the outgoing queue
-            self.connection.write_packet(encryption_response, force=True)
-
-            # Enable the encryption
-            cipher = encryption.create_AES_cipher(secret)
-            encryptor = cipher.encryptor()
-            decryptor = cipher.decryptor()
-            self.connection.socket = encryption.EncryptedSocketWrapper(
-                self.connection.socket, encryptor, decryptor)
-            self.connection.file_object = \
-                encryption.EncryptedFileObjectWrapper(
-                    self.connection.file_object, decryptor)
         if packet.packet_name == "disconnect":
             print(packet.json_data)  # TODO: handle propagating this back
 
         if packet.packet_name == "login success":
+            self.connection._record_login("login success")
             self.connection.reactor = PlayingReactor(self.connection)
             self.connection.playing = True
 
@@ -298,22 +953,87 @@ class LoginReactor(PacketReactor):
             self.connection.options.compression_threshold = packet.threshold
             self.connection.options.compression_enabled = True
 
+    def _authenticate(self, server_id, public_key, verify_token):
+        # Encrypts the shared secret and joins the server through the
+        # session server, run by the login executor
+        secret = encryption.generate_shared_secret()
+        token, encrypted_secret = encryption.encrypt_token_and_secret(
+            public_key, verify_token, secret)
+
+        # A server id of '-' means the server is in offline mode
+        joined = None
+        if server_id != '-':
+            server_id = encryption.generate_verification_hash(
+                server_id, secret, public_key)
+
+            self.connection.auth_token.join(server_id)
+            joined = perf_counter()
+        return secret, token, encrypted_secret, joined
+
+    def _encrypt(self, secret, token, encrypted_secret, joined):
+        # Answers the encryption request and encrypts the connection, on
+        # the networking thread
+        connection = self.connection
+        if joined is not None:
+            connection._record_login("join", joined)
+
+        encryption_response = self.serverbound("EncryptionResponsePacket")()
+        encryption_response.shared_secret = encrypted_secret
+        encryption_response.verify_token = token
+
+        # Forced because we'll have encrypted the connection by the time
+        # it reaches the outgoing queue
+        connection.write_packet(encryption_response, force=True)
+        connection._record_login("encryption response")
+
+        # Enable the encryption
+        cipher = encryption.create_AES_cipher(secret)
+        encryptor = cipher.encryptor()
+        decryptor = cipher.decryptor()
+        connection.socket = encryption.EncryptedSocketWrapper(
+            connection.socket, encryptor, decryptor)
+        connection.frame_reader.enable_encryption(decryptor)
+
 
 class PlayingReactor(PacketReactor):
-    clientbound_packets = packets.STATE_PLAYING_CLIENTBOUND
+    state_name = "playing"
+    handled_packets = ("set compression", "keep alive",
+                       "player position and look", "disconnect")
+
+    def __init__(self, connection):
+        super(PlayingReactor, self).__init__(connection)
+        for tracker in (connection.world, connection.entities):
+            if tracker is not None:
+                self.handled_packets += tracker.handled_packets
 
     def react(self, packet):
+        entities = self.connection.entities
+        if entities is not None and \
+                packet.packet_name in entities.handled_packets:
+            entities.react(packet)
+            return
+
+        world = self.connection.world
+        if world is not None:
+            if packet.packet_name in world.handled_packets:
+                world.react(packet)
+                # Keeps the world within its memory budget
+                world.maintain()
+                return
+            if packet.packet_name == "player position and look":
+                world.player_position = (packet.x, packet.z)
+
         if packet.packet_name == "set compression":
             self.connection.options.compression_threshold = packet.threshold
             self.connection.options.compression_enabled = True
 
         if packet.packet_name == "keep alive":
-            keep_alive_packet = packets.KeepAlivePacket()
+            keep_alive_packet = self.serverbound("KeepAlivePacket")()
             keep_alive_packet.keep_alive_id = packet.keep_alive_id
             self.connection.write_packet(keep_alive_packet)
 
         if packet.packet_name == "player position and look":
-            position_response = packets.PositionAndLookPacket()
+            position_response = self.serverbound("PositionAndLookPacket")()
             position_response.x = packet.x
             position_response.feet_y = packet.y
             position_response.z = packet.z
@@ -327,17 +1047,18 @@ class PlayingReactor(PacketReactor):
 
 
 class StatusReactor(PacketReactor):
-    clientbound_packets = packets.STATE_STATUS_CLIENTBOUND
+    state_name = "status"
+    handled_packets = ("response",)
 
     def react(self, packet):
-        if packet.id == packets.ResponsePacket.id:
+        if packet.packet_name == "response":
             import json
 
             print(json.loads(packet.json_response))
 
-            ping_packet = packets.PingPacket()
+            ping_packet = self.serverbound("PingPacket")()
             ping_packet.time = int(time.time())
             self.connection.write_packet(ping_packet)
 
-            self.connection.networking_thread.interrupt = True
+            self.connection._stop_network_thread()
             # TODO: More shutdown? idk
@@ -0,0 +1,105 @@
+"""Generates _packets_generated.py from packets.json.
+
+The generated module holds the packet classes as plain Python source with
+their codecs already compiled in, so importing :mod:`packets` doesn't have
+to parse the JSON and build every class at runtime. :mod:`packets` only
+uses it while it matches packets.json, run this again after changing it:
+
+    python -m minecraft.networking.create_packets_module
+"""
+import json
+import os
+
+from minecraft.networking import packets
+from minecraft.networking.codec import CodecCompiler
+
+OUTPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                      "_packets_generated.py")
+
+HEADER = '''\
+# Generated by minecraft/networking/create_packets_module.py from
+# packets.json, do not edit. Regenerate it after changing packets.json with:
+#     python -m minecraft.networking.create_packets_module
+import struct
+
+from minecraft.networking import types
+from minecraft.networking.codec import lazy_plan
+
+SOURCE_DIGEST = %r
+
+'''
+
+
+def _indent(source, level):
+    return "".join(("    " * level + line) if line.strip() else line
+                   for line in source.splitlines(True))
+
+
+def generate_module(source):
+    """Generates the module's source
+
+    :param source(bytes): The contents of packets.json
+    :return: The module's source as a str
+    """
+    protocol = json.loads(source.decode("utf-8"))
+    compiler = CodecCompiler()
+    body = []
+    for state in protocol:
+        for bound in protocol[state]:
+            table_name = "STATE_" + state.upper() + "_" + bound
+            body.append("table = tables[%r] = {}" % table_name)
+            for class_name in protocol[state][bound]:
+                attributes = protocol[state][bound][class_name]
+                definition = attributes["definition"]
+                slots = packets._field_slots(attributes)
+
+                body.append("")
+                body.append("class %s(Packet):" % class_name)
+                # Named as if built by packets.build_packets
+                body.append("    __module__ = %r" % packets.__name__)
+                body.append("    __qualname__ = %r" % class_name)
+                body.append("    __slots__ = %r" % (slots,))
+                for name in sorted(attributes):
+                    if name != "definition":
+                        body.append("    %s = %r" % (name, attributes[name]))
+                if definition:
+                    body.append("    definition = [")
+                    for field in definition:
+                        body.append("        %r," % (field,))
+                    body.append("    ]")
+                else:
+                    body.append("    definition = []")
+                body.append("    _lazy_plan = lazy_plan(definition)")
+                codec = compiler.generate(definition)
+                if codec is not None:
+                    body.append("")
+                    body.append(_indent(codec, 1).rstrip("\n"))
+                body.append("")
+                body.append("classes[%r] = table[%s.id] = %s"
+                            % (class_name, class_name, class_name))
+            body.append("")
+
+    lines = [HEADER % packets.source_digest(source)]
+    for name, expression in compiler.prelude.items():
+        lines.append("%s = %s\n" % (name, expression))
+    lines.append("\n\n")
+    lines.append("def create_packets(Packet):\n")
+    lines.append('    """Creates the packet classes, see '
+                 'packets.build_packets"""\n')
+    lines.append("    tables = {}\n")
+    lines.append("    classes = {}\n\n")
+    lines.append(_indent("\n".join(body), 1).rstrip("\n") + "\n")
+    lines.append("    return tables, classes\n")
+    return "".join(lines)
+
+
+def main():
+    with open(packets._PACKETS_JSON, "rb") as json_file:
+        source = json_file.read()
+    with open(OUTPUT, "w") as output:
+        output.write(generate_module(source))
+    print("Wrote %s" % OUTPUT)
+
+
+if __name__ == "__main__":
+    main()
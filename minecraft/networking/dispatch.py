@@ -0,0 +1,186 @@
+"""Runs packet listeners off the networking thread.
+
+Listener callbacks are normally called by the networking thread right
+after the reactor has dealt with a packet, so a slow callback holds up
+reading the socket and answering keep alives. A connection given a
+:class:`ListenerExecutor` as its ``listener_executor`` option hands its
+listeners' packets to the executor's worker threads instead, while the
+reactor keeps running on the networking thread.
+
+Each listener gets its packets in the order they were received and is
+never called by two workers at once, different listeners run in
+parallel.
+"""
+from collections import deque
+from threading import Condition, Lock, Thread
+import traceback
+import weakref
+
+from ..compat import perf_counter
+
+
+class DispatchStats(object):
+    """Counts the work done by a :class:`ListenerExecutor`
+
+    Latency is the time from a packet being received to its callback
+    starting, callback time the time the callback took.
+    """
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_queue_depth = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.total_callback_time = 0.0
+        self.max_callback_time = 0.0
+
+    @property
+    def mean_latency(self):
+        if self.completed == 0:
+            return 0.0
+        return self.total_latency / self.completed
+
+    @property
+    def mean_callback_time(self):
+        if self.completed == 0:
+            return 0.0
+        return self.total_callback_time / self.completed
+
+
+class _ListenerQueue(object):
+    # The packets waiting for one listener, called by the networking thread
+    # in place of the listener's callback
+    def __init__(self, executor, callback):
+        self.executor = executor
+        self.callback = callback
+        self.pending = deque()
+        # Whether the queue is waiting for or being run by a worker
+        self.scheduled = False
+
+    def __call__(self, packet):
+        self.executor._submit(self, packet)
+
+
+class ListenerExecutor(object):
+    """Calls packet listeners on a pool of worker threads"""
+    def __init__(self, workers=2, max_queued=10000, block=True):
+        """
+        :param workers(int): The number of worker threads
+        :param max_queued(int): The most packets that may be waiting for
+                                listeners across all of them
+        :param block(bool): What to do with a packet when max_queued are
+                            waiting already: wait for the listeners to
+                            catch up, which holds up the networking thread,
+                            or drop the packet
+        """
+        self.max_queued = max_queued
+        self.block = block
+        self.stats = DispatchStats()
+        self._lock = Lock()
+        self._work = Condition(self._lock)
+        self._not_full = Condition(self._lock)
+        # Listener queues with packets that no worker is running
+        self._ready = deque()
+        self._queued = 0
+        self._closed = False
+        self._queues = weakref.WeakKeyDictionary()
+        self._threads = []
+        for i in range(workers):
+            thread = Thread(target=self._run, name="ListenerExecutor-%d" % i)
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def queue_depth(self):
+        """The number of packets waiting for listeners"""
+        return self._queued
+
+    def bind(self, listener):
+        """
+        :param listener: A :class:`packets.PacketListener`
+        :return: A callable which queues a packet for the listener
+        """
+        with self._lock:
+            queue = self._queues.get(listener)
+            if queue is None:
+                queue = self._queues[listener] = _ListenerQueue(
+                    self, listener.callback)
+            return queue
+
+    def _submit(self, queue, packet):
+        received = perf_counter()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("The executor has been shut down")
+            stats = self.stats
+            if self._queued >= self.max_queued:
+                if not self.block:
+                    stats.dropped += 1
+                    return
+                while self._queued >= self.max_queued and not self._closed:
+                    self._not_full.wait()
+            queue.pending.append((packet, received))
+            self._queued += 1
+            stats.submitted += 1
+            if self._queued > stats.max_queue_depth:
+                stats.max_queue_depth = self._queued
+            if not queue.scheduled:
+                queue.scheduled = True
+                self._ready.append(queue)
+                self._work.notify()
+
+    def _run(self):
+        lock = self._lock
+        stats = self.stats
+        while True:
+            with lock:
+                while not self._ready:
+                    if self._closed:
+                        return
+                    self._work.wait()
+                queue = self._ready.popleft()
+                packet, received = queue.pending.popleft()
+
+            started = perf_counter()
+            try:
+                queue.callback(packet)
+            except Exception:
+                with lock:
+                    stats.errors += 1
+                traceback.print_exc()
+            finished = perf_counter()
+
+            with lock:
+                self._queued -= 1
+                self._not_full.notify()
+                stats.completed += 1
+                latency = started - received
+                stats.total_latency += latency
+                stats.max_latency = max(stats.max_latency, latency)
+                callback_time = finished - started
+                stats.total_callback_time += callback_time
+                stats.max_callback_time = max(stats.max_callback_time,
+                                              callback_time)
+                # The listener's next packet goes to the back of the line,
+                # so one busy listener can't keep a worker to itself
+                if queue.pending:
+                    self._ready.append(queue)
+                    self._work.notify()
+                else:
+                    queue.scheduled = False
+
+    def shutdown(self, wait=True):
+        """Stops the workers once the queued packets have been handled
+
+        :param wait(bool): Whether to wait for that to happen
+        """
+        with self._lock:
+            self._closed = True
+            self._work.notify_all()
+            self._not_full.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
@@ -1,5 +1,7 @@
 import os
+import socket
 from hashlib import sha1
+from threading import Lock
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
 from cryptography.hazmat.primitives.serialization import load_der_public_key
@@ -16,6 +18,28 @@ def create_AES_cipher(shared_secret):
     return cipher
 
 
+# Parsed public keys by their DER encoding, a server sends the same key to
+# every client until it restarts
+_public_keys = {}
+_public_keys_lock = Lock()
+_MAX_PUBLIC_KEYS = 64
+
+
+def load_public_key(pubkey):
+    """Parses a server's DER encoded public key, once per key
+
+    :param pubkey: The RSA public key provided by the server
+    """
+    key = _public_keys.get(pubkey)
+    if key is None:
+        key = load_der_public_key(pubkey, default_backend())
+        with _public_keys_lock:
+            if len(_public_keys) >= _MAX_PUBLIC_KEYS:
+                _public_keys.clear()
+            _public_keys[bytes(pubkey)] = key
+    return key
+
+
 def encrypt_token_and_secret(pubkey, verification_token, shared_secret):
     """Encrypts the verification token and shared secret
     with the server's public key.
@@ -25,7 +49,7 @@ def encrypt_token_and_secret(pubkey, verification_token, shared_secret):
     :param shared_secret: The generated shared secret
     :return: A tuple containing (encrypted token, encrypted secret)
     """
-    pubkey = load_der_public_key(pubkey, default_backend())
+    pubkey = load_public_key(pubkey)
 
     encrypted_token = pubkey.encrypt(verification_token, PKCS1v15())
     encrypted_secret = pubkey.encrypt(shared_secret, PKCS1v15())
@@ -62,26 +86,108 @@ def _number_from_bytes(b, signed=False):
         return num
 
 
+class BulkCipher(object):
+    """Runs an AES/CFB8 encryptor or decryptor over whole buffers, one
+    update_into call each, writing into a buffer that is kept from call
+    to call rather than into a new bytes object every time
+    """
+    # Older versions of cryptography want room for a block more than the
+    # data passed to update_into
+    _SLACK = 15
+
+    def __init__(self, context, size=65536):
+        """
+        :param context: The encryptor or decryptor of a cipher made by
+                        :func:`create_AES_cipher`
+        :param size(int): The initial size of the output buffer, it grows
+                          to fit larger data
+        """
+        self.context = context
+        self._buffer = bytearray(size + self._SLACK)
+        self._view = memoryview(self._buffer)
+
+    def update(self, data):
+        """Encrypts or decrypts data, which may be any bytes-like object
+
+        :return: A memoryview of the result, only valid until the next call
+        """
+        length = len(data)
+        if len(self._buffer) < length + self._SLACK:
+            self._buffer = bytearray(
+                max(length, 2 * len(self._buffer)) + self._SLACK)
+            self._view = memoryview(self._buffer)
+        written = self.context.update_into(data, self._view)
+        return self._view[:written]
+
+    def update_in_place(self, view):
+        """Encrypts or decrypts a writable memoryview in place"""
+        # CFB8 is a stream mode, the output is as long as the input
+        view[:] = self.update(view)
+
+
 class EncryptedFileObjectWrapper(object):
     def __init__(self, file_object, decryptor):
         self.actual_file_object = file_object
         self.decryptor = decryptor
+        self._cipher = BulkCipher(decryptor, 0)
 
     def read(self, length):
         return self.decryptor.update(self.actual_file_object.read(length))
 
+    def readinto(self, buffer):
+        read = self.actual_file_object.readinto(buffer)
+        if read:
+            self._cipher.update_in_place(memoryview(buffer)[:read])
+        return read
+
 
 class EncryptedSocketWrapper(object):
+    """Encrypts and decrypts everything sent and received through a socket
+
+    Every call runs the cipher once over all the data it is given, so
+    writing a whole batch of packets with :meth:`sendall` or receiving a
+    large block with :meth:`recv_into` costs one call into OpenSSL.
+    """
     def __init__(self, socket, encryptor, decryptor):
         self.actual_socket = socket
         self.encryptor = encryptor
         self.decryptor = decryptor
+        self._encrypt = BulkCipher(encryptor)
+        self._decrypt = BulkCipher(decryptor, 0)
 
     def recv(self, length):
         return self.decryptor.update(self.actual_socket.recv(length))
 
+    def recv_into(self, buffer, nbytes=0):
+        received = self.actual_socket.recv_into(buffer, nbytes)
+        if received:
+            self._decrypt.update_in_place(memoryview(buffer)[:received])
+        return received
+
+    def encrypt(self, data):
+        """
+        :return: data encrypted, as bytes of its own which stay valid
+                 however long they are kept
+        """
+        return bytes(self._encrypt.update(data))
+
+    def _encrypted(self, data):
+        # A plain socket is done with the data once sendall returns, so it
+        # can be handed the cipher's reused buffer. Anything else, such as
+        # an asyncio transport, may keep it around to write later, and gets
+        # a copy.
+        if type(self.actual_socket) is socket.socket:
+            return self._encrypt.update(data)
+        return self.encrypt(data)
+
     def send(self, data):
-        self.actual_socket.send(self.encryptor.update(data))
+        # The cipher has moved past all of data once it is encrypted, so a
+        # partial write is finished here rather than left to the caller
+        self.actual_socket.sendall(self._encrypted(data))
+        return len(data)
+
+    def sendall(self, data):
+        self.actual_socket.sendall(self._encrypted(data))
 
     def fileno(self):
         return self.actual_socket.fileno()
@@ -0,0 +1,130 @@
+"""Contains the code used to split the stream of bytes received from a
+server into individual packet frames.
+"""
+from . import encryption
+
+# The vanilla server and client both refuse frames whose length prefix is
+# longer than 3 bytes
+MAX_FRAME_LENGTH = 2 ** 21 - 1
+
+
+class FrameReader(object):
+    """Reads length prefixed packet frames from a socket.
+
+    Data is received in large blocks straight into a reusable buffer and
+    decrypted once per block. Every complete frame held by the buffer can
+    then be taken out without touching the socket again.
+    """
+    def __init__(self, socket, buffer_size=65536):
+        """
+        :param socket: The socket to read from, it is only ever read from
+                       once per call to :meth:`fill`. May be None when
+                       data is handed over through :meth:`get_buffer`
+        :param buffer_size(int): Initial size of the receive buffer, the
+                                 buffer grows if a frame doesn't fit in it
+        """
+        self.socket = socket
+        self.decryptor = None
+        self._cipher = None
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        # Unread data lives in self._buffer[self._start:self._end]
+        self._start = 0
+        self._end = 0
+        # Size of the incomplete frame at the start of the unread data
+        self._needed = 0
+
+    def enable_encryption(self, decryptor):
+        """Decrypts everything received from now on with the given
+        decryptor. Data that has been received but not read yet is
+        decrypted too.
+        """
+        self.decryptor = decryptor
+        self._cipher = encryption.BulkCipher(decryptor, len(self._buffer))
+        if self._end > self._start:
+            self._cipher.update_in_place(self._view[self._start:self._end])
+
+    def fill(self):
+        """Receives a single block of data from the socket.
+
+        :return: The number of bytes received
+        """
+        received = self.socket.recv_into(self.get_buffer())
+        if received == 0:
+            raise RuntimeError("Socket disconnected")
+        self.buffer_updated(received)
+        return received
+
+    def get_buffer(self):
+        """Returns the free space at the end of the receive buffer, for
+        callers that receive data themselves (such as an asyncio
+        BufferedProtocol). :meth:`buffer_updated` must be called once data
+        has been written to it.
+        """
+        self._make_room()
+        return self._view[self._end:]
+
+    def buffer_updated(self, received):
+        """Takes in data written to the buffer given by :meth:`get_buffer`
+
+        :param received(int): The number of bytes written
+        """
+        if self.decryptor is not None:
+            self._cipher.update_in_place(
+                self._view[self._end:self._end + received])
+        self._end += received
+
+    def _make_room(self):
+        unread = self._end - self._start
+        if unread == 0:
+            self._start = self._end = 0
+            return
+
+        needed = max(self._needed, unread)
+        if len(self._buffer) - self._start >= needed \
+                and len(self._buffer) - self._end >= len(self._buffer) // 4:
+            return
+
+        if needed >= len(self._buffer):
+            # The frame won't fit in the buffer even once it is compacted
+            buffer = bytearray(max(needed + 1, len(self._buffer) * 2))
+            buffer[:unread] = self._view[self._start:self._end]
+            self._buffer = buffer
+            self._view = memoryview(buffer)
+        else:
+            self._view[:unread] = self._view[self._start:self._end]
+        self._start = 0
+        self._end = unread
+
+    def read_frame(self):
+        """Takes the next complete frame out of the buffer.
+
+        The returned memoryview points into the receive buffer, it is only
+        valid until the next call to :meth:`fill`.
+
+        :return: A memoryview of the frame, without its length prefix, or
+                 None if the buffer doesn't hold a complete frame
+        """
+        buffer = self._buffer
+        position = self._start
+        end = self._end
+        length = 0
+        for i in range(3):
+            if position >= end:
+                return None
+            byte = buffer[position]
+            position += 1
+            length |= (byte & 0x7F) << 7 * i
+            if not byte & 0x80:
+                break
+        else:
+            raise RuntimeError("Frame length exceeds %d bytes"
+                               % MAX_FRAME_LENGTH)
+
+        if end - position < length:
+            self._needed = position - self._start + length
+            return None
+
+        self._needed = 0
+        self._start = position + length
+        return self._view[position:self._start]
@@ -0,0 +1,382 @@
+"""Reads and writes NBT, the tag format minecraft stores item data in.
+
+A blob can be read in one of three modes:
+
+* :data:`EAGER` decodes every tag straight away.
+* :data:`LAZY` keeps a copy of the blob and decodes a compound's entries
+  the first time the compound is accessed. Nested compounds stay undecoded
+  until they are accessed themselves.
+* :data:`SKIP` only scans the tag headers to find where the blob ends, the
+  value is read as None.
+
+Compounds are read as :class:`Compound` dicts and lists as :class:`TagList`,
+both remember the tag types they were read with so that a value can be
+written back unchanged.
+"""
+from collections import OrderedDict
+import struct
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # Python 2
+    from collections import Mapping
+
+EAGER = "eager"
+LAZY = "lazy"
+SKIP = "skip"
+
+TAG_END = 0
+TAG_BYTE = 1
+TAG_SHORT = 2
+TAG_INT = 3
+TAG_LONG = 4
+TAG_FLOAT = 5
+TAG_DOUBLE = 6
+TAG_BYTE_ARRAY = 7
+TAG_STRING = 8
+TAG_LIST = 9
+TAG_COMPOUND = 10
+TAG_INT_ARRAY = 11
+
+_BYTE = struct.Struct(">b")
+_UNSIGNED_SHORT = struct.Struct(">H")
+_INT = struct.Struct(">i")
+
+# The struct format characters of the tags with a fixed width
+_CODES = {
+    TAG_BYTE: "b",
+    TAG_SHORT: "h",
+    TAG_INT: "i",
+    TAG_LONG: "q",
+    TAG_FLOAT: "f",
+    TAG_DOUBLE: "d",
+}
+_FIXED = dict((tag, struct.Struct(">" + code))
+              for tag, code in _CODES.items())
+_SIZES = dict((tag, fixed.size) for tag, fixed in _FIXED.items())
+
+
+class NbtError(ValueError):
+    """Raised for malformed NBT"""
+
+
+class Compound(OrderedDict):
+    """A compound tag's entries
+
+    :ivar name: The name of the tag, only set on the root compound
+    :ivar tag_types: Maps entry names to the tag type they were read with,
+                     entries missing from it are written with a type that
+                     suits their value
+    """
+    def __init__(self, *args, **kwargs):
+        super(Compound, self).__init__(*args, **kwargs)
+        self.name = u""
+        self.tag_types = {}
+
+
+class TagList(list):
+    """A list tag's items
+
+    :ivar tag_type: The tag type of the items
+    """
+    def __init__(self, items=(), tag_type=None):
+        super(TagList, self).__init__(items)
+        self.tag_type = tag_type
+
+
+class LazyCompound(Mapping):
+    """A compound tag whose entries are only decoded once it is accessed"""
+    def __init__(self, data, offset, name=u""):
+        """
+        :param data(bytes): Data holding the compound's payload
+        :param offset(int): Where the payload starts
+        """
+        self.name = name
+        self._data = data
+        self._offset = offset
+        self._compound = None
+
+    @property
+    def loaded(self):
+        """Whether the entries have been decoded"""
+        return self._compound is not None
+
+    def _load(self):
+        if self._compound is None:
+            self._compound, _ = _read_compound(self._data, self._offset, LAZY)
+            self._compound.name = self.name
+        return self._compound
+
+    @property
+    def tag_types(self):
+        return self._load().tag_types
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        if self._compound is None:
+            return "<LazyCompound %r, not decoded>" % self.name
+        return "<LazyCompound %r %r>" % (self.name, dict(self._compound))
+
+    def raw_payload(self):
+        """Returns the encoded payload, without the tag's type and name"""
+        return self._data[self._offset:skip_payload(
+            self._data, self._offset, TAG_COMPOUND)]
+
+
+def _read_string(buf, offset):
+    length, = _UNSIGNED_SHORT.unpack_from(buf, offset)
+    offset += 2
+    # Strings are in Java's modified UTF-8, which only differs from UTF-8
+    # for the NUL character and characters outside the BMP
+    return bytes(buf[offset:offset + length]).decode("utf-8", "replace"), \
+        offset + length
+
+
+def _read_payload(buf, offset, tag_type, mode):
+    fixed = _FIXED.get(tag_type)
+    if fixed is not None:
+        return fixed.unpack_from(buf, offset)[0], offset + fixed.size
+    if tag_type == TAG_STRING:
+        return _read_string(buf, offset)
+    if tag_type == TAG_COMPOUND:
+        if mode == LAZY:
+            end = skip_payload(buf, offset, TAG_COMPOUND)
+            if isinstance(buf, bytes):
+                # Already a private copy, made by the enclosing compound
+                return LazyCompound(buf, offset), end
+            return LazyCompound(bytes(buf[offset:end]), 0), end
+        return _read_compound(buf, offset, mode)
+    if tag_type == TAG_LIST:
+        item_type, = _BYTE.unpack_from(buf, offset)
+        length, = _INT.unpack_from(buf, offset + 1)
+        offset += 5
+        items = TagList(tag_type=item_type)
+        code = _CODES.get(item_type)
+        if code is not None:
+            items.extend(struct.unpack_from(">%d%s" % (length, code), buf,
+                                            offset))
+            return items, offset + length * _SIZES[item_type]
+        for i in range(length):
+            item, offset = _read_payload(buf, offset, item_type, mode)
+            items.append(item)
+        return items, offset
+    if tag_type == TAG_BYTE_ARRAY:
+        length, = _INT.unpack_from(buf, offset)
+        offset += 4
+        return bytes(buf[offset:offset + length]), offset + length
+    if tag_type == TAG_INT_ARRAY:
+        length, = _INT.unpack_from(buf, offset)
+        offset += 4
+        return list(struct.unpack_from(">%di" % length, buf, offset)), \
+            offset + 4 * length
+    raise NbtError("Unknown tag type %d" % tag_type)
+
+
+def _read_compound(buf, offset, mode):
+    compound = Compound()
+    while True:
+        tag_type = buf[offset]
+        offset += 1
+        if tag_type == TAG_END:
+            return compound, offset
+        name, offset = _read_string(buf, offset)
+        compound[name], offset = _read_payload(buf, offset, tag_type, mode)
+        compound.tag_types[name] = tag_type
+
+
+def skip_payload(buf, offset, tag_type):
+    """Returns the offset just past a tag's payload, only the headers of
+    the tags in it are looked at
+    """
+    size = _SIZES.get(tag_type)
+    if size is not None:
+        return offset + size
+    if tag_type == TAG_STRING:
+        return offset + 2 + _UNSIGNED_SHORT.unpack_from(buf, offset)[0]
+    if tag_type == TAG_BYTE_ARRAY:
+        return offset + 4 + _INT.unpack_from(buf, offset)[0]
+    if tag_type == TAG_INT_ARRAY:
+        return offset + 4 + 4 * _INT.unpack_from(buf, offset)[0]
+    if tag_type == TAG_LIST:
+        item_type, = _BYTE.unpack_from(buf, offset)
+        length, = _INT.unpack_from(buf, offset + 1)
+        offset += 5
+        size = _SIZES.get(item_type)
+        if size is not None:
+            return offset + length * size
+        for i in range(length):
+            offset = skip_payload(buf, offset, item_type)
+        return offset
+    if tag_type == TAG_COMPOUND:
+        while True:
+            entry_type = buf[offset]
+            if entry_type == TAG_END:
+                return offset + 1
+            name_length, = _UNSIGNED_SHORT.unpack_from(buf, offset + 1)
+            offset = skip_payload(buf, offset + 3 + name_length, entry_type)
+    raise NbtError("Unknown tag type %d" % tag_type)
+
+
+def read_from(buf, offset, mode=EAGER):
+    """Reads a root tag, as found in slots and packets
+
+    :param buf: A buffer, such as a memoryview of a packet
+    :param offset(int): Where the tag starts
+    :param mode: :data:`EAGER`, :data:`LAZY` or :data:`SKIP`
+    :return: The value and the offset just past the tag. The value is None
+             for an empty tag, or for any tag when skipping
+    """
+    tag_type = buf[offset]
+    offset += 1
+    if tag_type == TAG_END:
+        return None, offset
+    name, offset = _read_string(buf, offset)
+    if mode == SKIP:
+        return None, skip_payload(buf, offset, tag_type)
+    if mode == LAZY and tag_type == TAG_COMPOUND:
+        end = skip_payload(buf, offset, TAG_COMPOUND)
+        return LazyCompound(bytes(buf[offset:end]), 0, name), end
+    value, offset = _read_payload(buf, offset, tag_type, mode)
+    if tag_type == TAG_COMPOUND:
+        value.name = name
+    return value, offset
+
+
+def skip(buf, offset):
+    """Returns the offset just past a root tag without decoding it"""
+    return read_from(buf, offset, SKIP)[1]
+
+
+def read(file_object, mode=EAGER):
+    """Reads a root tag from a file object
+
+    The tag is read header by header, every mode but :data:`SKIP` then
+    decodes it like :func:`read_from`.
+    """
+    data = bytearray(file_object.read(1))
+    if data[0] != TAG_END:
+        data += file_object.read(2)
+        data += file_object.read(_UNSIGNED_SHORT.unpack_from(data, 1)[0])
+        _read_raw_payload(file_object, data[0], data)
+    return read_from(memoryview(bytes(data)), 0, mode)[0]
+
+
+def _read_raw_payload(file_object, tag_type, data):
+    # Appends the undecoded payload of a tag read from a file object to data
+    def take(length):
+        chunk = file_object.read(length)
+        data.extend(chunk)
+        return chunk
+
+    size = _SIZES.get(tag_type)
+    if size is not None:
+        take(size)
+    elif tag_type == TAG_STRING:
+        take(_UNSIGNED_SHORT.unpack(take(2))[0])
+    elif tag_type == TAG_BYTE_ARRAY:
+        take(_INT.unpack(take(4))[0])
+    elif tag_type == TAG_INT_ARRAY:
+        take(4 * _INT.unpack(take(4))[0])
+    elif tag_type == TAG_LIST:
+        item_type, = _BYTE.unpack(take(1))
+        length, = _INT.unpack(take(4))
+        for i in range(length):
+            _read_raw_payload(file_object, item_type, data)
+    elif tag_type == TAG_COMPOUND:
+        entry_type = ord(take(1))
+        while entry_type != TAG_END:
+            take(_UNSIGNED_SHORT.unpack(take(2))[0])
+            _read_raw_payload(file_object, entry_type, data)
+            entry_type = ord(take(1))
+    else:
+        raise NbtError("Unknown tag type %d" % tag_type)
+
+
+def _guess_type(value):
+    # The tag type used for values without a recorded type
+    if isinstance(value, bool):
+        return TAG_BYTE
+    if isinstance(value, float):
+        return TAG_DOUBLE
+    if isinstance(value, (bytes, bytearray)):
+        return TAG_BYTE_ARRAY
+    if isinstance(value, Mapping):
+        return TAG_COMPOUND
+    if isinstance(value, (list, tuple)):
+        return TAG_LIST
+    if isinstance(value, int):
+        if -2 ** 31 <= value < 2 ** 31:
+            return TAG_INT
+        return TAG_LONG
+    try:
+        # Python 2 longs and unicode strings
+        if isinstance(value, long):  # noqa
+            return TAG_LONG
+    except NameError:
+        pass
+    return TAG_STRING
+
+
+def _write_string(value, buf):
+    value = value.encode("utf-8")
+    buf += _UNSIGNED_SHORT.pack(len(value))
+    buf += value
+
+
+def _write_payload(value, tag_type, buf):
+    fixed = _FIXED.get(tag_type)
+    if fixed is not None:
+        buf += fixed.pack(value)
+    elif tag_type == TAG_STRING:
+        _write_string(value, buf)
+    elif tag_type == TAG_COMPOUND:
+        if isinstance(value, LazyCompound) and not value.loaded:
+            # Nothing was decoded, so nothing can have changed either
+            buf += value.raw_payload()
+            return
+        tag_types = getattr(value, "tag_types", {})
+        for name, item in value.items():
+            item_type = tag_types.get(name)
+            if item_type is None:
+                item_type = _guess_type(item)
+            buf.append(item_type)
+            _write_string(name, buf)
+            _write_payload(item, item_type, buf)
+        buf.append(TAG_END)
+    elif tag_type == TAG_LIST:
+        item_type = getattr(value, "tag_type", None)
+        if item_type is None:
+            item_type = _guess_type(value[0]) if value else TAG_END
+        buf += _BYTE.pack(item_type)
+        buf += _INT.pack(len(value))
+        for item in value:
+            _write_payload(item, item_type, buf)
+    elif tag_type == TAG_BYTE_ARRAY:
+        buf += _INT.pack(len(value))
+        buf += value
+    elif tag_type == TAG_INT_ARRAY:
+        buf += _INT.pack(len(value))
+        buf += struct.pack(">%di" % len(value), *value)
+    else:
+        raise NbtError("Unknown tag type %d" % tag_type)
+
+
+def write_to(value, buf):
+    """Appends a root tag to a bytearray
+
+    :param value: A compound, or None for an empty tag
+    """
+    if value is None:
+        buf.append(TAG_END)
+        return
+    buf.append(TAG_COMPOUND)
+    _write_string(getattr(value, "name", u""), buf)
+    _write_payload(value, TAG_COMPOUND, buf)
@@ -1,8 +1,9 @@
 from io import BytesIO
 import json, os, warnings
-from zlib import compress
+from zlib import compress, crc32
 
 import minecraft.networking.types as types
+from minecraft.networking.codec import compiler, lazy_plan
 
 class PacketBuffer(object):
     def __init__(self):
@@ -15,6 +16,9 @@ class PacketBuffer(object):
         """
         self.bytes.write(value)
 
+    def sendall(self, value):
+        self.send(value)
+
     def read(self, length):
         return self.bytes.read(length)
 
@@ -30,23 +34,79 @@ class PacketBuffer(object):
     def get_writable(self):
         return self.bytes.getvalue()
 
+class PacketView(object):
+    """
+    A read only buffer over the data of a received packet. Values are
+    decoded straight out of a memoryview of the data, so reading a packet
+    only allocates the values themselves.
+    """
+    def __init__(self, data, offset=0):
+        self.view = memoryview(data)
+        self.offset = offset
+
+    def read_value(self, data_type):
+        value, self.offset = data_type.read_from(self.view, self.offset)
+        return value
+
+    def read(self, length):
+        data = self.view[self.offset:self.offset + length].tobytes()
+        self.offset += len(data)
+        return data
+
+    def recv(self, length):
+        return self.read(length)
+
+    def remaining(self):
+        return len(self.view) - self.offset
+
 class PacketListener(object):
-    def __init__(self, callback, *args):
+    # Whether the listener holds on to the packets it is given after its
+    # callback has returned, which keeps them from being recycled by the
+    # connection's packet pools
+    keeps_packets = False
+
+    def __init__(self, callback, *args, **kwargs):
+        """
+        :param callback: Called with every received packet which is an
+                         instance of one of the packet classes
+        :param args: The packet classes to listen for
+        :param priority(int): Listeners with a higher priority are called
+                              first, listeners with the same priority are
+                              called in the order they were registered in
+        :param inline(bool): Always call the callback on the networking
+                             thread, even if the connection has a
+                             listener executor
+        """
         self.packets_to_listen = []
         self.callback = callback
+        self.priority = kwargs.pop("priority", 0)
+        self.inline = kwargs.pop("inline", False)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments: %s"
+                            % ", ".join(kwargs))
         for arg in args:
             if issubclass(arg, Packet):
                 self.packets_to_listen.append(arg)
 
+    def listens_to(self, packet_class):
+        return issubclass(packet_class, tuple(self.packets_to_listen))
+
     def call_packet(self, packet):
-        for packet_type in self.packets_to_listen:
-            if isinstance(packet, packet_type):
-                self.callback(packet)
+        if self.listens_to(type(packet)):
+            self.callback(packet)
+
 
 class Packet(object):
+    # The classes built from packets.json declare their fields as slots, so
+    # their instances don't carry a __dict__
+    __slots__ = ()
     packet_name = "base"
     id = -0x01
     definition = []
+    # Set on the classes built from packets.json, see read_lazy
+    _lazy_plan = None
+    _lazy_data = None
+    _lazy_starts = None
 
     def __init__(self, **kwargs):
         pass
@@ -76,47 +136,306 @@ class Packet(object):
                 value = data_type.read(file_object)
                 setattr(self, var_name, value)
 
-    def write(self, socket, compression_threshold=None):
-        # buffer the data since we need to know the length of each packet's
-        # payload
-        packet_buffer = PacketBuffer()
-        # write packet's id right off the bat in the header
-        types.VarInt.send(self.id, packet_buffer)
+    def read_from(self, buf, offset):
+        """Reads the packet's fields out of a buffer
+
+        :param buf: A memoryview of the packet's data
+        :param offset(int): Where the fields start, just past the packet id
+        :return: The offset just past the last field
+        """
+        for field in self.definition:
+            for var_name, data_type in field.items():
+                data_type = self.get_data_type(data_type)
+                value, offset = data_type.read_from(buf, offset)
+                setattr(self, var_name, value)
+        return offset
+
+    @classmethod
+    def read_lazy(cls, buf, offset):
+        """Creates a packet which decodes each of its fields from buf only
+        when the field is first accessed, the value is then kept.
+
+        This pays off for packets with large fields, such as strings, chat
+        messages or byte arrays, of which only a few fields are used.
+
+        :param buf: A memoryview of the packet's data, the packet keeps a
+                    copy of it so the buffer may be reused afterwards
+        :param offset(int): Where the fields start, just past the packet id
+        :return: The packet, it is decoded straight away if its definition
+                 can't be read lazily
+        """
+        packet = cls()
+        if cls._lazy_plan is None:
+            packet.read_from(buf, offset)
+            return packet
+        packet._lazy_data = bytes(buf[offset:])
+        packet._lazy_starts = None
+        return packet
+
+    def __getattr__(self, name):
+        # Only called for attributes which haven't been set, which for lazy
+        # packets includes every field that hasn't been accessed yet
+        if name[0] == "_" or getattr(self, "_lazy_data", None) is None:
+            raise AttributeError(name)
+        plan = self._lazy_plan
+        static = plan.static_readers.get(name)
+        if static is not None:
+            value = static[0](self._lazy_data, static[1])[0]
+            setattr(self, name, value)
+            return value
 
+        indices = plan.by_name.get(name)
+        if indices is None:
+            raise AttributeError(name)
+
+        # The last present field of that name wins, like when reading eagerly
+        value = None
+        for index in indices:
+            offset = self._lazy_locate(index)
+            if offset is not None:
+                data_type = plan.fields[index][1]
+                value = data_type.read_from(self._lazy_data, offset)[0]
+        setattr(self, name, value)
+        return value
+
+    def _lazy_present(self, index):
+        condition = self._lazy_plan.fields[index][2]
+        return condition is None or getattr(self, condition[0]) in condition[1]
+
+    def _lazy_locate(self, index):
+        # Returns the offset a field starts at, None if the field is missing
+        # because its condition isn't met
+        plan = self._lazy_plan
+        if not self._lazy_present(index):
+            return None
+        offset = plan.static_offsets[index]
+        if offset is not None:
+            return offset
+
+        # Start offsets of the fields, as far as they've been worked out
+        starts = self._lazy_starts
+        if starts is None:
+            starts = self._lazy_starts = [0]
+        while len(starts) <= index:
+            previous = len(starts) - 1
+            start = starts[previous]
+            if not self._lazy_present(previous):
+                starts.append(start)
+            elif plan.sizes[previous] is not None:
+                starts.append(start + plan.sizes[previous])
+            else:
+                data_type = plan.fields[previous][1]
+                starts.append(data_type.skip(self._lazy_data, start))
+        return starts[index]
+
+    def write_fields(self, buf):
+        """Appends the packet's fields, without any header, to a bytearray
+        """
         for field in self.definition:
             for var_name, data_type in field.items():
                 data_type = self.get_data_type(data_type)
                 data = getattr(self, var_name)
-                data_type.send(data, packet_buffer)
+                data_type.write_to(data, buf)
 
+    def _encode_into(self, buf, compression_threshold=None, compression=None):
+        # Appends the packet's frame to buf. Space for the largest possible
+        # header is reserved in front of the payload, the header is then
+        # written right before the payload so that nothing has to be moved.
+        # Returns the offset the frame starts at, anything between the
+        # original end of buf and that offset is unused.
+        payload_start = len(buf) + _MAX_HEADER_LENGTH
+        buf += _HEADER_SPACE
+        # write packet's id right off the bat in the header
+        types.VarInt.write_to(self.id, buf)
+        self.write_fields(buf)
+
+        header = bytearray()
         # compression_threshold of None means compression is disabled
         if compression_threshold is not None:
-            if len(packet_buffer.get_writable()) > compression_threshold != -1:
-                # compress the current payload
-                compressed_data = compress(packet_buffer.get_writable())
-                packet_buffer.reset()
-                # write out the length of the compressed payload
-                types.VarInt.send(len(compressed_data), packet_buffer)
-                # write the compressed payload itself
-                packet_buffer.send(compressed_data)
+            data_length = len(buf) - payload_start
+            if data_length > compression_threshold != -1:
+                if compression is None:
+                    compressed = compress(memoryview(buf)[payload_start:])
+                else:
+                    compressed = compression.compress(
+                        self.id, memoryview(buf)[payload_start:])
+            else:
+                compressed = None
+            if compressed is not None:
+                # replace the current payload with the compressed one
+                buf[payload_start:] = compressed
+                # write out the length of the uncompressed payload
+                types.VarInt.write_to(data_length, header)
             else:
                 # write out a 0 to indicate uncompressed data
-                packet_data = packet_buffer.get_writable()
-                packet_buffer.reset()
-                types.VarInt.send(0, packet_buffer)
-                packet_buffer.send(packet_data)
-
-        types.VarInt.send(len(packet_buffer.get_writable()), socket)  # Packet Size
-        socket.send(packet_buffer.get_writable())  # Packet Payload
-
-json_file = open(os.path.dirname(os.path.abspath(__file__))+"/packets.json")
-packets = json.load(json_file)
-json_file.close()
-for state in packets:
-    for bound in packets[state]:
-        current_state_name = "STATE_"+state.upper()+"_"+bound
-        globals()[current_state_name] = {}
-        for packet_id in packets[state][bound]:
-            packet_class = type(str(packet_id), (Packet,), packets[state][bound][packet_id])
-            globals()[str(packet_id)] = packet_class
-            globals()[current_state_name][packet_class.id] = packet_class
+                header.append(0)
+
+        frame_header = bytearray()
+        types.VarInt.write_to(len(buf) - payload_start + len(header),
+                              frame_header)  # Packet Size
+        frame_header += header
+        frame_start = payload_start - len(frame_header)
+        buf[frame_start:payload_start] = frame_header
+        return frame_start
+
+    def write_frame(self, buf, compression_threshold=None, compression=None):
+        """Appends the packet's complete frame, ready to be sent, to a
+        bytearray
+
+        :param buf: The bytearray to append to
+        :param compression_threshold(int): The connection's compression
+                                           threshold, None if compression
+                                           is disabled
+        :param compression: The :class:`compression.CompressionPolicy` to
+                            compress with, by default zlib's default level
+        """
+        start = len(buf)
+        frame_start = self._encode_into(buf, compression_threshold,
+                                        compression)
+        del buf[start:frame_start]
+
+    def write(self, socket, compression_threshold=None, compression=None):
+        # The whole frame is built in a single buffer and written out with
+        # one call, so a partial write can never leave half a packet behind
+        buf = bytearray()
+        frame_start = self._encode_into(buf, compression_threshold,
+                                        compression)
+        socket.sendall(memoryview(buf)[frame_start:])
+
+class PacketPool(object):
+    """Recycles the instances of a packet class, so that packets received
+    at a high rate, such as movement and keep alives, don't need a new
+    object each.
+
+    A packet handed out by :meth:`acquire` is refilled by the next read once
+    it has been released, so it must not be kept after it was released.
+    """
+    def __init__(self, packet_class, size=16):
+        """
+        :param packet_class: The class of the packets to recycle
+        :param size(int): The most released packets that are kept around
+        """
+        self.packet_class = packet_class
+        self.size = size
+        self._free = []
+        self.created = 0
+        self.reused = 0
+
+    def acquire(self):
+        """Returns a released packet, or a new one if there are none"""
+        if self._free:
+            self.reused += 1
+            return self._free.pop()
+        self.created += 1
+        return self.packet_class()
+
+    def release(self, packet):
+        """Hands a packet back for reuse"""
+        if len(self._free) < self.size:
+            self._free.append(packet)
+
+
+def _field_slots(attributes):
+    # Returns the __slots__ of a packet class built from packets.json
+    slots = []
+    for field in attributes["definition"]:
+        for var_name in field:
+            if var_name in attributes or var_name in vars(Packet):
+                # Would clash with a class attribute, keep using a __dict__
+                return ("__dict__",)
+            if var_name not in slots:
+                slots.append(var_name)
+    return tuple(slots) + ("_lazy_data", "_lazy_starts")
+
+
+# Longest possible packet size and uncompressed size VarInts
+_MAX_HEADER_LENGTH = 10
+_HEADER_SPACE = bytes(bytearray(_MAX_HEADER_LENGTH))
+
+_PACKETS_JSON = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             "packets.json")
+
+
+def source_digest(source):
+    """Identifies a version of packets.json, so a module generated from it
+    can tell whether it is still up to date
+
+    :param source(bytes): The contents of packets.json
+    """
+    # zlib is imported already, unlike hashlib
+    return "%08x-%d" % (crc32(source) & 0xFFFFFFFF, len(source))
+
+
+def packet_signature(table_name, class_name, attributes):
+    """Returns a hashable key which is the same for two packet classes only
+    if they are interchangeable
+
+    :param table_name(str): The STATE_* table the packet is in
+    :param attributes: The packet's entry in packets.json, or its class
+    """
+    if isinstance(attributes, type):
+        attributes = vars(attributes)
+    return (table_name, str(class_name), attributes["id"],
+            attributes["packet_name"],
+            json.dumps(attributes["definition"], sort_keys=True))
+
+
+def build_packets(protocol, class_cache=None):
+    """Builds the packet classes of a protocol at runtime
+
+    :param protocol: The parsed contents of packets.json
+    :param class_cache: A dict mapping :func:`packet_signature` keys to
+                        packet classes, classes found in it are used instead
+                        of building new ones and new classes are added to it
+    :return: A (tables, classes) tuple, tables maps STATE_* names to dicts
+             of packet id to packet class, classes maps class names to
+             packet classes
+    """
+    tables = {}
+    classes = {}
+    for state in protocol:
+        for bound in protocol[state]:
+            table_name = "STATE_" + state.upper() + "_" + bound
+            table = tables[table_name] = {}
+            for class_name in protocol[state][bound]:
+                attributes = dict(protocol[state][bound][class_name])
+                signature = packet_signature(table_name, class_name,
+                                             attributes)
+                if class_cache is not None and signature in class_cache:
+                    packet_class = class_cache[signature]
+                else:
+                    # read_from and write_fields specialised for this
+                    # definition
+                    attributes.update(
+                        compiler.compile(attributes["definition"]))
+                    attributes["_lazy_plan"] = lazy_plan(
+                        attributes["definition"])
+                    attributes["__slots__"] = _field_slots(attributes)
+                    packet_class = type(str(class_name), (Packet,),
+                                        attributes)
+                    if class_cache is not None:
+                        class_cache[signature] = packet_class
+                classes[str(class_name)] = packet_class
+                table[packet_class.id] = packet_class
+    return tables, classes
+
+
+def _load_packets():
+    # Uses the module generated by create_packets_module when it was
+    # generated from the current packets.json, as importing it is much
+    # faster than building every class at runtime
+    with open(_PACKETS_JSON, "rb") as json_file:
+        source = json_file.read()
+    try:
+        from minecraft.networking import _packets_generated as generated
+    except ImportError:
+        generated = None
+    if generated is not None and \
+            generated.SOURCE_DIGEST == source_digest(source):
+        return generated.create_packets(Packet)
+    return build_packets(json.loads(source.decode("utf-8")))
+
+
+_tables, _classes = _load_packets()
+globals().update(_classes)
+globals().update(_tables)
@@ -0,0 +1,185 @@
+"""Decodes the heaviest packets off the networking thread.
+
+Inflating and parsing a chunk holds up every packet behind it, keep
+alives included. A connection given a :class:`DecodePipeline` as its
+``decode_pipeline`` option only frames (and decrypts) what it receives on
+the networking thread, and hands the packets named in
+:attr:`DecodePipeline.heavy_packets` to an executor. zlib releases the
+GIL while inflating, so a thread pool already spreads that over several
+cores, a ``concurrent.futures.ProcessPoolExecutor`` spreads the parsing
+too.
+
+Every other packet is still decoded right away, but the reactor and the
+listeners get all of them in the order the server sent them: a packet
+received after a heavy one waits until that has been decoded.
+"""
+from collections import deque
+try:
+    from concurrent.futures import ThreadPoolExecutor
+except ImportError:  # pragma: no cover
+    # Python 2 without the futures backport, an executor has to be given
+    ThreadPoolExecutor = None
+
+from .connection import inflate, peek_id
+from .registry import registry
+from .types import VarInt
+
+# Packets that change how the packets after them are read, everything
+# before them is delivered first
+_STREAM_PACKETS = ("set compression", "login success")
+
+
+def decode(protocol_version, state_name, packet_id, data, data_length):
+    """Decodes a packet, run by the executor's workers
+
+    :param protocol_version(int): The connection's protocol version
+    :param state_name(str): The networking state the packet was sent in
+    :param packet_id(int): The packet's id
+    :param data(bytes): The packet's id and fields
+    :param data_length(int): The size data decompresses to, 0 if it isn't
+                             compressed
+    :return: A dict of the packet's field values, which can be sent back
+             from another process
+    """
+    if data_length:
+        data = inflate(data, data_length)
+    packet_class = registry.get(protocol_version).clientbound(
+        state_name)[packet_id]
+    packet = packet_class()
+    view = memoryview(data)
+    packet.read_from(view, VarInt.read_from(view, 0)[1])
+    return dict((name, getattr(packet, name))
+                for field in packet.definition for name in field)
+
+
+class DecodePipeline(object):
+    """Decodes a connection's heavy packets on an executor
+
+    The pipeline keeps the connection's packets in order, so each
+    connection needs one of its own. They can share an executor.
+    """
+    # Names of the packets decoded by the executor
+    heavy_packets = ("chunk data", "map chunk bulk", "window items")
+
+    def __init__(self, executor=None, workers=2, max_pending=64):
+        """
+        :param executor: A concurrent.futures executor, by default a
+                         ThreadPoolExecutor with the given workers
+        :param workers(int): The number of threads of the default executor
+        :param max_pending(int): The most packets waiting to be delivered,
+                                 the networking thread waits for the oldest
+                                 heavy packet beyond that
+        """
+        if executor is None:
+            if ThreadPoolExecutor is None:
+                raise RuntimeError("DecodePipeline requires an executor "
+                                   "without concurrent.futures")
+            executor = ThreadPoolExecutor(workers)
+        self.executor = executor
+        self.max_pending = max_pending
+        # Packets waiting to be delivered, in the order they were received,
+        # as (future, packet class) for heavy packets and (None, packet)
+        # for decoded ones
+        self._pending = deque()
+        # The reactor whose heavy packet ids are in _heavy_ids
+        self._reactor = None
+        self._heavy_ids = {}
+        #: The number of packets decoded by the executor
+        self.offloaded = 0
+
+    @property
+    def pending(self):
+        """The number of packets waiting to be delivered"""
+        return len(self._pending)
+
+    def feed(self, connection, frame):
+        """Decodes a frame or hands it to the executor, then delivers every
+        packet that is ready
+
+        :param frame: A frame taken from the connection's frame reader
+        """
+        reactor = connection.reactor
+        submitted = self._submit(connection, reactor, frame)
+        if not submitted:
+            packet = reactor.read_packet(frame)
+            if packet is None:
+                return
+            if not self._pending:
+                connection._handle_packet(packet)
+                return
+            self._pending.append((None, packet))
+            if packet.packet_name in _STREAM_PACKETS:
+                # Has to be reacted to before the next frame is read
+                self.drain(connection)
+                return
+        while len(self._pending) > self.max_pending:
+            self._deliver_first(connection)
+        self.deliver(connection)
+
+    def _submit(self, connection, reactor, frame):
+        # Hands a frame to the executor if it holds a heavy packet
+        if reactor is not self._reactor:
+            self._reactor = reactor
+            self._heavy_ids = dict(
+                (packet_id, packet_class)
+                for packet_id, packet_class
+                in reactor.clientbound_packets.items()
+                if packet_class.packet_name in self.heavy_packets)
+        if not self._heavy_ids:
+            return False
+
+        data_length = 0
+        offset = 0
+        if connection.options.compression_enabled:
+            data_length, offset = VarInt.read_from(frame, 0)
+        if data_length:
+            try:
+                packet_id = peek_id(frame[offset:], data_length)
+            except Exception:
+                # Left to read_packet to report
+                return False
+        else:
+            packet_id = VarInt.read_from(frame, offset)[0]
+        if packet_id not in self._heavy_ids or \
+                not reactor.wants_packet(packet_id):
+            return False
+
+        # The frame is only valid until the frame reader receives more
+        future = self.executor.submit(
+            decode, connection.options.protocol_version, reactor.state_name,
+            packet_id, bytes(frame[offset:]), data_length)
+        self._pending.append((future, self._heavy_ids[packet_id]))
+        self.offloaded += 1
+        waker = connection._waker
+        if waker is not None:
+            future.add_done_callback(lambda future: waker.wake())
+        return True
+
+    def deliver(self, connection):
+        """Delivers the packets at the front of the line that are ready,
+        called by the networking thread
+        """
+        pending = self._pending
+        while pending and (pending[0][0] is None or pending[0][0].done()):
+            self._deliver_first(connection)
+
+    def drain(self, connection):
+        """Waits for every packet to be decoded and delivers them"""
+        while self._pending:
+            self._deliver_first(connection)
+
+    def _deliver_first(self, connection):
+        future, packet = self._pending.popleft()
+        if future is not None:
+            try:
+                values = future.result()
+            except Exception as e:
+                print("An error was raised whilst decoding a %s packet: %s"
+                      % (packet.packet_name, e))
+                return
+            packet = packet().set_values(**values)
+        connection._handle_packet(packet)
+
+    def shutdown(self, wait=True):
+        """Shuts down the executor"""
+        self.executor.shutdown(wait)
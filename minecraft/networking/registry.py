@@ -0,0 +1,124 @@
+"""Keeps the packet tables of every supported protocol version.
+
+Each version's tables are only built the first time a connection asks for
+that version. Packet classes that are the same in several versions, which
+is most of them, are built once and shared between the versions, and so
+are tables made up of the same classes.
+"""
+from threading import Lock
+import json
+
+from . import packets
+from .. import PROTOCOL_VERSION
+
+
+class Protocol(object):
+    """The packet tables of a single protocol version"""
+    def __init__(self, version, tables):
+        """
+        :param version(int): The protocol version
+        :param tables: Maps STATE_* names, such as STATE_PLAYING_CLIENTBOUND,
+                       to dicts of packet id to packet class
+        """
+        self.version = version
+        self.tables = tables
+        self._names = {}
+
+    def clientbound(self, state):
+        """
+        :param state(str): The networking state, such as "playing"
+        :return: A dict of packet id to the class of the packets the server
+                 sends in that state
+        """
+        return self.tables.get("STATE_%s_CLIENTBOUND" % state.upper(), {})
+
+    def serverbound(self, state, class_name):
+        """Looks up the class of a packet sent to the server by name
+
+        :param state(str): The networking state, such as "playing"
+        :param class_name(str): The packet's class name, such as
+                                "KeepAlivePacket"
+        """
+        table_name = "STATE_%s_SERVERBOUND" % state.upper()
+        names = self._names.get(table_name)
+        if names is None:
+            names = self._names[table_name] = dict(
+                (packet_class.__name__, packet_class)
+                for packet_class in self.tables.get(table_name, {}).values())
+        try:
+            return names[class_name]
+        except KeyError:
+            raise KeyError("Protocol %d has no %s packet %s"
+                           % (self.version, state, class_name))
+
+
+class ProtocolRegistry(object):
+    """Maps protocol versions to their :class:`Protocol`"""
+    def __init__(self):
+        self._sources = {}
+        self._protocols = {}
+        # Shared by every version, see packets.build_packets
+        self._class_cache = {}
+        self._table_cache = {}
+        self._lock = Lock()
+
+    @property
+    def versions(self):
+        """The supported protocol versions"""
+        return sorted(set(self._sources) | set(self._protocols))
+
+    def register(self, version, path):
+        """Adds a protocol version whose packets are described by a JSON
+        file laid out like packets.json. The file is only read once the
+        version is first used.
+        """
+        with self._lock:
+            self._sources[version] = path
+            self._protocols.pop(version, None)
+
+    def add(self, version, tables):
+        """Adds a protocol version whose tables have been built already"""
+        with self._lock:
+            self._protocols[version] = self._share(version, tables)
+
+    def get(self, version):
+        """
+        :return: The :class:`Protocol` of a version
+        :raises ValueError: If the version isn't supported
+        """
+        protocol = self._protocols.get(version)
+        if protocol is not None:
+            return protocol
+
+        with self._lock:
+            if version not in self._protocols:
+                if version not in self._sources:
+                    raise ValueError("Unsupported protocol version %r, "
+                                     "supported versions are %s"
+                                     % (version, self.versions))
+                with open(self._sources[version], "rb") as json_file:
+                    definitions = json.loads(json_file.read().decode("utf-8"))
+                tables, _ = packets.build_packets(definitions,
+                                                  self._class_cache)
+                self._protocols[version] = self._share(version, tables)
+            return self._protocols[version]
+
+    def _share(self, version, tables):
+        # Reuses identical tables of other versions and remembers the
+        # classes so that later versions can reuse them
+        shared = {}
+        for name, table in tables.items():
+            for packet_class in table.values():
+                self._class_cache.setdefault(
+                    packets.packet_signature(name, packet_class.__name__,
+                                             packet_class),
+                    packet_class)
+            key = (name, frozenset(table.items()))
+            shared[name] = self._table_cache.setdefault(key, table)
+        return Protocol(version, shared)
+
+
+#: The registry used by connections, it knows the protocol version
+#: :mod:`packets` was loaded for
+registry = ProtocolRegistry()
+registry.add(PROTOCOL_VERSION, packets._tables)
@@ -1,76 +1,176 @@
 """Contains definitions for minecraft's different data types
 Each type has a method which is used to read and write it.
 These definitions and methods are used by the packet definitions
+
+Besides reading from a file object, every type can be read straight out of
+a buffer with read_from(buf, offset), which returns the value and the
+offset just past it. When buf is a memoryview no intermediate bytes objects
+are created. Likewise write_to(value, buf) appends a value to a bytearray
+without going through a socket.
 """
-import struct, json
+import struct, json, uuid
+from codecs import utf_8_decode
+
+from . import arrays, nbt
 
 class Type(object):
+    # The struct format of types with a fixed width, these can be merged
+    # with their neighbours when a packet is read or written
+    struct_format = None
+
     @staticmethod
     def read(file_object):
         pass
+
+    @staticmethod
+    def read_from(buf, offset):
+        return None, offset
+
+    @classmethod
+    def skip(cls, buf, offset):
+        """Returns the offset just past a value without decoding it, types
+        which can tell their length cheaply override this
+        """
+        return cls.read_from(buf, offset)[1]
     
     @staticmethod
     def send(value, socket):
         pass
 
+    @staticmethod
+    def write_to(value, buf):
+        pass
+
 # =========================================================
 
 class End(Type): pass
 
+_BOOLEAN = struct.Struct('?')
+
 class Boolean(Type):
+    struct_format = '?'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('?', file_object.read(1))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _BOOLEAN.unpack_from(buf, offset)[0], offset + 1
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('?', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _BOOLEAN.pack(value)
+
+_UNSIGNED_BYTE = struct.Struct('>B')
+
 class UnsignedByte(Type):
+    struct_format = '>B'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>B', file_object.read(1))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _UNSIGNED_BYTE.unpack_from(buf, offset)[0], offset + 1
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>B', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _UNSIGNED_BYTE.pack(value)
+
+_BYTE = struct.Struct('>b')
+
 class Byte(Type):
+    struct_format = '>b'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>b', file_object.read(1))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _BYTE.unpack_from(buf, offset)[0], offset + 1
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>b', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _BYTE.pack(value)
+
+_SHORT = struct.Struct('>h')
+
 class Short(Type):
+    struct_format = '>h'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>h', file_object.read(2))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _SHORT.unpack_from(buf, offset)[0], offset + 2
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>h', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _SHORT.pack(value)
+
+_UNSIGNED_SHORT = struct.Struct('>H')
+
 class UnsignedShort(Type):
+    struct_format = '>H'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>H', file_object.read(2))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _UNSIGNED_SHORT.unpack_from(buf, offset)[0], offset + 2
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>H', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _UNSIGNED_SHORT.pack(value)
+
+_INTEGER = struct.Struct('>i')
+
 class Integer(Type):
+    struct_format = '>i'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>i', file_object.read(4))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _INTEGER.unpack_from(buf, offset)[0], offset + 4
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>i', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _INTEGER.pack(value)
+
 class VarInt(Type):
     @staticmethod
     def read_socket(socket):
@@ -96,16 +196,31 @@ class VarInt(Type):
         return number
 
     @staticmethod
-    def send(value, socket):
-        out = bytes()
-        while True:
-            byte = value & 0x7F
-            value >>= 7
-            out += struct.pack("B", byte | (0x80 if value > 0 else 0))
-            if value == 0:
+    def read_from(buf, offset):
+        number = 0
+        for i in range(5):
+            byte = buf[offset + i]
+            number |= (byte & 0x7F) << 7 * i
+            if not byte & 0x80:
                 break
+        return number, offset + i + 1
+
+    @staticmethod
+    def send(value, socket):
+        out = bytearray()
+        VarInt.write_to(value, out)
         socket.send(out)
 
+    @staticmethod
+    def write_to(value, buf):
+        if value < 0:
+            # Negative numbers are sent as their 32 bit two's complement
+            value += 1 << 32
+        while value > 0x7F:
+            buf.append(value & 0x7F | 0x80)
+            value >>= 7
+        buf.append(value)
+
     @staticmethod
     def size(value):
         for max_value, size in VARINT_SIZE_TABLE.items():
@@ -128,76 +243,171 @@ VARINT_SIZE_TABLE = {
     2 ** 84: 12
 }
 
+_LONG = struct.Struct('>q')
+
 class Long(Type):
+    struct_format = '>q'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>q', file_object.read(8))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _LONG.unpack_from(buf, offset)[0], offset + 8
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>q', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _LONG.pack(value)
+
+_UNSIGNED_LONG = struct.Struct('>Q')
+
 class UnsignedLong(Type):
+    struct_format = '>Q'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>Q', file_object.read(8))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _UNSIGNED_LONG.unpack_from(buf, offset)[0], offset + 8
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>Q', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _UNSIGNED_LONG.pack(value)
+
+_FLOAT = struct.Struct('>f')
+
 class Float(Type):
+    struct_format = '>f'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>f', file_object.read(4))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _FLOAT.unpack_from(buf, offset)[0], offset + 4
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>f', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _FLOAT.pack(value)
+
+_DOUBLE = struct.Struct('>d')
+
 class Double(Type):
+    struct_format = '>d'
+
     @staticmethod
     def read(file_object):
         return struct.unpack('>d', file_object.read(8))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        return _DOUBLE.unpack_from(buf, offset)[0], offset + 8
+
     @staticmethod
     def send(value, socket):
         socket.send(struct.pack('>d', value))
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _DOUBLE.pack(value)
+
 class ShortPrefixedByteArray(Type):
     @staticmethod
     def read(file_object):
         length = Short.read(file_object)
         return struct.unpack(str(length) + "s", file_object.read(length))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        length, offset = Short.read_from(buf, offset)
+        return bytes(buf[offset:offset + length]), offset + length
+
+    @staticmethod
+    def skip(buf, offset):
+        length, offset = Short.read_from(buf, offset)
+        return offset + length
+
     @staticmethod
     def send(value, socket):
         Short.send(len(value), socket)
         socket.send(value)
 
+    @staticmethod
+    def write_to(value, buf):
+        buf += _SHORT.pack(len(value))
+        buf += value
+
 class VarIntPrefixedByteArray(Type):
     @staticmethod
     def read(file_object):
         length = VarInt.read(file_object)
         return struct.unpack(str(length) + "s", file_object.read(length))[0]
 
+    @staticmethod
+    def read_from(buf, offset):
+        length, offset = VarInt.read_from(buf, offset)
+        return bytes(buf[offset:offset + length]), offset + length
+
+    @staticmethod
+    def skip(buf, offset):
+        length, offset = VarInt.read_from(buf, offset)
+        return offset + length
+
     @staticmethod
     def send(value, socket):
         VarInt.send(len(value), socket)
         socket.send(struct.pack(str(len(value)) + "s", value))
 
+    @staticmethod
+    def write_to(value, buf):
+        VarInt.write_to(len(value), buf)
+        buf += value
+
 class String(Type):
     @staticmethod
     def read(file_object):
         length = VarInt.read(file_object)
         return file_object.read(length).decode("utf-8")
 
+    @staticmethod
+    def read_from(buf, offset):
+        length, offset = VarInt.read_from(buf, offset)
+        end = offset + length
+        return utf_8_decode(buf[offset:end], None, True)[0], end
+
+    @staticmethod
+    def skip(buf, offset):
+        length, offset = VarInt.read_from(buf, offset)
+        return offset + length
+
     @staticmethod
     def send(value, socket):
         value = value.encode('utf-8')
         VarInt.send(len(value), socket)
         socket.send(value)
 
+    @staticmethod
+    def write_to(value, buf):
+        value = value.encode('utf-8')
+        VarInt.write_to(len(value), buf)
+        buf += value
+
 class List(Type):
     @staticmethod
     def read(file_object):
@@ -207,34 +417,83 @@ class List(Type):
         for i in range(length):
             out.append(tags[type_id].read(file_object))
         return [type_id, out]
+
+    @staticmethod
+    def read_from(buf, offset):
+        type_id, offset = Byte.read_from(buf, offset)
+        length, offset = VarInt.read_from(buf, offset)
+        item_type = tags[type_id]
+        if item_type.struct_format is not None:
+            # Numbers are unpacked all at once
+            code = item_type.struct_format.lstrip('>')
+            out = list(struct.unpack_from('>%d%s' % (length, code), buf,
+                                          offset))
+            return [type_id, out], offset + length * struct.calcsize(code)
+        out = []
+        for i in range(length):
+            value, offset = item_type.read_from(buf, offset)
+            out.append(value)
+        return [type_id, out], offset
     
     @staticmethod
     def send(value, socket):
         type_id = value[0]
-        Byte.send(type_id)
-        VarInt.send(len(value[1]))
+        Byte.send(type_id, socket)
+        VarInt.send(len(value[1]), socket)
         for i in value[1]:
             tags[type_id].send(i, socket)
+
+    @staticmethod
+    def write_to(value, buf):
+        type_id = value[0]
+        Byte.write_to(type_id, buf)
+        VarInt.write_to(len(value[1]), buf)
+        for i in value[1]:
+            tags[type_id].write_to(i, buf)
             
 class IntArray(Type):
+    # Read into a NumPy array rather than an array.array when set
+    use_numpy = False
+
     @staticmethod
     def read(file_object):
         length = VarInt.read(file_object)
-        out = []
-        for i in range(length):
-            out.append(Integer.read(file_object))
-        return out
+        return arrays.read_array(file_object.read(4 * length), 0, length,
+                                 'i', IntArray.use_numpy)[0]
+
+    @staticmethod
+    def read_from(buf, offset):
+        length, offset = VarInt.read_from(buf, offset)
+        return arrays.read_array(buf, offset, length, 'i', IntArray.use_numpy)
+
+    @staticmethod
+    def skip(buf, offset):
+        length, offset = VarInt.read_from(buf, offset)
+        return offset + 4 * length
     
     @staticmethod
     def send(value, socket):
-        VarInt.send(len(value))
-        for i in value:
-            Integer.send(i, socket)
+        buf = bytearray()
+        IntArray.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        VarInt.write_to(len(value), buf)
+        arrays.write_array(value, 'i', buf)
 
 class Position(Type):
     @staticmethod
     def read(file_object):
-        val = UnsignedLong.read(file_object)
+        return Position._decode(UnsignedLong.read(file_object))
+
+    @staticmethod
+    def read_from(buf, offset):
+        val, offset = UnsignedLong.read_from(buf, offset)
+        return Position._decode(val), offset
+
+    @staticmethod
+    def _decode(val):
         x = val >> 38
         y = (val >> 26) & 0xFFF
         z = val & 0x3FFFFFF
@@ -245,25 +504,64 @@ class Position(Type):
         
     @staticmethod
     def send(value, socket):
-        Long.send(((x & 0x3FFFFFF) << 38) | ((y & 0xFFF) << 26) | (z & 0x3FFFFFF), socket)
+        UnsignedLong.send(Position._encode(value), socket)
+
+    @staticmethod
+    def write_to(value, buf):
+        UnsignedLong.write_to(Position._encode(value), buf)
+
+    @staticmethod
+    def _encode(value):
+        x, y, z = value
+        return ((x & 0x3FFFFFF) << 38) | ((y & 0xFFF) << 26) | (z & 0x3FFFFFF)
 
 class Chat(Type):
     @staticmethod
     def read(file_object):
         return json.loads(String.read(file_object))
+
+    @staticmethod
+    def read_from(buf, offset):
+        value, offset = String.read_from(buf, offset)
+        return json.loads(value), offset
     
+    @staticmethod
+    def skip(buf, offset):
+        return String.skip(buf, offset)
+
     @staticmethod
     def send(value, socket):
         String.send(json.dumps(value), socket)
 
+    @staticmethod
+    def write_to(value, buf):
+        String.write_to(json.dumps(value), buf)
+
 class Nbt(Type):
+    # How NBT is read, one of nbt.EAGER, nbt.LAZY or nbt.SKIP
+    mode = nbt.EAGER
+
     @staticmethod
     def read(file_object):
-        print ord(file_object.read(1))
-    
+        return nbt.read(file_object, Nbt.mode)
+
     @staticmethod
-    def send(file_object):
-        pass
+    def read_from(buf, offset):
+        return nbt.read_from(buf, offset, Nbt.mode)
+
+    @staticmethod
+    def skip(buf, offset):
+        return nbt.skip(buf, offset)
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        nbt.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        nbt.write_to(value, buf)
     
 tags = [
     End,
@@ -280,6 +578,10 @@ tags = [
     IntArray]
 
 class Slot(Type):
+    # How the NBT of items is read, one of nbt.EAGER, nbt.LAZY or nbt.SKIP.
+    # Skipping is much cheaper when the items' NBT isn't needed.
+    nbt_mode = nbt.EAGER
+
     @staticmethod
     def read(file_object):
         item = {}
@@ -288,12 +590,339 @@ class Slot(Type):
             return item
         item["count"] = Byte.read(file_object)
         item["damage"] = Short.read(file_object)
-        has_nbt = Byte.read(file_object)
-        #if has_nbt:
-            #file_object.seek(file_object.tell()-1)
-            #item["nbt"] = Nbt.read(file_object)
+        item["nbt"] = nbt.read(file_object, Slot.nbt_mode)
         return item
 
+    @staticmethod
+    def read_from(buf, offset):
+        item = {}
+        item["id"], offset = Short.read_from(buf, offset)
+        if item["id"] == -1:
+            return item, offset
+        item["count"], offset = Byte.read_from(buf, offset)
+        item["damage"], offset = Short.read_from(buf, offset)
+        item["nbt"], offset = nbt.read_from(buf, offset, Slot.nbt_mode)
+        return item, offset
+
+    @staticmethod
+    def skip(buf, offset):
+        item_id, offset = Short.read_from(buf, offset)
+        if item_id == -1:
+            return offset
+        return nbt.skip(buf, offset + 3)
+
     @staticmethod
     def send(value, socket):
-        socket.send(struct.pack('?', value))
+        buf = bytearray()
+        Slot.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        Short.write_to(value["id"], buf)
+        if value["id"] == -1:
+            return
+        Byte.write_to(value["count"], buf)
+        Short.write_to(value["damage"], buf)
+        nbt.write_to(value.get("nbt"), buf)
+
+class SlotArray(Type):
+    """A Short count followed by that many slots, read into an
+    arrays.Slots. Windows have dozens to hundreds of slots, which are much
+    cheaper to decode into a few arrays than into a dict each.
+    """
+    # Read the slots' fields into NumPy arrays rather than array.arrays
+    use_numpy = False
+
+    @staticmethod
+    def read(file_object):
+        count = Short.read(file_object)
+        return arrays.Slots.from_items(
+            [Slot.read(file_object) for i in range(count)])
+
+    @staticmethod
+    def read_from(buf, offset):
+        count, offset = Short.read_from(buf, offset)
+        return arrays.Slots.read_from(buf, offset, count, Slot.nbt_mode,
+                                      SlotArray.use_numpy)
+
+    @staticmethod
+    def skip(buf, offset):
+        count, offset = Short.read_from(buf, offset)
+        for i in range(count):
+            offset = Slot.skip(buf, offset)
+        return offset
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        SlotArray.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        if not isinstance(value, arrays.Slots):
+            value = arrays.Slots.from_items(value)
+        Short.write_to(len(value), buf)
+        value.write_to(buf)
+
+class TrailingByteArray(Type):
+    """Bytes running up to the end of the packet, without a length prefix"""
+    @staticmethod
+    def read(file_object):
+        return file_object.read()
+
+    @staticmethod
+    def read_from(buf, offset):
+        return bytes(buf[offset:]), len(buf)
+
+    @staticmethod
+    def skip(buf, offset):
+        return len(buf)
+
+    @staticmethod
+    def send(value, socket):
+        socket.send(value)
+
+    @staticmethod
+    def write_to(value, buf):
+        buf += value
+
+_CHUNK_META = struct.Struct('>iiH')
+
+class ChunkBulkMeta(Type):
+    """The columns of a map chunk bulk packet: a VarInt count followed by
+    the chunk x, chunk z and primary bit mask of each column, read as a
+    list of (x, z, bit_mask) tuples
+    """
+    @staticmethod
+    def read(file_object):
+        count = VarInt.read(file_object)
+        return [_CHUNK_META.unpack(file_object.read(_CHUNK_META.size))
+                for i in range(count)]
+
+    @staticmethod
+    def read_from(buf, offset):
+        count, offset = VarInt.read_from(buf, offset)
+        values = struct.unpack_from('>' + 'iiH' * count, buf, offset)
+        columns = list(zip(values[0::3], values[1::3], values[2::3]))
+        return columns, offset + count * _CHUNK_META.size
+
+    @staticmethod
+    def skip(buf, offset):
+        count, offset = VarInt.read_from(buf, offset)
+        return offset + count * _CHUNK_META.size
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        ChunkBulkMeta.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        VarInt.write_to(len(value), buf)
+        for column in value:
+            buf += _CHUNK_META.pack(*column)
+
+_BLOCK_CHANGE = struct.Struct('>BB')
+
+class BlockChangeRecords(Type):
+    """The records of a multi block change packet, read as a list of
+    (x, y, z, block_state) tuples with x and z relative to the chunk
+    """
+    @staticmethod
+    def read(file_object):
+        out = []
+        for i in range(VarInt.read(file_object)):
+            horizontal, y = _BLOCK_CHANGE.unpack(file_object.read(2))
+            out.append((horizontal >> 4, y, horizontal & 0xF,
+                        VarInt.read(file_object)))
+        return out
+
+    @staticmethod
+    def read_from(buf, offset):
+        count, offset = VarInt.read_from(buf, offset)
+        out = []
+        unpack = _BLOCK_CHANGE.unpack_from
+        read_varint = VarInt.read_from
+        for i in range(count):
+            horizontal, y = unpack(buf, offset)
+            block_state, offset = read_varint(buf, offset + 2)
+            out.append((horizontal >> 4, y, horizontal & 0xF, block_state))
+        return out, offset
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        BlockChangeRecords.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        VarInt.write_to(len(value), buf)
+        for x, y, z, block_state in value:
+            buf += _BLOCK_CHANGE.pack(x << 4 | z, y)
+            VarInt.write_to(block_state, buf)
+
+class Angle(UnsignedByte):
+    """A rotation in steps of 1/256 of a full turn, read as the raw step"""
+
+class UUID(Type):
+    @staticmethod
+    def read(file_object):
+        return uuid.UUID(bytes=file_object.read(16))
+
+    @staticmethod
+    def read_from(buf, offset):
+        return uuid.UUID(bytes=bytes(buf[offset:offset + 16])), offset + 16
+
+    @staticmethod
+    def skip(buf, offset):
+        return offset + 16
+
+    @staticmethod
+    def send(value, socket):
+        socket.send(value.bytes)
+
+    @staticmethod
+    def write_to(value, buf):
+        buf += value.bytes
+
+class VarIntArray(Type):
+    """A VarInt count followed by that many VarInts, read as a list"""
+    @staticmethod
+    def read(file_object):
+        return [VarInt.read(file_object)
+                for i in range(VarInt.read(file_object))]
+
+    @staticmethod
+    def read_from(buf, offset):
+        count, offset = VarInt.read_from(buf, offset)
+        out = []
+        read_varint = VarInt.read_from
+        for i in range(count):
+            value, offset = read_varint(buf, offset)
+            out.append(value)
+        return out, offset
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        VarIntArray.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        VarInt.write_to(len(value), buf)
+        for i in value:
+            VarInt.write_to(i, buf)
+
+_VELOCITY = struct.Struct('>hhh')
+
+class ObjectData(Type):
+    """The data of a spawned object, read as (data, velocity). The velocity
+    is a tuple of three Shorts, only sent when data isn't 0, else None.
+    """
+    @staticmethod
+    def read(file_object):
+        data = Integer.read(file_object)
+        if data == 0:
+            return data, None
+        return data, _VELOCITY.unpack(file_object.read(_VELOCITY.size))
+
+    @staticmethod
+    def read_from(buf, offset):
+        data, offset = Integer.read_from(buf, offset)
+        if data == 0:
+            return (data, None), offset
+        return (data, _VELOCITY.unpack_from(buf, offset)), \
+            offset + _VELOCITY.size
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        ObjectData.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        data, velocity = value
+        Integer.write_to(data, buf)
+        if data != 0:
+            buf += _VELOCITY.pack(*velocity)
+
+_METADATA_END = 0x7F
+_POSITION = struct.Struct('>iii')
+_ROTATION = struct.Struct('>fff')
+
+class EntityMetadata(Type):
+    """Entity metadata, read as a dict of index to (type, value). The types
+    are 0 Byte, 1 Short, 2 Integer, 3 Float, 4 String, 5 Slot, 6 a
+    position of three Integers and 7 a rotation of three Floats.
+    """
+    @staticmethod
+    def read(file_object):
+        metadata = {}
+        while True:
+            key = UnsignedByte.read(file_object)
+            if key == _METADATA_END:
+                return metadata
+            type_id = key >> 5
+            metadata[key & 0x1F] = (
+                type_id, EntityMetadata.types[type_id].read(file_object))
+
+    @staticmethod
+    def read_from(buf, offset):
+        metadata = {}
+        types = EntityMetadata.types
+        while True:
+            key = buf[offset]
+            offset += 1
+            if key == _METADATA_END:
+                return metadata, offset
+            type_id = key >> 5
+            value, offset = types[type_id].read_from(buf, offset)
+            metadata[key & 0x1F] = (type_id, value)
+
+    @staticmethod
+    def send(value, socket):
+        buf = bytearray()
+        EntityMetadata.write_to(value, buf)
+        socket.send(bytes(buf))
+
+    @staticmethod
+    def write_to(value, buf):
+        for index, (type_id, item) in sorted(value.items()):
+            buf.append(type_id << 5 | index)
+            EntityMetadata.types[type_id].write_to(item, buf)
+        buf.append(_METADATA_END)
+
+class _MetadataPosition(Type):
+    @staticmethod
+    def read(file_object):
+        return _POSITION.unpack(file_object.read(_POSITION.size))
+
+    @staticmethod
+    def read_from(buf, offset):
+        return _POSITION.unpack_from(buf, offset), offset + _POSITION.size
+
+    @staticmethod
+    def write_to(value, buf):
+        buf += _POSITION.pack(*value)
+
+class _MetadataRotation(Type):
+    @staticmethod
+    def read(file_object):
+        return _ROTATION.unpack(file_object.read(_ROTATION.size))
+
+    @staticmethod
+    def read_from(buf, offset):
+        return _ROTATION.unpack_from(buf, offset), offset + _ROTATION.size
+
+    @staticmethod
+    def write_to(value, buf):
+        buf += _ROTATION.pack(*value)
+
+EntityMetadata.types = [Byte, Short, Integer, Float, String, Slot,
+                        _MetadataPosition, _MetadataRotation]
@@ -0,0 +1,404 @@
+"""Keeps track of the blocks of the chunks the server has sent.
+
+Chunks are split into 16 sections of 16x16x16 blocks. Every section which
+isn't entirely air keeps its blocks in a NumPy ``uint16`` array of 4096
+block states, ``block id << 4 | metadata`` as the protocol sends them,
+indexed by ``y << 8 | z << 4 | x``. Looking a block up by its world
+coordinates is a dict lookup for the chunk and an index into the arrays.
+
+Memory used per chunk:
+
+- 8 KiB of blocks for each section that isn't empty
+- 2 KiB of block light and, in dimensions with a sky, 2 KiB of sky light
+  for each such section, unless the world is created with
+  ``keep_light=False``
+- 256 bytes of biomes
+
+A typical overworld chunk has 4 to 8 sections, so it takes 48 to 96 KiB
+with light and 32 to 64 KiB without. ``python -m benchmarks.bench_world``
+measures it.
+
+A :class:`World` passed to a connection as its ``world`` option is kept up
+to date with the chunk data, map chunk bulk, block change and multi block
+change packets the connection receives.
+
+Bots which run for a long time can cap the memory the world takes with
+``max_bytes``. Once the chunks take up more than that, the least recently
+used chunks, or those farthest from the player, are forgotten. Chunks
+which haven't been used for ``compress_after`` seconds are compressed
+with zlib until they're next used, which shrinks mostly uniform chunks
+tenfold.
+"""
+from threading import Lock
+import time
+import zlib
+
+import numpy
+
+SECTION_BLOCKS = 16 * 16 * 16
+_BLOCKS_SIZE = SECTION_BLOCKS * 2
+_LIGHT_SIZE = SECTION_BLOCKS // 2
+_BIOMES_SIZE = 16 * 16
+
+
+class Section(object):
+    """16x16x16 blocks of a chunk
+
+    :ivar blocks: The block states, indexed by ``y << 8 | z << 4 | x``
+    :ivar block_light: 2048 bytes holding a light level in each nibble, or
+                       None when light isn't kept
+    :ivar sky_light: Like block_light, None in dimensions without a sky
+    """
+    __slots__ = ("blocks", "block_light", "sky_light")
+
+    def __init__(self, blocks=None, block_light=None, sky_light=None):
+        if blocks is None:
+            blocks = numpy.zeros(SECTION_BLOCKS, numpy.uint16)
+        self.blocks = blocks
+        self.block_light = block_light
+        self.sky_light = sky_light
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in
+                   (self.blocks, self.block_light, self.sky_light)
+                   if array is not None)
+
+
+class Chunk(object):
+    """A 16x256x16 column of blocks
+
+    :ivar sections: 16 sections from bottom to top, None for empty ones
+    :ivar biomes: 256 bytes of biome ids or None if none were sent
+    """
+    __slots__ = ("x", "z", "sections", "biomes", "packed", "layout",
+                 "last_used")
+
+    def __init__(self, x, z):
+        self.x = x
+        self.z = z
+        self.sections = [None] * 16
+        self.biomes = None
+        # The zlib compressed sections of a packed chunk, whose sections
+        # are then None, and which of them were there
+        self.packed = None
+        self.layout = None
+        self.last_used = 0
+
+    def get_block(self, x, y, z):
+        """
+        :param x, y, z(int): Coordinates relative to the chunk
+        :return: The block state at those coordinates
+        """
+        section = self.sections[y >> 4]
+        if section is None:
+            return 0
+        return section.blocks.item((y & 0xF) << 8 | z << 4 | x)
+
+    def set_block(self, x, y, z, block_state):
+        """
+        :return: The number of bytes the chunk grew by, which is only more
+                 than 0 when a block is put into an empty section
+        """
+        section = self.sections[y >> 4]
+        added = 0
+        if section is None:
+            if block_state == 0:
+                return added
+            section = self.sections[y >> 4] = Section()
+            added = section.nbytes
+        section.blocks[(y & 0xF) << 8 | z << 4 | x] = block_state
+        return added
+
+    def pack(self):
+        """Compresses the sections, which have to be unpacked again before
+        the chunk's blocks can be used
+        """
+        layout, parts = [], []
+        for index, section in enumerate(self.sections):
+            if section is None:
+                continue
+            layout.append((index, section.block_light is not None,
+                           section.sky_light is not None))
+            parts.append(section.blocks.tobytes())
+            if section.block_light is not None:
+                parts.append(section.block_light.tobytes())
+            if section.sky_light is not None:
+                parts.append(section.sky_light.tobytes())
+        self.packed = zlib.compress(b"".join(parts), 1)
+        self.layout = tuple(layout)
+        self.sections = None
+
+    def unpack(self):
+        """Decompresses the sections of a packed chunk
+        :return: The sections
+        """
+        data = zlib.decompress(self.packed)
+        sections = [None] * 16
+        offset = 0
+        for index, has_block_light, has_sky_light in self.layout:
+            section = sections[index] = Section(numpy.frombuffer(
+                data, numpy.uint16, SECTION_BLOCKS, offset).copy())
+            offset += _BLOCKS_SIZE
+            if has_block_light:
+                section.block_light = numpy.frombuffer(
+                    data, numpy.uint8, _LIGHT_SIZE, offset).copy()
+                offset += _LIGHT_SIZE
+            if has_sky_light:
+                section.sky_light = numpy.frombuffer(
+                    data, numpy.uint8, _LIGHT_SIZE, offset).copy()
+                offset += _LIGHT_SIZE
+        self.sections = sections
+        self.packed = self.layout = None
+        return sections
+
+    @property
+    def nbytes(self):
+        """The memory taken up by the chunk's arrays"""
+        if self.sections is None:
+            size = len(self.packed)
+        else:
+            size = sum(section.nbytes for section in self.sections
+                       if section is not None)
+        if self.biomes is not None:
+            size += len(self.biomes)
+        return size
+
+
+class World(object):
+    """The chunks the client has been sent, keyed by their (x, z)
+
+    :ivar player_position: The player's (x, z), chunks farthest from it are
+                           evicted first when evicting by distance
+    :ivar evicted(int): The number of chunks evicted to stay within budget
+    """
+
+    # Names of the packets react() applies
+    handled_packets = ("chunk data", "map chunk bulk", "block change",
+                       "multi block change")
+    # Evicting stops once the chunks take up this share of max_bytes, so
+    # that not every new chunk evicts another one
+    low_water = 0.9
+
+    def __init__(self, keep_light=True, max_bytes=None, evict="lru",
+                 compress_after=None):
+        """
+        :param keep_light(bool): Whether to keep the light levels sent
+                                 along with the blocks, dropping them
+                                 saves a third of the memory
+        :param max_bytes(int): The most memory the chunks may take up, or
+                               None for no limit
+        :param evict(str): Which chunks go first once over max_bytes,
+                           "lru" for the least recently used and
+                           "distance" for the farthest from the player
+        :param compress_after(float): Seconds after which unused chunks are
+                                      compressed, or None to never
+                                      compress them
+        """
+        if evict not in ("lru", "distance"):
+            raise ValueError("evict must be 'lru' or 'distance', not %r"
+                             % (evict,))
+        self.keep_light = keep_light
+        self.max_bytes = max_bytes
+        self.evict = evict
+        self.compress_after = compress_after
+        self.chunks = {}
+        self.player_position = None
+        self.evicted = 0
+        # The memory taken up by the chunks, kept up to date as they change
+        self._size = 0
+        # Chunks are marked as used at this time, which maintain() updates,
+        # rather than reading the clock on every lookup
+        self._now = self._last_compressed = time.time()
+        self._lock = Lock()
+
+    def _use(self, chunk):
+        # Returns the sections of a chunk which is about to be used
+        chunk.last_used = self._now
+        sections = chunk.sections
+        if sections is None:
+            with self._lock:
+                if chunk.sections is None:
+                    size = chunk.nbytes
+                    chunk.unpack()
+                    self._size += chunk.nbytes - size
+                sections = chunk.sections
+        return sections
+
+    def get_chunk(self, chunk_x, chunk_z):
+        """:return: The chunk at chunk coordinates or None"""
+        chunk = self.chunks.get((chunk_x, chunk_z))
+        if chunk is not None:
+            self._use(chunk)
+        return chunk
+
+    def get_block(self, x, y, z):
+        """
+        :param x, y, z(int): World coordinates
+        :return: The block state at those coordinates, or None if its chunk
+                 isn't loaded
+        """
+        chunk = self.chunks.get((x >> 4, z >> 4))
+        if chunk is None:
+            return None
+        if not 0 <= y < 256:
+            return 0
+        section = self._use(chunk)[y >> 4]
+        if section is None:
+            return 0
+        return section.blocks.item((y & 0xF) << 8 | (z & 0xF) << 4 | x & 0xF)
+
+    def set_block(self, x, y, z, block_state):
+        """Changes a block, blocks of chunks that aren't loaded are
+        ignored"""
+        chunk = self.chunks.get((x >> 4, z >> 4))
+        if chunk is not None and 0 <= y < 256:
+            self._use(chunk)
+            self._size += chunk.set_block(x & 0xF, y, z & 0xF, block_state)
+
+    def unload_chunk(self, chunk_x, chunk_z):
+        chunk = self.chunks.pop((chunk_x, chunk_z), None)
+        if chunk is not None:
+            self._size -= chunk.nbytes
+
+    def load_chunk(self, chunk_x, chunk_z, bit_mask, data, offset=0,
+                   ground_up_continuous=True, sky_light=True):
+        """Reads a chunk column as sent in chunk data and map chunk bulk
+        packets
+
+        :param bit_mask(int): The primary bit mask, which sections are sent
+        :param data: A buffer holding the column's data
+        :param offset(int): Where the column's data starts
+        :param ground_up_continuous(bool): Whether the whole column is
+                                           sent, rather than some sections
+                                           of a loaded chunk
+        :param sky_light(bool): Whether sky light is sent
+        :return: The offset just past the column's data
+        """
+        indices = [i for i in range(16) if bit_mask & (1 << i)]
+        count = len(indices)
+
+        chunk = self.chunks.get((chunk_x, chunk_z))
+        if chunk is None:
+            chunk = Chunk(chunk_x, chunk_z)
+        else:
+            self._size -= chunk.nbytes
+            if ground_up_continuous:
+                chunk.sections = [None] * 16
+                chunk.packed = chunk.layout = None
+        chunk.last_used = self._now
+        if chunk.sections is None:
+            chunk.unpack()
+
+        # Blocks are little-endian, unlike the rest of the protocol. Each
+        # section gets its own copy so the buffer can be reused.
+        blocks = numpy.frombuffer(data, "<u2", count * SECTION_BLOCKS,
+                                  offset).reshape(count, SECTION_BLOCKS)
+        offset += count * _BLOCKS_SIZE
+        block_light = sky = None
+        if self.keep_light:
+            block_light = numpy.frombuffer(data, numpy.uint8,
+                                           count * _LIGHT_SIZE, offset)
+        offset += count * _LIGHT_SIZE
+        if sky_light:
+            if self.keep_light:
+                sky = numpy.frombuffer(data, numpy.uint8,
+                                       count * _LIGHT_SIZE, offset)
+            offset += count * _LIGHT_SIZE
+
+        for n, index in enumerate(indices):
+            section = Section(blocks[n].astype(numpy.uint16))
+            if block_light is not None:
+                start = n * _LIGHT_SIZE
+                section.block_light = block_light[
+                    start:start + _LIGHT_SIZE].copy()
+                if sky is not None:
+                    section.sky_light = sky[start:start + _LIGHT_SIZE].copy()
+            chunk.sections[index] = section
+
+        if ground_up_continuous:
+            chunk.biomes = bytes(data[offset:offset + _BIOMES_SIZE])
+            offset += _BIOMES_SIZE
+        self.chunks[chunk_x, chunk_z] = chunk
+        self._size += chunk.nbytes
+        return offset
+
+    def react(self, packet):
+        """Applies a chunk or block change packet"""
+        name = packet.packet_name
+        if name == "chunk data":
+            if packet.ground_up_continuous and not packet.primary_bit_mask:
+                # Sent when the client should forget the chunk
+                self.unload_chunk(packet.chunk_x, packet.chunk_z)
+                return
+            # Whether sky light is sent can only be told from the size
+            count = bin(packet.primary_bit_mask).count("1")
+            size = count * (_BLOCKS_SIZE + _LIGHT_SIZE)
+            if packet.ground_up_continuous:
+                size += _BIOMES_SIZE
+            self.load_chunk(packet.chunk_x, packet.chunk_z,
+                            packet.primary_bit_mask, packet.data, 0,
+                            packet.ground_up_continuous,
+                            len(packet.data) > size)
+
+        elif name == "map chunk bulk":
+            offset = 0
+            for chunk_x, chunk_z, bit_mask in packet.columns:
+                offset = self.load_chunk(chunk_x, chunk_z, bit_mask,
+                                         packet.data, offset, True,
+                                         packet.sky_light_sent)
+
+        elif name == "block change":
+            x, y, z = packet.location
+            self.set_block(x, y, z, packet.block_state)
+
+        elif name == "multi block change":
+            chunk = self.chunks.get((packet.chunk_x, packet.chunk_z))
+            if chunk is not None:
+                self._use(chunk)
+                for x, y, z, block_state in packet.records:
+                    self._size += chunk.set_block(x, y, z, block_state)
+
+    def maintain(self):
+        """Compresses idle chunks and evicts chunks while the world is over
+        its budget, the connection calls this after every chunk packet
+        """
+        self._now = now = time.time()
+        # Looking for idle chunks goes through all of them, so it's only
+        # done every so often
+        if self.compress_after is not None and \
+                now - self._last_compressed >= min(self.compress_after, 1):
+            self._last_compressed = now
+            idle = now - self.compress_after
+            with self._lock:
+                for chunk in list(self.chunks.values()):
+                    if chunk.sections is not None and chunk.last_used < idle:
+                        size = chunk.nbytes
+                        chunk.pack()
+                        self._size += chunk.nbytes - size
+
+        if self.max_bytes is not None and self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        if self.evict == "distance" and self.player_position is not None:
+            x, z = self.player_position
+            # Farthest first
+            def order(chunk):
+                return -((chunk.x * 16 + 8 - x) ** 2 +
+                         (chunk.z * 16 + 8 - z) ** 2)
+        else:
+            def order(chunk):
+                return chunk.last_used
+
+        target = self.max_bytes * self.low_water
+        for chunk in sorted(self.chunks.values(), key=order):
+            if self._size <= target:
+                break
+            self.unload_chunk(chunk.x, chunk.z)
+            self.evicted += 1
+
+    @property
+    def nbytes(self):
+        """The memory taken up by the arrays of every loaded chunk"""
+        return self._size
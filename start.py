@@ -5,6 +5,7 @@ from optparse import OptionParser
 from minecraft import authentication
 from minecraft.exceptions import YggdrasilError
 from minecraft.networking.connection import Connection
+from minecraft.networking.dispatch import ListenerExecutor
 from minecraft.networking.packets import *
 from minecraft.compat import input
 import time
@@ -64,7 +65,9 @@ class Main(object):
             print(e)
             sys.exit()
         print("Logged in as " + self.auth_token.username)
-        self.network = Connection(options.address, options.port, self.auth_token)
+        # The listeners print, which mustn't hold up the keep alives
+        self.network = Connection(options.address, options.port, self.auth_token,
+                                  listener_executor=ListenerExecutor())
         self.network.connect()
         self.register_listeners()
         #sys.stdout = Speaker(self)
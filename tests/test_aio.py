@@ -0,0 +1,126 @@
+import asyncio
+import unittest
+from minecraft.networking.aio import AsyncConnection
+from minecraft.networking.packets import (
+    PacketBuffer, KeepAlivePacket, ChatMessagePacket, LoginSuccessPacket)
+from minecraft.networking.types import VarInt
+from .compat import mock
+
+
+def serialize(packet):
+    packet_buffer = PacketBuffer()
+    packet.write(packet_buffer)
+    return packet_buffer.get_writable()
+
+
+async def read_packet(reader):
+    length = 0
+    for i in range(3):
+        byte = (await reader.readexactly(1))[0]
+        length |= (byte & 0x7F) << 7 * i
+        if not byte & 0x80:
+            break
+    data = await reader.readexactly(length)
+    packet_id, offset = VarInt.read_from(data, 0)
+    return packet_id, data[offset:]
+
+
+class AsyncConnectionTest(unittest.TestCase):
+
+    def run_with_server(self, client_coroutine, server_coroutine):
+        async def main():
+            server = await asyncio.start_server(server_coroutine,
+                                                "localhost", 0)
+            port = server.sockets[0].getsockname()[1]
+            auth_token = mock.Mock()
+            auth_token.profile.name = "Player"
+            connection = AsyncConnection("localhost", port, auth_token)
+            try:
+                return await asyncio.wait_for(client_coroutine(connection), 5)
+            finally:
+                connection.close()
+                server.close()
+                await server.wait_closed()
+        return asyncio.run(main())
+
+    async def log_in(self, reader, writer):
+        await read_packet(reader)  # Handshake
+        await read_packet(reader)  # Login start
+        success = LoginSuccessPacket().set_values(UUID="0", Username="Player")
+        writer.write(serialize(success))
+
+    def test_keep_alive_and_wait_for(self):
+        echoed = []
+
+        async def server(reader, writer):
+            await self.log_in(reader, writer)
+            writer.write(serialize(
+                KeepAlivePacket().set_values(keep_alive_id=42)))
+            echoed.append(await read_packet(reader))
+            writer.write(serialize(
+                ChatMessagePacket().set_values(json_data='"hi"', position=0)))
+            await reader.read()
+
+        async def client(connection):
+            waiter = asyncio.ensure_future(
+                connection.wait_for(ChatMessagePacket))
+            await connection.connect()
+            packet = await waiter
+            return connection.playing, packet.json_data
+
+        self.assertEqual(self.run_with_server(client, server),
+                         (True, '"hi"'))
+        keep_alive = serialize(KeepAlivePacket().set_values(keep_alive_id=42))
+        self.assertEqual(echoed[0][1], bytes(keep_alive[2:]))
+
+    def test_packets_iterator_and_send(self):
+        async def server(reader, writer):
+            await self.log_in(reader, writer)
+            for i in range(3):
+                writer.write(serialize(
+                    KeepAlivePacket().set_values(keep_alive_id=i)))
+            # Wait for the echoed keep alives and the extra packet
+            for i in range(4):
+                await read_packet(reader)
+            writer.close()
+
+        async def client(connection):
+            await connection.connect()
+            await connection.send(
+                KeepAlivePacket().set_values(keep_alive_id=99))
+            ids = []
+            async for packet in connection.packets(KeepAlivePacket):
+                ids.append(packet.keep_alive_id)
+            await connection.closed
+            return ids, connection.connected, connection.packet_listeners
+
+        self.assertEqual(self.run_with_server(client, server),
+                         ([0, 1, 2], False, []))
+
+    def test_pooled_packets_kept_by_iterator(self):
+        async def server(reader, writer):
+            await self.log_in(reader, writer)
+            for i in range(3):
+                writer.write(serialize(
+                    KeepAlivePacket().set_values(keep_alive_id=i)))
+            for i in range(3):
+                await read_packet(reader)
+            writer.close()
+
+        async def client(connection):
+            connection.options.pooled_packets = (KeepAlivePacket,)
+            iterator = connection.packets(KeepAlivePacket)
+            first = asyncio.ensure_future(iterator.__anext__())
+            await connection.connect()
+            # Only read on once every keep alive has been queued, a
+            # recycled packet would have been overwritten by then
+            await connection.closed
+            queued = [await first]
+            async for packet in iterator:
+                queued.append(packet)
+            return queued
+
+        queued = self.run_with_server(client, server)
+        self.assertEqual([packet.keep_alive_id for packet in queued],
+                         [0, 1, 2])
+        self.assertEqual(len(set(map(id, queued))), 3)
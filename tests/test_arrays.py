@@ -0,0 +1,107 @@
+import subprocess
+import sys
+import unittest
+from array import array
+from minecraft.networking import arrays, nbt, packets
+from minecraft.networking.types import IntArray, List, SlotArray, Slot
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def sample_items():
+    tag = nbt.Compound()
+    tag["Damage"] = 3
+    return [{"id": 276, "count": 1, "damage": 5, "nbt": tag},
+            {"id": -1},
+            {"id": 1, "count": 64, "damage": 0, "nbt": None}]
+
+
+class ArraysTest(unittest.TestCase):
+
+    def test_numpy_imported_lazily(self):
+        output = subprocess.check_output([
+            sys.executable, "-c",
+            "import sys, minecraft.networking.packets; "
+            "print('numpy' in sys.modules)"])
+        self.assertEqual(output.strip(), b"False")
+
+    def test_int_array(self):
+        values = [0, 1, -1, 2 ** 31 - 1, -2 ** 31]
+        buf = bytearray(b"\xff")
+        IntArray.write_to(values, buf)
+        read, offset = IntArray.read_from(memoryview(bytes(buf)), 1)
+        self.assertEqual(offset, len(buf))
+        self.assertIsInstance(read, array)
+        self.assertEqual(list(read), values)
+        self.assertEqual(IntArray.skip(buf, 1), len(buf))
+
+        # Arrays are written back the same way
+        copy = bytearray(b"\xff")
+        IntArray.write_to(read, copy)
+        self.assertEqual(copy, buf)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_int_array_numpy(self):
+        buf = bytearray()
+        IntArray.write_to([7, -8, 9], buf)
+        try:
+            IntArray.use_numpy = True
+            read, offset = IntArray.read_from(memoryview(bytes(buf)), 0)
+        finally:
+            IntArray.use_numpy = False
+        self.assertIsInstance(read, numpy.ndarray)
+        self.assertEqual(read.tolist(), [7, -8, 9])
+
+        copy = bytearray()
+        IntArray.write_to(read, copy)
+        self.assertEqual(copy, buf)
+
+    def test_read_array_bounds(self):
+        with self.assertRaises(ValueError):
+            arrays.read_array(b"\x00" * 7, 0, 2, "i")
+
+    def test_numeric_list(self):
+        buf = bytearray()
+        List.write_to([2, [1, -2, 3]], buf)
+        self.assertEqual(List.read_from(memoryview(bytes(buf)), 0),
+                         ([2, [1, -2, 3]], len(buf)))
+
+    def test_slot_array(self):
+        items = sample_items()
+        buf = bytearray()
+        SlotArray.write_to(items, buf)
+        expected = bytearray()
+        expected += b"\x00\x03"
+        for item in items:
+            Slot.write_to(item, expected)
+        self.assertEqual(buf, expected)
+
+        view = memoryview(bytes(buf))
+        slots, offset = SlotArray.read_from(view, 0)
+        self.assertEqual(offset, len(buf))
+        self.assertEqual(SlotArray.skip(view, 0), len(buf))
+        self.assertEqual(list(slots.ids), [276, -1, 1])
+        self.assertEqual(list(slots.counts), [1, 0, 64])
+        self.assertEqual(list(slots.damages), [5, 0, 0])
+        self.assertEqual(list(slots.nbt), [0])
+        self.assertEqual(list(slots), items)
+        self.assertEqual(slots[-1], items[-1])
+
+        copy = bytearray()
+        SlotArray.write_to(slots, copy)
+        self.assertEqual(copy, buf)
+
+    def test_window_items_packet(self):
+        packet = packets.WindowItems()
+        packet.window_id = 0
+        packet.slot_data = sample_items()
+        data = bytearray()
+        packet.write_fields(data)
+
+        read = packets.WindowItems()
+        read.read_from(memoryview(bytes(data)), 0)
+        self.assertEqual(read.window_id, 0)
+        self.assertEqual(list(read.slot_data), sample_items())
@@ -0,0 +1,91 @@
+import os
+import unittest
+import zlib
+import minecraft.networking.connection as conn
+from minecraft.networking.compression import CompressionPolicy
+from minecraft.networking.packets import ChatPacket, PluginMessage
+from minecraft.networking.types import VarInt
+
+
+def header(packet, policy):
+    # Returns the data length a packet is sent with and its payload
+    buf = bytearray()
+    packet.write_frame(buf, 20, policy)
+    length, offset = VarInt.read_from(buf, 0)
+    assert length == len(buf) - offset
+    data_length, offset = VarInt.read_from(buf, offset)
+    return data_length, bytes(buf[offset:])
+
+
+def plugin_message(data):
+    return PluginMessage().set_values(channel="MC|Test", data=data)
+
+
+class CompressionPolicyTest(unittest.TestCase):
+
+    def test_compressible(self):
+        policy = CompressionPolicy(level=1)
+        packet = ChatPacket().set_values(message="x" * 500)
+        data_length, payload = header(packet, policy)
+        self.assertGreater(data_length, 500)
+        self.assertEqual(len(zlib.decompress(payload)), data_length)
+
+        stats = policy.stats
+        self.assertEqual((stats.compressed, stats.skipped), (1, 0))
+        self.assertEqual(stats.bytes_in, data_length)
+        self.assertEqual(stats.bytes_out, len(payload))
+        self.assertGreater(stats.bytes_saved, 400)
+        self.assertLess(stats.ratio, 0.1)
+
+    def test_incompressible(self):
+        policy = CompressionPolicy(backoff=2)
+        noise = plugin_message(os.urandom(1000))
+        data_length, payload = header(noise, policy)
+        # Sent as it is, with a data length of 0
+        self.assertEqual(data_length, 0)
+        self.assertIn(noise.data, payload)
+        self.assertEqual(policy.stats.bytes_saved, 0)
+        spent = policy.stats.seconds
+
+        # The next packets of the same id aren't even tried
+        text = plugin_message(b"a" * 1000)
+        self.assertEqual(header(text, policy)[0], 0)
+        self.assertEqual(header(text, policy)[0], 0)
+        self.assertEqual(policy.stats.seconds, spent)
+        self.assertEqual(policy.stats.skipped, 3)
+        # Until the backoff is over
+        self.assertGreater(header(text, policy)[0], 1000)
+        # Other packets are compressed all along
+        self.assertGreater(header(ChatPacket().set_values(message="x" * 500),
+                                  policy)[0], 0)
+        self.assertEqual(policy.stats.compressed, 2)
+
+    def test_level_and_strategy(self):
+        packet = ChatPacket().set_values(message="ab" * 500)
+        self.assertEqual(header(packet, CompressionPolicy(level=0))[0], 0)
+        policy = CompressionPolicy(level=9, strategy=zlib.Z_RLE)
+        data_length, payload = header(packet, policy)
+        self.assertEqual(len(zlib.decompress(payload)), data_length)
+
+    def test_connection_policy(self):
+        connection = conn.Connection("localhost", 25565, None)
+        policy = connection.options.compression_policy
+        self.assertIsInstance(policy, CompressionPolicy)
+        connection.options.compression_enabled = True
+        connection.options.compression_threshold = 20
+
+        # Both kinds of packet are read back by a reactor
+        reactor = conn.PlayingReactor(connection)
+        connection.register_packet_listener(lambda packet: None,
+                                            PluginMessage)
+        for data in (b"a" * 1000, os.urandom(1000)):
+            buf = bytearray()
+            connection._write_frame(plugin_message(data), buf)
+            length, offset = VarInt.read_from(buf, 0)
+            read = reactor.read_packet(memoryview(buf)[offset:])
+            self.assertEqual(read.data, data)
+        self.assertEqual((policy.stats.compressed, policy.stats.skipped),
+                         (1, 1))
+
+        other = conn.Connection("localhost", 25565, None)
+        self.assertIsNot(other.options.compression_policy, policy)
@@ -1,5 +1,14 @@
+import select
+import socket
+import threading
+import time
 import unittest
+import zlib
 import minecraft.networking.connection as conn
+from minecraft.networking.packets import (
+    Packet, PacketBuffer, KeepAlivePacket, ChatPacket, ChatMessagePacket)
+from minecraft.networking.types import VarInt
+from .compat import mock
 
 
 class ConnectionTest(unittest.TestCase):
@@ -7,3 +16,376 @@ class ConnectionTest(unittest.TestCase):
     def test_connection(self):
         connection = conn.Connection("localhost", 25565, None)
         self.assertFalse(connection.options.compression_enabled)
+
+    def test_per_instance_state(self):
+        first = conn.Connection("localhost", 25565, None)
+        second = conn.Connection("example.com", 25566, None,
+                                 compression_threshold=256)
+        first.register_packet_listener(lambda packet: None, ChatPacket)
+        first.write_packet(ChatPacket().set_values(message="hello"))
+
+        self.assertEqual(first.options.address, "localhost")
+        self.assertEqual(second.options.address, "example.com")
+        self.assertEqual(second.options.compression_threshold, 256)
+        self.assertEqual(len(first.packet_listeners), 1)
+        self.assertEqual(len(second.packet_listeners), 0)
+        self.assertEqual(len(first._outgoing_packet_queue), 1)
+        self.assertEqual(len(second._outgoing_packet_queue), 0)
+
+        with self.assertRaises(TypeError):
+            conn.Connection("localhost", 25565, None, no_such_option=True)
+
+    def test_coalesced_flush(self):
+        connection = conn.Connection("localhost", 25565, None)
+        connection.socket = mock.Mock()
+
+        queued = [KeepAlivePacket().set_values(keep_alive_id=1),
+                  ChatPacket().set_values(message="hello"),
+                  KeepAlivePacket().set_values(keep_alive_id=2)]
+        for packet in queued:
+            connection.write_packet(packet)
+        connection._flush_outgoing()
+
+        connection.socket.sendall.assert_called_once_with(
+            bytearray(b"".join(serialize(packet) for packet in queued)))
+        self.assertEqual(connection.write_stats.flushes, 1)
+        self.assertEqual(connection.write_stats.packets, 3)
+        self.assertEqual(connection.write_stats.packets_per_flush, 3.0)
+
+        # Nothing queued, nothing written
+        connection._flush_outgoing()
+        self.assertEqual(connection.socket.sendall.call_count, 1)
+
+    def test_listener_dispatch(self):
+        connection = conn.Connection("localhost", 25565, None)
+        calls = []
+
+        def dispatch(packet):
+            for callback in connection._get_callbacks(type(packet)):
+                callback(packet)
+
+        connection.register_packet_listener(
+            lambda packet: calls.append("chat"), ChatPacket)
+        connection.register_packet_listener(
+            lambda packet: calls.append("first"), ChatPacket, priority=10)
+        any_packet = connection.register_packet_listener(
+            lambda packet: calls.append("any"), Packet)
+
+        dispatch(ChatPacket().set_values(message="hello"))
+        self.assertEqual(calls, ["first", "chat", "any"])
+
+        del calls[:]
+        dispatch(KeepAlivePacket().set_values(keep_alive_id=1))
+        self.assertEqual(calls, ["any"])
+
+        # Removing a listener invalidates the cached callbacks
+        del calls[:]
+        connection.unregister_packet_listener(any_packet)
+        dispatch(ChatPacket().set_values(message="hello"))
+        dispatch(KeepAlivePacket().set_values(keep_alive_id=1))
+        self.assertEqual(calls, ["first", "chat"])
+
+    def test_unwanted_packets_are_skipped(self):
+        # Only the chat message is long enough to be compressed
+        message = '"%s"' % ("hello " * 20)
+        for threshold in (None, 64):
+            connection = conn.Connection("localhost", 25565, None)
+            if threshold is not None:
+                connection.options.compression_threshold = threshold
+                connection.options.compression_enabled = True
+            reactor = conn.PlayingReactor(connection)
+
+            chat = ChatMessagePacket().set_values(json_data=message,
+                                                  position=0)
+            keep_alive = KeepAlivePacket().set_values(keep_alive_id=3)
+
+            # Handled by the reactor itself
+            self.assertEqual(reactor.read_packet(
+                frame(keep_alive, threshold)).keep_alive_id, 3)
+            # Nobody is interested in chat messages or unknown packets yet
+            self.assertIsNone(reactor.read_packet(frame(chat, threshold)))
+            self.assertIsNone(reactor.read_packet(
+                frame(UnknownPacket(), threshold)))
+
+            listener = connection.register_packet_listener(
+                lambda packet: None, ChatMessagePacket)
+            self.assertEqual(reactor.read_packet(
+                frame(chat, threshold)).json_data, message)
+            self.assertIsNone(reactor.read_packet(
+                frame(UnknownPacket(), threshold)))
+
+            connection.unregister_packet_listener(listener)
+            self.assertIsNone(reactor.read_packet(frame(chat, threshold)))
+
+    def test_decompression(self):
+        connection = conn.Connection("localhost", 25565, None,
+                                     compression_threshold=256,
+                                     compression_enabled=True)
+        reactor = conn.PlayingReactor(connection)
+        connection.register_packet_listener(lambda packet: None,
+                                            ChatMessagePacket)
+        message = '"%s"' % ("x" * 100000)
+        chat = ChatMessagePacket().set_values(json_data=message, position=0)
+        self.assertEqual(reactor.read_packet(frame(chat, 256)).json_data,
+                         message)
+
+        payload = bytearray()
+        VarInt.write_to(chat.id, payload)
+        chat.write_fields(payload)
+
+        def compressed_frame(data_length):
+            data = bytearray()
+            VarInt.write_to(data_length, data)
+            return memoryview(data + zlib.compress(bytes(payload)))
+
+        with mock.patch("minecraft.networking.connection.print",
+                        create=True) as print_mock:
+            # Announcing too little or too much is an error, and nothing
+            # is inflated past the announced size
+            for data_length in (len(payload) - 1, len(payload) + 1,
+                                conn.MAX_DATA_LENGTH + 1):
+                self.assertIsNone(reactor.read_packet(
+                    compressed_frame(data_length)))
+            self.assertEqual(print_mock.call_count, 3)
+            self.assertIsNotNone(reactor.read_packet(
+                compressed_frame(len(payload))))
+
+    def test_pooled_packets(self):
+        connection = conn.Connection("localhost", 25565, None,
+                                     pooled_packets=(KeepAlivePacket,))
+        connection.reactor = conn.PlayingReactor(connection)
+        frames = [frame(KeepAlivePacket().set_values(keep_alive_id=i))
+                  for i in range(3)]
+        connection.frame_reader = mock.Mock()
+        connection.frame_reader.read_frame.side_effect = frames + [None]
+
+        received = []
+        connection.register_packet_listener(
+            lambda packet: received.append((packet, packet.keep_alive_id)),
+            KeepAlivePacket)
+        connection._read_packets()
+
+        self.assertEqual([keep_alive_id for _, keep_alive_id in received],
+                         [0, 1, 2])
+        # Every packet was read into the same recycled instance
+        self.assertEqual(len(set(id(packet) for packet, _ in received)), 1)
+        pool = connection._packet_pools[KeepAlivePacket]
+        self.assertEqual((pool.created, pool.reused), (1, 2))
+        # The replies are separate packets
+        self.assertEqual([packet.keep_alive_id for packet
+                          in connection._outgoing_packet_queue], [0, 1, 2])
+
+
+class UnknownPacket(Packet):
+    id = 0x7F
+
+
+def frame(packet, compression_threshold=None):
+    # Returns a frame as passed to PacketReactor.read_packet
+    buf = bytearray()
+    packet.write_frame(buf, compression_threshold)
+    length, offset = VarInt.read_from(buf, 0)
+    return memoryview(buf)[offset:]
+
+
+def serialize(packet):
+    packet_buffer = PacketBuffer()
+    packet.write(packet_buffer)
+    return packet_buffer.get_writable()
+
+
+def recv_exactly(sock, length):
+    data = b""
+    while len(data) < length:
+        data += sock.recv(length - len(data))
+    return data
+
+
+class WakingReader(object):
+    # Stands in for a waker's reading socket, wake() is called from another
+    # thread during the first recv of clear()
+    def __init__(self, waker):
+        self.waker = waker
+        self.reader = waker._reader
+        self.woken = False
+
+    def fileno(self):
+        return self.reader.fileno()
+
+    def recv(self, size):
+        if not self.woken:
+            self.woken = True
+            thread = threading.Thread(target=self.waker.wake)
+            thread.start()
+            thread.join(5)
+        return self.reader.recv(size)
+
+
+class WakerTest(unittest.TestCase):
+
+    def test_wake_during_clear(self):
+        waker = conn._Waker()
+        self.addCleanup(waker.close)
+        for initially_woken in (False, True):
+            if initially_woken:
+                waker.wake()
+            waker._reader = WakingReader(waker)
+            waker.clear()
+            waker._reader = waker._reader.reader
+            # A wakeup after clear() is never swallowed
+            waker.wake()
+            self.assertEqual(select.select([waker], [], [], 0)[0], [waker])
+            waker.clear()
+            self.assertEqual(select.select([waker], [], [], 0)[0], [])
+
+
+class NetworkingThreadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("localhost", 0))
+        self.server.listen(1)
+
+        self.connection = conn.Connection(
+            "localhost", self.server.getsockname()[1], None)
+        self.connection._connect()
+        self.client, _ = self.server.accept()
+        self.client.settimeout(5)
+
+        self.connection.reactor = conn.PlayingReactor(self.connection)
+        self.connection._start_network_thread()
+
+    def tearDown(self):
+        self.connection.networking_thread.interrupt = True
+        self.connection._waker.wake()
+        self.connection.networking_thread.join(5)
+        self.client.close()
+        self.server.close()
+
+    def test_queued_packet_is_sent_immediately(self):
+        packet = KeepAlivePacket().set_values(keep_alive_id=5)
+        start = time.time()
+        self.connection.write_packet(packet)
+
+        expected = serialize(packet)
+        self.assertEqual(recv_exactly(self.client, len(expected)), expected)
+        # Well below the old one second select timeout
+        self.assertLess(time.time() - start, 0.5)
+
+    def test_keep_alive_round_trip(self):
+        packet = KeepAlivePacket().set_values(keep_alive_id=1234)
+        expected = serialize(packet)
+        self.client.sendall(expected)
+
+        self.assertEqual(recv_exactly(self.client, len(expected)), expected)
+
+    def test_stop_closes_waker(self):
+        waker = self.connection._waker
+        self.connection._stop_network_thread()
+        self.connection.networking_thread.join(5)
+        self.assertFalse(self.connection.networking_thread.is_alive())
+        self.assertEqual(waker._reader.fileno(), -1)
+        self.assertEqual(waker._writer.fileno(), -1)
+
+
+class ConnectionManagerTest(unittest.TestCase):
+
+    def test_stop_closes_waker_and_selector(self):
+        manager = conn.ConnectionManager()
+        manager.start()
+        manager.stop()
+        manager.thread.join(5)
+        self.assertFalse(manager.thread.is_alive())
+        self.assertEqual(manager._waker._reader.fileno(), -1)
+        self.assertIsNone(manager._selector.get_map())
+
+    def test_many_connections(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("localhost", 0))
+        server.listen(50)
+        manager = conn.ConnectionManager()
+
+        clients = []
+        for i in range(20):
+            connection = conn.Connection(
+                "localhost", server.getsockname()[1], None, manager=manager)
+            connection._connect()
+            client, _ = server.accept()
+            client.settimeout(5)
+            clients.append(client)
+
+            connection.reactor = conn.PlayingReactor(connection)
+            connection._start_network_thread()
+        manager.start()
+
+        try:
+            for i, client in enumerate(clients):
+                packet = KeepAlivePacket().set_values(keep_alive_id=i)
+                client.sendall(serialize(packet))
+            for i, client in enumerate(clients):
+                expected = serialize(
+                    KeepAlivePacket().set_values(keep_alive_id=i))
+                self.assertEqual(recv_exactly(client, len(expected)),
+                                 expected)
+            self.assertEqual(len(manager.connections), 20)
+        finally:
+            manager.stop()
+            manager.thread.join(5)
+            for client in clients:
+                client.close()
+            server.close()
+
+    def test_slow_peer(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(("localhost", 0))
+        server.listen(2)
+        manager = conn.ConnectionManager()
+        connections, clients = [], []
+        for i in range(2):
+            connection = conn.Connection(
+                "localhost", server.getsockname()[1], None, manager=manager)
+            connection._connect()
+            client, _ = server.accept()
+            client.settimeout(5)
+            connection.reactor = conn.PlayingReactor(connection)
+            connection._start_network_thread()
+            connections.append(connection)
+            clients.append(client)
+        manager.start()
+
+        try:
+            # Far more than the socket buffers hold, and never read
+            chat = ChatPacket().set_values(message=u"x" * 30000)
+            for i in range(600):
+                connections[0].write_packet(chat)
+            packet = KeepAlivePacket().set_values(keep_alive_id=7)
+            clients[1].sendall(serialize(packet))
+            expected = serialize(packet)
+            # The other connection isn't held up
+            self.assertEqual(recv_exactly(clients[1], len(expected)),
+                             expected)
+            self.assertTrue(connections[0]._unsent)
+
+            # Everything arrives once the peer reads
+            expected = serialize(chat)
+            for i in range(600):
+                self.assertEqual(recv_exactly(clients[0], len(expected)),
+                                 expected)
+        finally:
+            manager.stop()
+            manager.thread.join(5)
+            for client in clients:
+                client.close()
+            server.close()
+
+    def test_error_closes_socket(self):
+        manager = conn.ConnectionManager()
+        connection = conn.Connection("localhost", 25565, None,
+                                     manager=manager)
+        connection.socket, peer = socket.socketpair()
+        self.addCleanup(peer.close)
+        manager.add(connection)
+        manager._apply_changes()
+        manager.handle_error(connection, RuntimeError())
+        self.assertEqual(connection.socket.fileno(), -1)
+        self.assertEqual(manager.connections, set())
@@ -0,0 +1,109 @@
+import threading
+import unittest
+import minecraft.networking.connection as conn
+from minecraft.networking.dispatch import ListenerExecutor
+from minecraft.networking.packets import (
+    PacketListener, ChatMessagePacket, STATE_PLAYING_CLIENTBOUND
+)
+from .test_connection import frame
+
+
+class FrameList(object):
+    # Stands in for a connection's framing.FrameReader
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def read_frame(self):
+        return self.frames.pop(0) if self.frames else None
+
+
+def chat(index):
+    return ChatMessagePacket().set_values(json_data='"%d"' % index,
+                                          position=0)
+
+
+class ListenerExecutorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = ListenerExecutor(workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_per_listener_order(self):
+        release = threading.Event()
+        slow_calls, fast_calls = [], []
+        fast_done = threading.Event()
+
+        def slow(packet):
+            release.wait(5)
+            slow_calls.append(packet)
+
+        def fast(packet):
+            fast_calls.append(packet)
+            if len(fast_calls) == 50:
+                fast_done.set()
+
+        slow_queue = self.executor.bind(PacketListener(slow))
+        fast_queue = self.executor.bind(PacketListener(fast))
+        for i in range(50):
+            slow_queue(i)
+            fast_queue(i)
+        # The fast listener isn't held up by the slow one
+        self.assertTrue(fast_done.wait(5))
+        self.assertEqual(self.executor.queue_depth, 50)
+        release.set()
+        self.executor.shutdown()
+
+        self.assertEqual(slow_calls, list(range(50)))
+        self.assertEqual(fast_calls, list(range(50)))
+        stats = self.executor.stats
+        self.assertEqual((stats.submitted, stats.completed), (100, 100))
+        self.assertGreaterEqual(stats.max_queue_depth, 50)
+        self.assertGreater(stats.max_latency, 0)
+        self.assertEqual(self.executor.queue_depth, 0)
+
+    def test_bounded(self):
+        executor = ListenerExecutor(workers=1, max_queued=2, block=False)
+        release = threading.Event()
+        queue = executor.bind(PacketListener(lambda packet: release.wait(5)))
+        for i in range(5):
+            queue(i)
+        # Packets count against max_queued until they have been handled
+        self.assertEqual(executor.stats.dropped, 3)
+        release.set()
+        executor.shutdown()
+        self.assertEqual(executor.stats.completed + executor.stats.dropped,
+                         5)
+
+    def test_keep_alive_while_listener_blocks(self):
+        connection = conn.Connection("localhost", 25565, None,
+                                     listener_executor=self.executor)
+        connection.reactor = conn.PlayingReactor(connection)
+        release = threading.Event()
+        received = []
+
+        def slow_listener(packet):
+            release.wait(5)
+            received.append(packet.json_data)
+        connection.register_packet_listener(slow_listener, ChatMessagePacket)
+        inline = []
+        connection.register_packet_listener(inline.append, ChatMessagePacket,
+                                            inline=True)
+
+        keep_alive = STATE_PLAYING_CLIENTBOUND[0]().set_values(
+            keep_alive_id=7)
+        connection.frame_reader = FrameList(
+            [frame(chat(0)), frame(keep_alive), frame(chat(1))])
+        connection._read_packets()
+
+        # Answered although the listener hasn't been able to run
+        reply = connection._outgoing_packet_queue.popleft()
+        self.assertEqual((reply.packet_name, reply.keep_alive_id),
+                         ("keep alive", 7))
+        self.assertEqual(len(inline), 2)
+        self.assertEqual(received, [])
+
+        release.set()
+        self.executor.shutdown()
+        self.assertEqual(received, ['"0"', '"1"'])
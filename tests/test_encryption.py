@@ -1,4 +1,5 @@
 import os
+import socket
 import unittest
 import hashlib
 from io import BytesIO
@@ -8,6 +9,7 @@ from minecraft.networking.encryption import (
     generate_shared_secret,
     generate_verification_hash,
     create_AES_cipher,
+    BulkCipher,
     EncryptedFileObjectWrapper,
     EncryptedSocketWrapper
 )
@@ -15,6 +17,7 @@ from minecraft.networking.encryption import (
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
 from cryptography.hazmat.primitives.serialization import load_der_private_key
+from .compat import mock
 
 KEY_LOCATION = os.path.join(os.path.dirname(os.path.realpath(__file__)),
                             "encryption")
@@ -103,6 +106,82 @@ class Encryption(unittest.TestCase):
         wrapper.send(test_data)
         self.assertEqual(test_data, mock_socket.received)
 
+    def test_bulk_cipher(self):
+        secret = generate_shared_secret()
+        encryptor = create_AES_cipher(secret).encryptor()
+        bulk = BulkCipher(create_AES_cipher(secret).encryptor(), 16)
+
+        data = os.urandom(5000)
+        # Grows past its initial size, takes any bytes-like object
+        out = bytes(bulk.update(memoryview(data)[:10]))
+        out += bytes(bulk.update(bytearray(data[10:4000])))
+        in_place = bytearray(data[4000:])
+        bulk.update_in_place(memoryview(in_place))
+        out += bytes(in_place)
+        self.assertEqual(out, encryptor.update(data))
+
+    def test_file_object_readinto(self):
+        secret = generate_shared_secret()
+        encrypted = create_AES_cipher(secret).encryptor().update(b"x" * 50)
+        wrapper = EncryptedFileObjectWrapper(
+            BytesIO(encrypted), create_AES_cipher(secret).decryptor())
+        buf = bytearray(40)
+        self.assertEqual(wrapper.readinto(buf), 40)
+        self.assertEqual(wrapper.read(10), b"x" * 10)
+        self.assertEqual(buf, b"x" * 40)
+
+    def test_socket_wrapper_bulk(self):
+        secret = generate_shared_secret()
+        client, server = socket.socketpair()
+        self.addCleanup(client.close)
+        self.addCleanup(server.close)
+        wrapper = EncryptedSocketWrapper(
+            client, create_AES_cipher(secret).encryptor(),
+            create_AES_cipher(secret).decryptor())
+        server_encryptor = create_AES_cipher(secret).encryptor()
+        server_decryptor = create_AES_cipher(secret).decryptor()
+
+        data = os.urandom(1000)
+        server.sendall(server_encryptor.update(data))
+        buf = bytearray(2000)
+        view = memoryview(buf)
+        received = 0
+        while received < len(data):
+            received += wrapper.recv_into(view[received:])
+        self.assertEqual(bytes(buf[:received]), data)
+
+        wrapper.sendall(memoryview(data)[:600])
+        self.assertEqual(wrapper.send(bytearray(data[600:])), 400)
+        sent = b""
+        while len(sent) < len(data):
+            sent += server_decryptor.update(server.recv(4096))
+        self.assertEqual(sent, data)
+
+    def test_send_writes_everything(self):
+        secret = generate_shared_secret()
+        actual_socket = MockSocket(None, create_AES_cipher(secret).decryptor())
+        wrapper = EncryptedSocketWrapper(
+            actual_socket, create_AES_cipher(secret).encryptor(), None)
+        # Never reports a partial write, the cipher has already moved on
+        self.assertEqual(wrapper.send(b"hello world"), 11)
+        self.assertEqual(actual_socket.received, b"hello world")
+
+    def test_sendall_to_a_transport(self):
+        secret = generate_shared_secret()
+        kept = []
+        # Like an asyncio transport holding on to data it couldn't write yet
+        transport_socket = mock.Mock(sendall=kept.append)
+        wrapper = EncryptedSocketWrapper(
+            transport_socket, create_AES_cipher(secret).encryptor(), None)
+        wrapper.sendall(b"first" * 100)
+        first = bytes(kept[0])
+        wrapper.sendall(b"second" * 100)
+        self.assertEqual(bytes(kept[0]), first)
+        self.assertEqual(
+            create_AES_cipher(secret).decryptor().update(
+                bytes(kept[0]) + bytes(kept[1])),
+            b"first" * 100 + b"second" * 100)
+
 
 class MockSocket(object):
 
@@ -122,5 +201,12 @@ class MockSocket(object):
     def send(self, data):
         self.received = self.decryptor.update(data)
 
+    def sendall(self, data):
+        # Like a socket taking data a few bytes at a time
+        self.received = b""
+        data = bytes(data)
+        for i in range(0, len(data), 4):
+            self.received += self.decryptor.update(data[i:i + 4])
+
     def fileno(self):
         return 0
@@ -0,0 +1,106 @@
+import unittest
+import uuid
+import minecraft.networking.connection as conn
+from minecraft.networking import packets
+from minecraft.entities import EntityTracker, MOB, OBJECT, PLAYER
+
+
+def round_trip(packet):
+    data = bytearray()
+    packet.write_fields(data)
+    read = type(packet)()
+    offset = read.read_from(memoryview(bytes(data)), 0)
+    assert offset == len(data)
+    return read
+
+
+def spawn_mob(entity_id, x, y, z):
+    return round_trip(packets.SpawnMob().set_values(
+        entity_id=entity_id, type=54, x=int(x * 32), y=int(y * 32),
+        z=int(z * 32), yaw=64, pitch=0, head_pitch=0, x_vel=8000,
+        y_vel=0, z_vel=-4000,
+        metadata={0: (0, 0), 2: (4, u"Zombie"), 6: (3, 20.0)}))
+
+
+class EntityTrackerTest(unittest.TestCase):
+
+    def test_spawn_packets(self):
+        tracker = EntityTracker()
+        tracker.react(spawn_mob(5, 10.5, 64, -3.25))
+        slot = tracker.slot(5)
+        self.assertEqual(tracker.position(5), (10.5, 64, -3.25))
+        self.assertEqual((tracker.kind[slot], tracker.entity_type[slot],
+                          tracker.yaw[slot]), (MOB, 54, 64))
+        self.assertEqual((tracker.velocity_x[slot], tracker.velocity_z[slot]),
+                         (1.0, -0.5))
+
+        player_uuid = uuid.uuid4()
+        player = round_trip(packets.SpawnPlayer().set_values(
+            entity_id=6, uuid=player_uuid, x=0, y=32, z=0, yaw=0, pitch=0,
+            item=0, metadata={}))
+        self.assertEqual(player.uuid, player_uuid)
+        tracker.react(player)
+        self.assertEqual(tracker.kind[tracker.slot(6)], PLAYER)
+
+        arrow = round_trip(packets.SpawnObject().set_values(
+            entity_id=7, type=60, x=0, y=0, z=0, pitch=0, yaw=0,
+            data=(6, (800, 0, 0))))
+        self.assertEqual(arrow.data, (6, (800, 0, 0)))
+        tracker.react(arrow)
+        self.assertEqual(tracker.kind[tracker.slot(7)], OBJECT)
+        self.assertEqual(tracker.velocity_x[tracker.slot(7)], 0.1)
+        self.assertEqual(len(tracker), 3)
+
+    def test_movement(self):
+        tracker = EntityTracker()
+        tracker.react(spawn_mob(1, 15, 64, 0))
+        tracker.react(packets.EntityRelativeMove().set_values(
+            entity_id=1, delta_x=32, delta_y=-16, delta_z=8,
+            on_ground=True))
+        self.assertEqual(tracker.position(1), (16, 63.5, 0.25))
+        self.assertEqual(tracker.within(17, 64, 0, 1.5), [1])
+        self.assertEqual(tracker.within(14, 64, 0, 1.5), [])
+
+        tracker.react(packets.EntityLookAndRelativeMove().set_values(
+            entity_id=1, delta_x=-32, delta_y=0, delta_z=0, yaw=128,
+            pitch=3, on_ground=True))
+        self.assertEqual(tracker.position(1), (15, 63.5, 0.25))
+        self.assertEqual(tracker.yaw[tracker.slot(1)], 128)
+
+        tracker.react(packets.EntityTeleport().set_values(
+            entity_id=1, x=-320, y=0, z=3200, yaw=0, pitch=0,
+            on_ground=False))
+        self.assertEqual(tracker.position(1), (-10, 0, 100))
+        self.assertEqual(tracker.within(0, 0, 0, 50), [])
+        self.assertEqual(tracker.within(-10, 0, 90, 10), [1])
+
+        # Moves of unknown entities are ignored
+        tracker.react(packets.EntityRelativeMove().set_values(
+            entity_id=2, delta_x=1, delta_y=1, delta_z=1, on_ground=True))
+
+        tracker.react(round_trip(packets.DestroyEntities().set_values(
+            entity_ids=[1, 2])))
+        self.assertEqual(len(tracker), 0)
+        self.assertEqual(tracker.within(-10, 0, 90, 10), [])
+        self.assertEqual(tracker._cells, {})
+
+    def test_grows(self):
+        tracker = EntityTracker(capacity=2)
+        for entity_id in range(40):
+            tracker.spawn(entity_id, MOB, 50, entity_id, 0, entity_id)
+        self.assertEqual(tracker.capacity, 64)
+        self.assertEqual(sorted(tracker.within(0, 0, 0, 3)), [0, 1, 2])
+        tracker.remove(0)
+        tracker.spawn(100, MOB, 50, 0, 0, 0)
+        self.assertEqual(tracker.capacity, 64)
+        self.assertEqual(tracker.position(39), (39, 0, 39))
+
+    def test_connection_entities(self):
+        tracker = EntityTracker()
+        connection = conn.Connection(
+            "localhost", 25565, None, entities=tracker,
+            pooled_packets=EntityTracker.movement_packets)
+        reactor = conn.PlayingReactor(connection)
+        self.assertTrue(reactor.wants_packet(packets.EntityRelativeMove.id))
+        reactor.react(spawn_mob(3, 0, 0, 0))
+        self.assertIn(3, tracker)
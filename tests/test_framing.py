@@ -0,0 +1,78 @@
+import socket
+import unittest
+from minecraft.networking.framing import FrameReader
+from minecraft.networking.encryption import (
+    create_AES_cipher, generate_shared_secret)
+from minecraft.networking.packets import PacketBuffer
+from minecraft.networking.types import VarInt
+
+
+def frame(payload):
+    packet_buffer = PacketBuffer()
+    VarInt.send(len(payload), packet_buffer)
+    packet_buffer.send(payload)
+    return packet_buffer.get_writable()
+
+
+class FrameReaderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client, self.server = socket.socketpair()
+
+    def tearDown(self):
+        self.client.close()
+        self.server.close()
+
+    def read_all(self, reader):
+        frames = []
+        data = reader.read_frame()
+        while data is not None:
+            frames.append(data.tobytes())
+            data = reader.read_frame()
+        return frames
+
+    def test_many_frames_per_block(self):
+        payloads = [b"a", b"bc" * 100, b"", b"d" * 300]
+        self.server.sendall(b"".join(frame(p) for p in payloads))
+
+        reader = FrameReader(self.client)
+        reader.fill()
+        self.assertEqual(self.read_all(reader), payloads)
+
+    def test_partial_frames(self):
+        data = frame(b"x" * 200) + frame(b"y" * 10)
+        reader = FrameReader(self.client, buffer_size=64)
+
+        frames = []
+        for i in range(0, len(data), 7):
+            self.server.sendall(data[i:i + 7])
+            reader.fill()
+            frames.extend(self.read_all(reader))
+
+        self.assertEqual(frames, [b"x" * 200, b"y" * 10])
+
+    def test_disconnect(self):
+        reader = FrameReader(self.client)
+        self.server.close()
+        with self.assertRaises(RuntimeError):
+            reader.fill()
+
+    def test_encryption_enabled_mid_buffer(self):
+        secret = generate_shared_secret()
+        encryptor = create_AES_cipher(secret).encryptor()
+        decryptor = create_AES_cipher(secret).decryptor()
+
+        self.server.sendall(frame(b"plain") +
+                            encryptor.update(frame(b"secret" * 50)))
+
+        reader = FrameReader(self.client)
+        reader.fill()
+        self.assertEqual(reader.read_frame().tobytes(), b"plain")
+        reader.enable_encryption(decryptor)
+
+        self.server.sendall(encryptor.update(frame(b"more")))
+        frames = self.read_all(reader)
+        while len(frames) < 2:
+            reader.fill()
+            frames.extend(self.read_all(reader))
+        self.assertEqual(frames, [b"secret" * 50, b"more"])
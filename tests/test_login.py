@@ -0,0 +1,107 @@
+import os
+import threading
+import unittest
+from minecraft.networking import connection as conn, encryption, packets
+from minecraft.networking.framing import FrameReader
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+from cryptography.hazmat.primitives.serialization import load_der_private_key
+from .compat import mock
+from .test_encryption import KEY_LOCATION
+from .test_pipeline import ManualExecutor
+
+
+def login_class(packet_name):
+    for packet_class in packets.STATE_LOGIN_CLIENTBOUND.values():
+        if packet_class.packet_name == packet_name:
+            return packet_class
+
+
+class LoginTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(KEY_LOCATION, "pub_key.bin"), "rb") as f:
+            self.public_key = f.read()
+        with open(os.path.join(KEY_LOCATION, "priv_key.bin"), "rb") as f:
+            self.private_key = load_der_private_key(f.read(), None,
+                                                    default_backend())
+
+    def logging_in(self, executor):
+        connection = conn.Connection("localhost", 25565, mock.Mock(),
+                                     login_executor=executor)
+        connection._login_started = 0
+        connection.socket = mock.Mock()
+        connection.frame_reader = FrameReader(None)
+        connection.reactor = conn.LoginReactor(connection)
+        return connection
+
+    def encryption_request(self, server_id):
+        return login_class("encryption request")().set_values(
+            server_id=server_id, public_key=self.public_key,
+            verify_token=b"abcd")
+
+    def test_offloaded(self):
+        executor = ManualExecutor()
+        connection = self.logging_in(executor)
+        connection.reactor.react(self.encryption_request(u"server"))
+
+        # Nothing happens on the networking thread until the work is done
+        self.assertFalse(connection.auth_token.join.called)
+        self.assertFalse(connection.socket.sendall.called)
+        actual_socket = connection.socket
+        executor.run()
+        self.assertEqual(connection.auth_token.join.call_count, 1)
+        self.assertFalse(actual_socket.sendall.called)
+        self.assertIsNone(connection.frame_reader.decryptor)
+
+        connection._run_pending()
+        self.assertEqual(actual_socket.sendall.call_count, 1)
+        self.assertIsInstance(connection.socket,
+                              encryption.EncryptedSocketWrapper)
+        self.assertIsNotNone(connection.frame_reader.decryptor)
+
+        # The response holds the secret the connection is encrypted with
+        frame = FrameReader(None)
+        data = actual_socket.sendall.call_args[0][0]
+        frame.get_buffer()[:len(data)] = data
+        frame.buffer_updated(len(data))
+        response = packets.PacketView(frame.read_frame())
+        response.read_value(packets.types.VarInt)
+        secret = self.private_key.decrypt(
+            response.read_value(packets.types.VarIntPrefixedByteArray),
+            PKCS1v15())
+        self.assertEqual(self.private_key.decrypt(
+            response.read_value(packets.types.VarIntPrefixedByteArray),
+            PKCS1v15()), b"abcd")
+        server_id = encryption.generate_verification_hash(
+            u"server", secret, self.public_key)
+        connection.auth_token.join.assert_called_once_with(server_id)
+
+        connection.reactor.react(login_class("login success")().set_values(
+            UUID="00000000-0000-0000-0000-000000000000", Username="Player"))
+        self.assertEqual(sorted(connection.login_timings), [
+            "encryption request", "encryption response", "join",
+            "login success"])
+        self.assertIsInstance(connection.reactor, conn.PlayingReactor)
+
+    def test_shared_executor(self):
+        connection = self.logging_in(None)
+        woken = threading.Event()
+        connection._waker = mock.Mock(wake=woken.set)
+        connection.reactor.react(self.encryption_request(u"-"))
+        self.assertIsNotNone(conn._shared_login_executor())
+        self.assertTrue(woken.wait(5))
+        connection._run_pending()
+        # Offline servers aren't joined
+        self.assertFalse(connection.auth_token.join.called)
+        self.assertIsInstance(connection.socket,
+                              encryption.EncryptedSocketWrapper)
+        self.assertNotIn("join", connection.login_timings)
+
+    def test_public_key_cache(self):
+        with mock.patch.object(encryption, "load_der_public_key",
+                               wraps=encryption.load_der_public_key) as load:
+            encryption._public_keys.clear()
+            first = encryption.load_public_key(self.public_key)
+            self.assertIs(encryption.load_public_key(self.public_key), first)
+            self.assertEqual(load.call_count, 1)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import unittest
+from io import BytesIO
+from minecraft.networking import nbt
+from minecraft.networking.types import List, IntArray, Slot
+from minecraft.networking.packets import PacketBuffer
+
+
+def sample_compound():
+    display = nbt.Compound()
+    display["Name"] = u"Épée"
+    display["Lore"] = nbt.TagList([u"first", u"second"], nbt.TAG_STRING)
+
+    enchantment = nbt.Compound()
+    enchantment["id"] = 16
+    enchantment["lvl"] = 5
+    enchantment.tag_types.update(id=nbt.TAG_SHORT, lvl=nbt.TAG_SHORT)
+
+    tag = nbt.Compound()
+    tag.name = u"tag"
+    tag["display"] = display
+    tag["ench"] = nbt.TagList([enchantment, enchantment], nbt.TAG_COMPOUND)
+    tag["Unbreakable"] = 1
+    tag.tag_types["Unbreakable"] = nbt.TAG_BYTE
+    tag["Seed"] = 2 ** 40
+    tag["Scale"] = 0.5
+    tag["Bytes"] = b"\x01\x02\x03"
+    tag["Ints"] = [1, -2, 3]
+    tag.tag_types["Ints"] = nbt.TAG_INT_ARRAY
+    tag["Floats"] = nbt.TagList([1.5, 2.5], nbt.TAG_FLOAT)
+    return tag
+
+
+def encode(value):
+    buf = bytearray()
+    nbt.write_to(value, buf)
+    return bytes(buf)
+
+
+class NbtTest(unittest.TestCase):
+
+    def setUp(self):
+        self.value = sample_compound()
+        # Trailing data which must not be read
+        self.data = encode(self.value) + b"\xff"
+        self.end = len(self.data) - 1
+
+    def test_eager_round_trip(self):
+        value, offset = nbt.read_from(memoryview(self.data), 0)
+        self.assertEqual(offset, self.end)
+        self.assertEqual(value, self.value)
+        self.assertEqual(value.name, u"tag")
+        self.assertEqual(value["ench"][1]["lvl"], 5)
+        self.assertEqual(encode(value), self.data[:-1])
+
+    def test_lazy(self):
+        value, offset = nbt.read_from(memoryview(self.data), 0, nbt.LAZY)
+        self.assertEqual(offset, self.end)
+        self.assertIsInstance(value, nbt.LazyCompound)
+        self.assertFalse(value.loaded)
+        # Written back without being decoded
+        self.assertEqual(encode(value), self.data[:-1])
+
+        display = value["display"]
+        self.assertTrue(value.loaded)
+        self.assertFalse(display.loaded)
+        self.assertEqual(display["Name"], u"Épée")
+        self.assertEqual(value["ench"][0]["id"], 16)
+        self.assertEqual(dict(value["ench"][1]), dict(self.value["ench"][1]))
+        self.assertEqual(encode(value), self.data[:-1])
+
+    def test_skip(self):
+        self.assertEqual(nbt.skip(memoryview(self.data), 0), self.end)
+        self.assertEqual(
+            nbt.read_from(memoryview(self.data), 0, nbt.SKIP),
+            (None, self.end))
+
+    def test_empty(self):
+        self.assertEqual(encode(None), b"\x00")
+        self.assertEqual(nbt.read_from(b"\x00", 0), (None, 1))
+        self.assertEqual(nbt.skip(b"\x00", 0), 1)
+
+    def test_read_file_object(self):
+        file_object = BytesIO(self.data)
+        self.assertEqual(nbt.read(file_object), self.value)
+        self.assertEqual(file_object.read(), b"\xff")
+
+    def test_slot(self):
+        item = {"id": 276, "count": 1, "damage": 0, "nbt": self.value}
+        buf = bytearray()
+        Slot.write_to(item, buf)
+        buf += b"\xff"
+        view = memoryview(bytes(buf))
+
+        try:
+            for mode in (nbt.EAGER, nbt.LAZY, nbt.SKIP):
+                Slot.nbt_mode = mode
+                read, offset = Slot.read_from(view, 0)
+                self.assertEqual(offset, len(buf) - 1)
+                self.assertEqual(read["id"], 276)
+                if mode == nbt.SKIP:
+                    self.assertIsNone(read["nbt"])
+                else:
+                    self.assertEqual(dict(read["nbt"]), dict(self.value))
+        finally:
+            Slot.nbt_mode = nbt.EAGER
+        self.assertEqual(Slot.skip(view, 0), len(buf) - 1)
+
+    def test_list_and_int_array_send(self):
+        packet_buffer = PacketBuffer()
+        List.send([1, [3, -4]], packet_buffer)
+        IntArray.send([5, 6], packet_buffer)
+        packet_buffer.reset_cursor()
+        self.assertEqual(List.read(packet_buffer), [1, [3, -4]])
+        self.assertEqual(list(IntArray.read(packet_buffer)), [5, 6])
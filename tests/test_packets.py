@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
+import json
 import unittest
 import string
 from zlib import decompress
 from random import choice
 from minecraft.networking.types import VarInt
 from minecraft.networking.packets import (
-    PacketBuffer, ChatPacket, KeepAlivePacket, PacketListener)
+    Packet, PacketBuffer, PacketView, ChatPacket, KeepAlivePacket,
+    PacketListener, PlayerPositionAndLookPacket, JoinGamePacket, CombatEvent)
+from minecraft.networking.codec import compiler, lazy_plan
+from minecraft.networking import (
+    packets, create_packets_module, _packets_generated)
+from .compat import mock
 
 
 class PacketSerializatonTest(unittest.TestCase):
@@ -28,6 +34,24 @@ class PacketSerializatonTest(unittest.TestCase):
 
         self.assertEqual(packet.message, deserialized.message)
 
+    def test_read_from_view(self):
+        packet = PlayerPositionAndLookPacket().set_values(
+            x=1.5, y=64.0, z=-3.25, yaw=90.0, pitch=-45.0, flags=3)
+
+        packet_buffer = PacketBuffer()
+        packet.write(packet_buffer)
+
+        packet_view = PacketView(packet_buffer.get_writable())
+        packet_view.read_value(VarInt)
+        self.assertEqual(packet_view.read_value(VarInt), packet.id)
+
+        deserialized = PlayerPositionAndLookPacket()
+        offset = deserialized.read_from(packet_view.view, packet_view.offset)
+        self.assertEqual(offset, len(packet_view.view))
+        for field in ("x", "y", "z", "yaw", "pitch", "flags"):
+            self.assertEqual(getattr(packet, field),
+                             getattr(deserialized, field))
+
     def test_compressed_packet(self):
         msg = ''.join(choice(string.ascii_lowercase) for i in range(500))
         packet = ChatPacket()
@@ -36,6 +60,27 @@ class PacketSerializatonTest(unittest.TestCase):
         self.write_read_packet(packet, 20)
         self.write_read_packet(packet, -1)
 
+    def test_single_sendall(self):
+        socket = mock.Mock()
+        packet = ChatPacket().set_values(message="x" * 500)
+        packet.write(socket, 20)
+
+        self.assertEqual(socket.sendall.call_count, 1)
+        self.assertFalse(socket.send.called)
+
+    def test_write_frame(self):
+        chat_packet = ChatPacket().set_values(message="x" * 500)
+        keep_alive_packet = KeepAlivePacket().set_values(keep_alive_id=3)
+
+        expected = PacketBuffer()
+        chat_packet.write(expected, 20)
+        keep_alive_packet.write(expected, 20)
+
+        buf = bytearray()
+        chat_packet.write_frame(buf, 20)
+        keep_alive_packet.write_frame(buf, 20)
+        self.assertEqual(bytes(buf), expected.get_writable())
+
     def write_read_packet(self, packet, compression_threshold):
 
         packet_buffer = PacketBuffer()
@@ -61,6 +106,98 @@ class PacketSerializatonTest(unittest.TestCase):
         self.assertEqual(packet.message, deserialized.message)
 
 
+class PacketCodecTest(unittest.TestCase):
+
+    TEST_PACKETS = [
+        PlayerPositionAndLookPacket().set_values(
+            x=1.5, y=64.0, z=-3.25, yaw=90.0, pitch=-45.0, flags=3),
+        JoinGamePacket().set_values(
+            entity_id=42, game_mode=1, dimension=-1, difficulty=2,
+            max_players=20, level_type="default", reduced_debug_info=False),
+        CombatEvent().set_values(event=1, duration=20, player_id=None,
+                                 entity_id=7, message=None),
+    ]
+
+    def test_compiled_matches_generic(self):
+        for packet in self.TEST_PACKETS:
+            fields = [name for field in packet.definition for name in field]
+
+            data = bytearray()
+            packet.write_fields(data)
+            generic_data = bytearray()
+            Packet.write_fields(packet, generic_data)
+            self.assertEqual(data, generic_data)
+
+            compiled = type(packet)()
+            generic = type(packet)()
+            self.assertEqual(compiled.read_from(memoryview(data), 0),
+                             len(data))
+            self.assertEqual(Packet.read_from(generic, memoryview(data), 0),
+                             len(data))
+            for field in fields:
+                self.assertEqual(getattr(compiled, field),
+                                 getattr(generic, field))
+
+    def test_lazy_matches_eager(self):
+        for packet in self.TEST_PACKETS:
+            fields = [name for field in packet.definition for name in field]
+            data = bytearray()
+            packet.write_fields(data)
+
+            eager = type(packet)()
+            eager.read_from(memoryview(data), 0)
+            # Fields are accessed back to front, so the ones after variable
+            # length fields have to be located on demand
+            lazy = type(packet).read_lazy(memoryview(data), 0)
+            data[:] = bytearray(len(data))  # The packet keeps its own copy
+            for field in reversed(fields):
+                self.assertEqual(getattr(lazy, field),
+                                 getattr(eager, field))
+
+    def test_lazy_decodes_on_access(self):
+        packet = JoinGamePacket().set_values(
+            entity_id=42, game_mode=1, dimension=-1, difficulty=2,
+            max_players=20, level_type="default", reduced_debug_info=True)
+        data = bytearray()
+        packet.write_fields(data)
+
+        def is_decoded(packet, name):
+            try:
+                object.__getattribute__(packet, name)
+            except AttributeError:
+                return False
+            return True
+
+        lazy = JoinGamePacket.read_lazy(memoryview(data), 0)
+        self.assertFalse(is_decoded(lazy, "entity_id"))
+        self.assertEqual(lazy.entity_id, 42)
+        self.assertTrue(is_decoded(lazy, "entity_id"))
+        self.assertFalse(is_decoded(lazy, "level_type"))
+        self.assertTrue(lazy.reduced_debug_info)
+        with self.assertRaises(AttributeError):
+            lazy.no_such_field
+
+    def test_repeated_conditional_field(self):
+        definition = [{"action": "VarInt"},
+                      {"radius": ["Double", "action", 1]},
+                      {"radius": ["Double", "action", 2]}]
+        packet_class = type("TestPacket", (Packet,),
+                            compiler.compile(definition))
+        packet_class.definition = definition
+
+        packet = packet_class().set_values(action=1, radius=2.5)
+        data = bytearray()
+        packet.write_fields(data)
+
+        deserialized = packet_class()
+        deserialized.read_from(memoryview(data), 0)
+        self.assertEqual(deserialized.radius, 2.5)
+
+        packet_class._lazy_plan = lazy_plan(definition)
+        lazy = packet_class.read_lazy(memoryview(data), 0)
+        self.assertEqual(lazy.radius, 2.5)
+
+
 class PacketListenerTest(unittest.TestCase):
 
     def test_listener(self):
@@ -76,3 +213,43 @@ class PacketListenerTest(unittest.TestCase):
 
         listener.call_packet(packet)
         listener.call_packet(uncalled_packet)
+
+
+class GeneratedPacketsTest(unittest.TestCase):
+
+    def setUp(self):
+        with open(packets._PACKETS_JSON, "rb") as json_file:
+            self.source = json_file.read()
+
+    def test_generated_module_is_up_to_date(self):
+        # Fails after packets.json or the code generator changed, run
+        # python -m minecraft.networking.create_packets_module to fix it
+        with open(create_packets_module.OUTPUT) as generated:
+            self.assertEqual(generated.read(),
+                             create_packets_module.generate_module(
+                                 self.source))
+        self.assertEqual(_packets_generated.SOURCE_DIGEST,
+                         packets.source_digest(self.source))
+
+    def test_generated_matches_runtime(self):
+        generated_tables, generated_classes = \
+            _packets_generated.create_packets(Packet)
+        tables, classes = packets.build_packets(
+            json.loads(self.source.decode("utf-8")))
+
+        self.assertEqual(sorted(generated_tables), sorted(tables))
+        for name, table in tables.items():
+            self.assertEqual(sorted(generated_tables[name]), sorted(table))
+        self.assertEqual(sorted(generated_classes), sorted(classes))
+        for name, packet_class in classes.items():
+            generated = generated_classes[name]
+            for attribute in ("id", "packet_name", "definition", "__slots__",
+                              "__module__"):
+                self.assertEqual(getattr(generated, attribute),
+                                 getattr(packet_class, attribute))
+            self.assertEqual("read_from" in vars(generated),
+                             "read_from" in vars(packet_class))
+
+        # The packets module itself uses the generated classes
+        self.assertTrue(packets.KeepAlivePacket.read_from.__code__
+                        .co_filename.endswith("_packets_generated.py"))
@@ -0,0 +1,155 @@
+import pickle
+import unittest
+import zlib
+from concurrent.futures import Future
+from minecraft import PROTOCOL_VERSION
+import minecraft.networking.connection as conn
+from minecraft.networking import packets
+from minecraft.networking.pipeline import DecodePipeline, decode
+from minecraft.networking.types import VarInt
+from .compat import mock
+from .test_connection import frame
+from .test_dispatch import FrameList, chat
+from .test_world import chunk_data, numpy
+
+THRESHOLD = 64
+
+
+def playing_class(packet_name):
+    for packet_class in packets.STATE_PLAYING_CLIENTBOUND.values():
+        if packet_class.packet_name == packet_name:
+            return packet_class
+
+
+def chunk(chunk_x):
+    return packets.ChunkData().set_values(
+        chunk_x=chunk_x, chunk_z=0, ground_up_continuous=False,
+        primary_bit_mask=0, data=b"\x01\x02" * 500)
+
+
+class ManualExecutor(object):
+    # Runs the submitted calls only when told to
+    def __init__(self):
+        self.calls = []
+
+    def submit(self, function, *args):
+        future = Future()
+        self.calls.append((future, function, args))
+        return future
+
+    def run(self, index=0):
+        future, function, args = self.calls[index]
+        future.set_result(function(*args))
+
+
+def playing_connection(pipeline, **options):
+    connection = conn.Connection("localhost", 25565, None,
+                                 decode_pipeline=pipeline, **options)
+    connection.reactor = conn.PlayingReactor(connection)
+    received = []
+    connection.register_packet_listener(
+        lambda packet: received.append(packet.packet_name),
+        packets.ChunkData, packets.ChatMessagePacket,
+        playing_class("keep alive"), inline=True)
+    return connection, received
+
+
+class DecodePipelineTest(unittest.TestCase):
+
+    def test_order(self):
+        executor = ManualExecutor()
+        pipeline = DecodePipeline(executor)
+        connection, received = playing_connection(
+            pipeline, compression_enabled=True,
+            compression_threshold=THRESHOLD)
+        keep_alive = playing_class("keep alive")().set_values(
+            keep_alive_id=9)
+        connection.frame_reader = FrameList([
+            frame(chat(0), THRESHOLD), frame(chunk(1), THRESHOLD),
+            frame(keep_alive, THRESHOLD), frame(chunk(2), THRESHOLD),
+            frame(chat(1), THRESHOLD)])
+        connection._read_packets()
+
+        # Everything after the first chunk waits for it
+        self.assertEqual(received, ["chat message"])
+        self.assertEqual((pipeline.offloaded, pipeline.pending), (2, 4))
+        self.assertEqual(len(connection._outgoing_packet_queue), 0)
+        executor.run(1)
+        connection._run_pending()
+        self.assertEqual(received, ["chat message"])
+
+        executor.run(0)
+        connection._run_pending()
+        self.assertEqual(received, [
+            "chat message", "chunk data", "keep alive", "chunk data",
+            "chat message"])
+        self.assertEqual(pipeline.pending, 0)
+        self.assertEqual(
+            connection._outgoing_packet_queue[0].keep_alive_id, 9)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_world(self):
+        from minecraft.world import World
+        world = World()
+        pipeline = DecodePipeline()
+        self.addCleanup(pipeline.shutdown)
+        connection, received = playing_connection(
+            pipeline, world=world, compression_enabled=True,
+            compression_threshold=THRESHOLD)
+        connection.frame_reader = FrameList([
+            frame(chunk_data(3, 0, 0b11), THRESHOLD),
+            frame(chunk_data(4, 0, 0b1), THRESHOLD)])
+        connection._read_packets()
+        pipeline.drain(connection)
+        self.assertEqual(world.get_block(3 * 16, 20, 0), 2 << 4)
+        self.assertEqual(world.get_block(4 * 16, 0, 0), 1 << 4)
+
+    def test_set_compression(self):
+        pipeline = DecodePipeline()
+        self.addCleanup(pipeline.shutdown)
+        connection, received = playing_connection(pipeline)
+        set_compression = playing_class("set compression")().set_values(
+            threshold=THRESHOLD)
+        connection.frame_reader = FrameList([
+            frame(chunk(1)), frame(set_compression),
+            frame(chat(0), THRESHOLD), frame(chunk(2), THRESHOLD)])
+        connection._read_packets()
+        pipeline.drain(connection)
+        # Frames after it are read as compressed
+        self.assertEqual(received, ["chunk data", "chat message",
+                                    "chunk data"])
+
+    def test_errors(self):
+        pipeline = DecodePipeline()
+        self.addCleanup(pipeline.shutdown)
+        connection, received = playing_connection(
+            pipeline, compression_enabled=True,
+            compression_threshold=THRESHOLD)
+        packet = chunk(1)
+        payload = bytearray()
+        VarInt.write_to(packet.id, payload)
+        packet.write_fields(payload)
+        # Announces one byte too many
+        broken = bytearray()
+        VarInt.write_to(len(payload) + 1, broken)
+        broken += zlib.compress(bytes(payload))
+        connection.frame_reader = FrameList(
+            [memoryview(broken), frame(chat(0), THRESHOLD)])
+        with mock.patch("minecraft.networking.pipeline.print",
+                        create=True) as print_mock:
+            connection._read_packets()
+            pipeline.drain(connection)
+        self.assertEqual(print_mock.call_count, 1)
+        self.assertEqual(received, ["chat message"])
+
+    def test_decode(self):
+        packet = chunk(4)
+        data = bytearray()
+        VarInt.write_to(packet.id, data)
+        packet.write_fields(data)
+        values = decode(PROTOCOL_VERSION, "playing", packet.id,
+                        bytes(data), 0)
+        # Can be sent back from a worker process
+        self.assertEqual(pickle.loads(pickle.dumps(values)), values)
+        self.assertEqual(values["chunk_x"], 4)
+        self.assertEqual(values["data"], packet.data)
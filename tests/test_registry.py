@@ -0,0 +1,81 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+import minecraft.networking.connection as conn
+from minecraft import PROTOCOL_VERSION
+from minecraft.networking import packets
+from minecraft.networking.registry import ProtocolRegistry, registry
+
+
+class ProtocolRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        with open(packets._PACKETS_JSON) as json_file:
+            self.definitions = json.load(json_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_version(self, definitions):
+        path = os.path.join(self.directory, "%d.json" % len(
+            os.listdir(self.directory)))
+        with open(path, "w") as json_file:
+            json.dump(definitions, json_file)
+        return path
+
+    def test_default_version(self):
+        protocol = registry.get(PROTOCOL_VERSION)
+        self.assertIs(protocol.clientbound("playing"),
+                      packets.STATE_PLAYING_CLIENTBOUND)
+        self.assertIs(protocol.serverbound("playing", "KeepAlivePacket"),
+                      packets.STATE_PLAYING_SERVERBOUND[0])
+        with self.assertRaises(ValueError):
+            registry.get(-1)
+
+    def test_versions_share_classes_and_tables(self):
+        test_registry = ProtocolRegistry()
+        test_registry.add(PROTOCOL_VERSION, packets._tables)
+
+        # Like the default version, except for the id of one packet
+        changed = json.loads(json.dumps(self.definitions))
+        changed["playing"]["CLIENTBOUND"]["ChatMessagePacket"]["id"] = 0x7E
+        test_registry.register(1000, self.write_version(changed))
+        test_registry.register(1001, self.write_version(self.definitions))
+        self.assertEqual(test_registry.versions, [PROTOCOL_VERSION, 1000,
+                                                  1001])
+
+        default = test_registry.get(PROTOCOL_VERSION)
+        other = test_registry.get(1000)
+        self.assertIs(test_registry.get(1000), other)
+        self.assertIs(other.clientbound("login"), default.clientbound("login"))
+        self.assertIs(other.clientbound("playing")[0],
+                      packets.STATE_PLAYING_CLIENTBOUND[0])
+        chat = other.clientbound("playing")[0x7E]
+        self.assertEqual(chat.packet_name, "chat message")
+        self.assertIsNot(chat, packets.ChatMessagePacket)
+        self.assertNotIn(0x02, other.clientbound("playing"))
+
+        # An identical version is entirely shared
+        same = test_registry.get(1001)
+        for name, table in default.tables.items():
+            self.assertIs(same.tables[name], table)
+
+    def test_connection_uses_its_protocol(self):
+        changed = json.loads(json.dumps(self.definitions))
+        changed["playing"]["SERVERBOUND"]["KeepAlivePacket"]["id"] = 0x7D
+        registry.register(1002, self.write_version(changed))
+
+        connection = conn.Connection("localhost", 25565, None,
+                                     protocol_version=1002)
+        connection._handshake()
+        handshake = connection._outgoing_packet_queue.popleft()
+        self.assertEqual(handshake.protocol_version, 1002)
+
+        reactor = conn.PlayingReactor(connection)
+        keep_alive = packets.STATE_PLAYING_CLIENTBOUND[0]()
+        reactor.react(keep_alive.set_values(keep_alive_id=5))
+        reply = connection._outgoing_packet_queue.popleft()
+        self.assertEqual((reply.id, reply.keep_alive_id), (0x7D, 5))
@@ -65,3 +65,21 @@ class SerializationTest(unittest.TestCase):
         packet_buffer.reset_cursor()
 
         self.assertEqual(VarInt.read_socket(packet_buffer), 50000)
+
+    def test_read_from(self):
+        packet_buffer = PacketBuffer()
+        expected = []
+        for data_type in Type.__subclasses__():
+            for test_data in TEST_DATA.get(data_type, []):
+                data_type.send(test_data, packet_buffer)
+                expected.append((data_type, test_data))
+
+        view = memoryview(packet_buffer.get_writable())
+        offset = 0
+        for data_type, test_data in expected:
+            deserialized, offset = data_type.read_from(view, offset)
+            if data_type is Float or data_type is Double:
+                self.assertAlmostEqual(test_data, deserialized, 3)
+            else:
+                self.assertEqual(test_data, deserialized)
+        self.assertEqual(offset, len(view))
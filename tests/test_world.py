@@ -0,0 +1,162 @@
+import struct
+import unittest
+import minecraft.networking.connection as conn
+from minecraft.networking import packets
+
+try:
+    import numpy
+    from minecraft.world import World, SECTION_BLOCKS
+except ImportError:
+    numpy = None
+
+
+def column_data(bit_mask, sky_light=True, biomes=True):
+    # Each section is filled with a block state derived from its index
+    data = bytearray()
+    sections = [i for i in range(16) if bit_mask & (1 << i)]
+    for i in sections:
+        data += struct.pack("<%dH" % SECTION_BLOCKS,
+                            *([(i + 1) << 4] * SECTION_BLOCKS))
+    for light in ([0x21] + [0xF0] * sky_light):
+        data += bytes(bytearray([light])) * (SECTION_BLOCKS // 2 *
+                                               len(sections))
+    if biomes:
+        data += b"\x01" * 256
+    return bytes(data)
+
+
+def chunk_data(chunk_x, chunk_z, bit_mask, **kwargs):
+    return packets.ChunkData().set_values(
+        chunk_x=chunk_x, chunk_z=chunk_z, primary_bit_mask=bit_mask,
+        ground_up_continuous=kwargs.get("biomes", True),
+        data=column_data(bit_mask, **kwargs))
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class WorldTest(unittest.TestCase):
+
+    def test_chunk_data(self):
+        world = World()
+        world.react(chunk_data(-1, 2, 0b101))
+        self.assertEqual(world.get_block(-16, 0, 32), 1 << 4)
+        self.assertEqual(world.get_block(-1, 47, 47), 3 << 4)
+        self.assertEqual(world.get_block(-1, 20, 47), 0)
+        self.assertEqual(world.get_block(-1, 300, 47), 0)
+        self.assertIsNone(world.get_block(0, 0, 32))
+
+        chunk = world.get_chunk(-1, 2)
+        section = chunk.sections[0]
+        self.assertEqual(section.block_light[0], 0x21)
+        self.assertEqual(section.sky_light[0], 0xF0)
+        self.assertEqual(chunk.nbytes, 2 * (8192 + 2048 + 2048) + 256)
+
+        # Replaces a section, the others are kept
+        update = chunk_data(-1, 2, 0b10, sky_light=False, biomes=False)
+        world.react(update)
+        self.assertEqual(world.get_block(-1, 20, 47), 2 << 4)
+        self.assertEqual(world.get_block(-1, 0, 47), 1 << 4)
+        self.assertIsNone(chunk.sections[1].sky_light)
+
+        world.react(chunk_data(-1, 2, 0))
+        self.assertIsNone(world.get_chunk(-1, 2))
+
+    def test_block_changes(self):
+        world = World(keep_light=False)
+        world.react(chunk_data(0, 0, 0b1))
+        self.assertIsNone(world.get_chunk(0, 0).sections[0].block_light)
+
+        world.react(packets.BlockChange().set_values(
+            location=(3, 40, 5), block_state=7 << 4 | 2))
+        self.assertEqual(world.get_block(3, 40, 5), 7 << 4 | 2)
+
+        records = [(1, 2, 3, 5 << 4), (15, 255, 15, 9 << 4)]
+        change = packets.MultiBlockChange().set_values(
+            chunk_x=0, chunk_z=0, records=records)
+        data = bytearray()
+        change.write_fields(data)
+        change = packets.MultiBlockChange()
+        change.read_from(memoryview(bytes(data)), 0)
+        self.assertEqual(change.records, records)
+        world.react(change)
+        self.assertEqual(world.get_block(1, 2, 3), 5 << 4)
+        self.assertEqual(world.get_block(15, 255, 15), 9 << 4)
+
+    def test_map_chunk_bulk(self):
+        bulk = packets.MapChunkBulk().set_values(
+            sky_light_sent=False, columns=[(0, 0, 0b1), (5, -5, 0b11)],
+            data=column_data(0b1, False) + column_data(0b11, False))
+        data = bytearray()
+        bulk.write_fields(data)
+        bulk = packets.MapChunkBulk()
+        bulk.read_from(memoryview(bytes(data)), 0)
+
+        world = World()
+        world.react(bulk)
+        self.assertEqual(world.get_block(0, 0, 0), 1 << 4)
+        self.assertEqual(world.get_block(80, 17, -80), 2 << 4)
+        self.assertEqual(world.get_chunk(5, -5).biomes, b"\x01" * 256)
+
+    def test_connection_world(self):
+        world = World()
+        connection = conn.Connection("localhost", 25565, None, world=world)
+        reactor = conn.PlayingReactor(connection)
+        self.assertTrue(reactor.wants_packet(packets.ChunkData.id))
+        reactor.react(chunk_data(1, 1, 0b1))
+        self.assertEqual(world.get_block(16, 0, 16), 1 << 4)
+
+        reactor = conn.PlayingReactor(conn.Connection("localhost", 25565,
+                                                      None))
+        self.assertFalse(reactor.wants_packet(packets.ChunkData.id))
+
+    def test_lru_budget(self):
+        chunk_size = 8192 + 2048 + 2048 + 256
+        # Evicting stops at 90% of the budget, just under 3 chunks
+        world = World(max_bytes=int(3.5 * chunk_size))
+        for x in range(3):
+            # Chunks loaded later are used more recently
+            world._now = x
+            world.react(chunk_data(x, 0, 0b1))
+        self.assertEqual(world.nbytes, 3 * chunk_size)
+        world.get_block(0, 0, 0)
+
+        world.react(chunk_data(3, 0, 0b1))
+        world.maintain()
+        self.assertEqual(sorted(world.chunks), [(0, 0), (2, 0), (3, 0)])
+        self.assertEqual(world.evicted, 1)
+        self.assertEqual(world.nbytes, 3 * chunk_size)
+
+    def test_distance_budget(self):
+        world = World(keep_light=False, max_bytes=int(3.5 * (8192 + 256)),
+                      evict="distance")
+        world.player_position = (100.5, 0.5)
+        for x in range(4):
+            world.react(chunk_data(x * 3, 0, 0b1))
+        world.maintain()
+        self.assertEqual(sorted(world.chunks), [(3, 0), (6, 0), (9, 0)])
+
+        with self.assertRaises(ValueError):
+            World(evict="random")
+
+    def test_compress_idle_chunks(self):
+        world = World(compress_after=60)
+        world.react(chunk_data(0, 0, 0b11))
+        world.react(chunk_data(1, 0, 0b1, sky_light=False))
+        size = world.nbytes
+        world.set_block(0, 200, 0, 1 << 4)
+
+        # Only the first chunk has been idle long enough
+        world.chunks[0, 0].last_used -= 120
+        world._last_compressed -= 120
+        world.maintain()
+        packed = world.chunks[0, 0]
+        self.assertIsNone(packed.sections)
+        self.assertIsNotNone(world.chunks[1, 0].sections)
+        self.assertLess(world.nbytes, size)
+        self.assertEqual(world.nbytes, sum(
+            chunk.nbytes for chunk in world.chunks.values()))
+
+        # Unpacked again on use
+        self.assertEqual(world.get_block(0, 200, 0), 1 << 4)
+        self.assertEqual(world.get_block(15, 17, 15), 2 << 4)
+        self.assertEqual(packed.sections[0].sky_light[5], 0xF0)
+        self.assertEqual(world.nbytes, size + 8192)